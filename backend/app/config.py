@@ -17,10 +17,108 @@ DATA_DIR.mkdir(exist_ok=True)
 MODEL_FILENAME = "delay_predictor.pkl"
 MODEL_VERSION_FILE = "model_version.txt"
 
+# Registro de versões: models/<versão>/{model.pkl,meta.json} e
+# models/registry.json com a versão ativa e o histórico de ativações
+MODEL_ARTIFACT_FILENAME = "model.pkl"
+MODEL_META_FILENAME = "meta.json"
+MODEL_REGISTRY_FILENAME = "registry.json"
+# Motor compilado salvo junto de cada versão (arrays .npy carregados com
+# mmap e compartilhados entre workers pelo cache de páginas do SO);
+# MODEL_MMAP_MODE vazio carrega os arrays na memória do processo
+MODEL_COMPILED_DIRNAME = "compiled"
+MODEL_MMAP_MODE = os.getenv("MODEL_MMAP_MODE", "r") or None
+# Linhas de teste guardadas com o modelo para aquecer e conferir o motor
+# compilado antes de colocar uma versão em uso
+MODEL_SAMPLE_ROWS = 20
+
 # Configurações do servidor
 HOST = "0.0.0.0"
 PORT = 8000
 
+# Servidor multi-worker (gunicorn + UvicornWorker, ver gunicorn.conf.py)
+WEB_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Intervalo com que cada worker confere a versão ativa no registro
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "2"))
+
+# Métricas Prometheus (/metrics)
+# Com vários workers, cada um grava um snapshot em METRICS_MULTIPROC_DIR a
+# cada METRICS_FLUSH_SECONDS e o /metrics agrega os snapshots de todos
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_MULTIPROC_DIR = (
+    Path(os.getenv("METRICS_MULTIPROC_DIR", str(DATA_DIR / "metrics")))
+    if WEB_WORKERS > 1 else None
+)
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+# Recursos administrativos (ex.: profiling) exigem o header X-Admin-Token;
+# sem ADMIN_TOKEN configurado ficam desativados
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Profiling (cProfile + tempo por estágio + pico de memória via tracemalloc)
+# Pedido por requisição com ?profile=true; PROFILE_TRAINING_JOBS perfila
+# todos os jobs de treino
+PROFILE_TRAINING_JOBS = os.getenv("PROFILE_TRAINING_JOBS", "0") == "1"
+PROFILE_TRACE_MEMORY = os.getenv("PROFILE_TRACE_MEMORY", "1") == "1"
+PROFILE_TOP_FUNCTIONS = 30
+
+# Predição em lote
+MAX_BATCH_SIZE = 50000
+
+# Respostas da API
+# JSON serializado com orjson; /predict/batch e /features/importance também
+# respondem em Arrow IPC (application/vnd.apache.arrow.stream) ou
+# MessagePack (application/msgpack), escolhidos pelo header Accept.
+# Corpos a partir de RESPONSE_COMPRESSION_MIN_BYTES são comprimidos com
+# brotli ou gzip, conforme o Accept-Encoding do cliente
+RESPONSE_COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION_ENABLED", "1") == "1"
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_GZIP_LEVEL = 6
+RESPONSE_BROTLI_QUALITY = 4
+
+# Resumo do painel (GET /api/summary): montado uma vez por modelo publicado
+# e servido com ETag; no-cache faz o navegador revalidar a cada acesso e
+# receber 304 enquanto o modelo não mudar
+SUMMARY_CACHE_CONTROL = os.getenv("SUMMARY_CACHE_CONTROL", "no-cache")
+
+# Predição por streaming (WebSocket /api/predict/stream)
+# Fretes que chegam dentro de STREAM_BATCH_WINDOW_MS viram uma única chamada
+# a predict_batch (até STREAM_MAX_BATCH linhas); com STREAM_MAX_PENDING
+# fretes na fila a conexão para de ler até o modelo alcançar
+STREAM_BATCH_WINDOW_MS = float(os.getenv("STREAM_BATCH_WINDOW_MS", "10"))
+STREAM_MAX_BATCH = int(os.getenv("STREAM_MAX_BATCH", "1000"))
+STREAM_MAX_PENDING = int(os.getenv("STREAM_MAX_PENDING", "10000"))
+
+# Motor de inferência compilado (caminho rápido para poucas linhas)
+FAST_INFERENCE_ENABLED = os.getenv("FAST_INFERENCE_ENABLED", "1") == "1"
+FAST_INFERENCE_MAX_ROWS = 1000
+
+# Cache de predições (LRU + TTL, por processo)
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "1") == "1"
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "300"))
+
+# Camada de execução (fora do event loop)
+# Threads para inferência e processos para treino
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "4"))
+TRAINING_PROCESSES = int(os.getenv("TRAINING_PROCESSES", "1"))
+
+# Jobs de treino assíncronos
+# Com mais de um worker os jobs precisam ser visíveis a todos: "sqlite"
+JOB_STORE_BACKEND = os.getenv(
+    "JOB_STORE_BACKEND", "sqlite" if WEB_WORKERS > 1 else "memory"
+)
+JOB_STORE_PATH = DATA_DIR / "jobs.sqlite3"
+# Espera máxima pelo lock de escrita do SQLite (as chamadas rodam fora do
+# event loop, mas uma espera longa ainda atrasa o acompanhamento dos jobs)
+JOB_STORE_BUSY_TIMEOUT_SECONDS = float(os.getenv("JOB_STORE_BUSY_TIMEOUT_SECONDS", "2"))
+JOB_HISTORY_LIMIT = 200
+JOB_POLL_INTERVAL_SECONDS = 0.25
+# O worker dono de um job grava um heartbeat enquanto o acompanha; job não
+# finalizado sem heartbeat há JOB_STALE_SECONDS (ou com o processo dono
+# morto, no mesmo host) é marcado como failed ao ser lido
+JOB_HEARTBEAT_SECONDS = 5
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "60"))
+
 # Colunas obrigatórias do CSV
 REQUIRED_COLUMNS = [
     "freight_description",
@@ -35,10 +133,61 @@ REQUIRED_COLUMNS = [
     "distance_km"
 ]
 
+# Ingestão de CSV em streaming
+UPLOAD_SPOOL_DIR = DATA_DIR / "uploads"
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+CSV_CHUNK_ROWS = 250000
+
+# Re-treino incremental
+# warm_start: adiciona árvores treinadas só com os dados novos
+# window: re-treina do zero nas últimas RETRAIN_WINDOW_ROWS linhas acumuladas
+# full: re-treina do zero em toda a base acumulada
+TRAINING_STORE_PATH = DATA_DIR / "training_store.pkl"
+RETRAIN_MODES = ["warm_start", "window", "full"]
+RETRAIN_DEFAULT_MODE = os.getenv("RETRAIN_DEFAULT_MODE", "warm_start")
+RETRAIN_WARM_START_TREES = 25
+RETRAIN_MAX_TREES = 300
+RETRAIN_WINDOW_ROWS = int(os.getenv("RETRAIN_WINDOW_ROWS", "200000"))
+
+# Store de datasets de treino (Parquet particionado, ver dataset_store.py)
+# Cada upload ingerido vira um dataset em DATASETS_DIR/<id>/, particionado
+# pela data do upload ou pela rota
+DATASETS_DIR = DATA_DIR / "datasets"
+DATASET_PARTITION_KEYS = ["upload_date", "route_variant_id"]
+DATASET_PARTITION_BY = os.getenv("DATASET_PARTITION_BY", "upload_date")
+
+# Cache de artefatos de treino endereçado por conteúdo (ver artifact_cache.py)
+# Chave = hash dos bytes enviados + configuração do treino; guarda o dataset
+# tipado, a matriz pré-processada e o resultado (versão do registro).
+# Entradas menos usadas recentemente são removidas acima do limite em disco
+ARTIFACT_CACHE_ENABLED = os.getenv("ARTIFACT_CACHE_ENABLED", "1") == "1"
+ARTIFACT_CACHE_DIR = DATA_DIR / "cache"
+ARTIFACT_CACHE_MAX_BYTES = int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+
 # Valores válidos
 VALID_TRAFFIC_LEVELS = ["baixo", "medio", "alto"]
 VALID_DELAY_LABELS = ["atrasado", "em_tempo"]
 
+# Quantidade máxima de índices de linha reportados por regra de validação
+ROW_ERROR_SAMPLE_SIZE = 10
+
+# Política de paralelismo
+# n_jobs separados para treino e predição; lotes menores que o limite
+# são preditos de forma serial (evita disparar workers do joblib por
+# requisição). NATIVE_THREADS_PER_WORKER limita threads BLAS/OpenMP
+# por processo (0 = sem limite).
+FIT_N_JOBS = int(os.getenv("FIT_N_JOBS", "-1"))
+PREDICT_N_JOBS = int(os.getenv("PREDICT_N_JOBS", "-1"))
+SERIAL_PREDICT_THRESHOLD = int(os.getenv("SERIAL_PREDICT_THRESHOLD", "5000"))
+NATIVE_THREADS_PER_WORKER = int(os.getenv("NATIVE_THREADS_PER_WORKER", "1"))
+
+# Pré-processamento das categóricas (escolhido por modelo no treino)
+# dense: one-hot denso (poucas categorias)
+# sparse: one-hot esparso (milhares de categorias, matriz CSR)
+# ordinal: um código inteiro por coluna (modelos de árvore)
+PREPROCESSING_MODES = ["dense", "sparse", "ordinal"]
+PREPROCESSING_MODE = os.getenv("PREPROCESSING_MODE", "dense")
+
 # Configurações do RandomForest
 RANDOM_FOREST_PARAMS = {
     "n_estimators": 100,
@@ -46,5 +195,64 @@ RANDOM_FOREST_PARAMS = {
     "min_samples_split": 5,
     "min_samples_leaf": 2,
     "random_state": 42,
-    "n_jobs": -1
+    "n_jobs": FIT_N_JOBS
+}
+
+# Demais estimadores disponíveis (ver app/models/estimators.py)
+EXTRA_TREES_PARAMS = {
+    "n_estimators": 100,
+    "max_depth": 12,
+    "min_samples_split": 5,
+    "min_samples_leaf": 2,
+    "random_state": 42,
+    "n_jobs": FIT_N_JOBS
+}
+
+HIST_GRADIENT_BOOSTING_PARAMS = {
+    "max_iter": 200,
+    "learning_rate": 0.1,
+    "max_leaf_nodes": 31,
+    "early_stopping": True,
+    "random_state": 42
+}
+
+LOGISTIC_REGRESSION_PARAMS = {
+    "C": 1.0,
+    "max_iter": 1000,
+    "solver": "lbfgs"
+}
+
+# Estimador padrão dos treinos (random_forest, extra_trees,
+# hist_gradient_boosting ou logistic_regression)
+ESTIMATOR = os.getenv("ESTIMATOR", "random_forest")
+
+# Busca de hiperparâmetros no treino (POST /api/train com search=grid ou
+# halving): validação cruzada estratificada sobre a matriz já
+# pré-processada, com os candidatos distribuídos em SEARCH_N_JOBS processos
+SEARCH_METHODS = ["grid", "halving"]
+SEARCH_CV_FOLDS = int(os.getenv("SEARCH_CV_FOLDS", "3"))
+SEARCH_N_JOBS = int(os.getenv("SEARCH_N_JOBS", "-1"))
+SEARCH_SCORING = "roc_auc"
+SEARCH_HALVING_FACTOR = 3
+
+# Grade padrão de cada estimador (sobrescrita pelo campo param_grid)
+SEARCH_PARAM_GRIDS = {
+    "random_forest": {
+        "n_estimators": [100, 200],
+        "max_depth": [8, 10, 14],
+        "min_samples_leaf": [1, 2, 5]
+    },
+    "extra_trees": {
+        "n_estimators": [100, 200],
+        "max_depth": [10, 14, None],
+        "min_samples_leaf": [1, 2, 5]
+    },
+    "hist_gradient_boosting": {
+        "learning_rate": [0.05, 0.1, 0.2],
+        "max_leaf_nodes": [15, 31, 63],
+        "l2_regularization": [0.0, 1.0]
+    },
+    "logistic_regression": {
+        "C": [0.01, 0.1, 1.0, 10.0]
+    }
 }
@@ -1,24 +1,53 @@
 """
 Controlador da API - Endpoints para ML
 """
+import asyncio
 import os
 import io
+import json
+import orjson
 import pandas as pd
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from fastapi.responses import JSONResponse
+from fastapi import (
+    APIRouter, Depends, UploadFile, File, HTTPException, Form, Request, WebSocket,
+    WebSocketDisconnect
+)
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from typing import Optional, Dict, Any, List
 import logging
 
+from app.models.estimators import ESTIMATOR_NAMES, ESTIMATORS, get_estimator
 from app.models.predictor import predictor
-from app.config import DATA_DIR
+from app.models.training import start_compare_job, start_training_job
+from app.config import (
+    DATA_DIR,
+    ESTIMATOR,
+    MAX_BATCH_SIZE,
+    PREPROCESSING_MODES,
+    RETRAIN_DEFAULT_MODE,
+    RETRAIN_MODES,
+    SEARCH_CV_FOLDS,
+    SEARCH_METHODS,
+    STREAM_BATCH_WINDOW_MS,
+    STREAM_MAX_BATCH,
+    STREAM_MAX_PENDING,
+    SUMMARY_CACHE_CONTROL
+)
+from app.schema import csv_dtypes
 from app.utils.validator import validate_prediction_input
+from app.utils.executor import run_inference
+from app.utils.dataset_store import DatasetNotFoundError, dataset_store
+from app.utils.ingestion import spool_upload
+from app.utils.metrics import PREDICT_STREAM_CONNECTIONS
+from app.utils.micro_batcher import MicroBatcher
+from app.utils.profiling import profile_call, profiling_requested
+from app.utils.serialization import table_response
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Criar router
-router = APIRouter(prefix="/api", tags=["ML"])
+router = APIRouter(prefix="/api", tags=["ML"], default_response_class=ORJSONResponse)
 
 
 @router.get("/health")
@@ -48,20 +77,84 @@ async def get_model_info():
     return info
 
 
-@router.post("/train")
+@router.get("/summary")
+async def get_summary(request: Request):
+    """
+    Resumo do painel: informações do modelo, métricas e importância agregada
+    
+    O corpo é montado uma vez por modelo publicado e servido com ETag;
+    com If-None-Match igual ao ETag atual, responde 304 sem corpo.
+    """
+    body, etag = predictor.get_summary()
+    headers = {"ETag": etag, "Cache-Control": SUMMARY_CACHE_CONTROL}
+    
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparação fraca de If-None-Match (lista de ETags, W/ ou *)"""
+    if not if_none_match:
+        return False
+    etag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@router.post("/train", status_code=202)
 async def train_model(
-    file: UploadFile = File(..., description="Arquivo CSV com dados de treino"),
-    test_size: float = Form(1, description="Proporção dos dados para teste (0.1 a 0.5)")
+    file: Optional[UploadFile] = File(None, description="Arquivo CSV com dados de treino"),
+    test_size: float = Form(1, description="Proporção dos dados para teste (0.1 a 0.5)"),
+    drop_invalid: bool = Form(False, description="Descartar linhas inválidas e continuar"),
+    dataset_id: Optional[str] = Form(None, description="Ids de datasets do store, separados por vírgula"),
+    date_from: Optional[str] = Form(None, description="Datasets enviados a partir de (AAAA-MM-DD)"),
+    date_to: Optional[str] = Form(None, description="Datasets enviados até (AAAA-MM-DD)"),
+    preprocessing: Optional[str] = Form(None, description="dense, sparse ou ordinal"),
+    estimator: str = Form(ESTIMATOR, description=", ".join(ESTIMATOR_NAMES)),
+    search: Optional[str] = Form(None, description="Busca de hiperparâmetros: grid ou halving"),
+    param_grid: Optional[str] = Form(None, description='Grade em JSON, ex.: {"max_depth": [8, 12]}'),
+    cv_folds: int = Form(SEARCH_CV_FOLDS, description="Folds da validação cruzada (2 a 10)"),
+    profile: bool = Depends(profiling_requested)
 ):
     """
-    Treina o modelo com os dados fornecidos
+    Inicia o treino do modelo com os dados fornecidos
+    
+    Os dados vêm de um CSV enviado ou de datasets já ingeridos no store
+    (POST /api/datasets), escolhidos por id ou por intervalo de datas de
+    upload. O treino roda em segundo plano; acompanhe em
+    GET /api/jobs/{job_id}.
+    
+    Com search, os hiperparâmetros do estimador são escolhidos por
+    validação cruzada (grade completa ou successive halving); o resultado
+    do job traz o leaderboard e o melhor candidato é promovido.
+    
+    Com os mesmos dados e a mesma configuração de um treino anterior cuja
+    versão ainda está no registro, nada é treinado: essa versão antiga é
+    promovida de novo (entra outra vez no histórico usado pelo rollback)
+    e o resultado do job traz reused_version=true e fit_seconds=0.
     
     Args:
         file: Arquivo CSV com os dados
         test_size: Proporção dos dados para teste (padrão: 0.2 = 20%)
+        drop_invalid: Descartar linhas inválidas em vez de falhar
+        dataset_id: Ids de datasets do store (em vez do arquivo)
+        date_from / date_to: Intervalo de datas de upload dos datasets
+        preprocessing: Codificação das categóricas (padrão: a do estimador ou
+            PREPROCESSING_MODE); sparse e ordinal evitam a matriz one-hot
+            densa com muitas categorias
+        estimator: Classificador (padrão: ESTIMATOR)
+        search: grid ou halving (padrão: sem busca, parâmetros de config.py)
+        param_grid: Grade de parâmetros do estimador (padrão: SEARCH_PARAM_GRIDS)
+        cv_folds: Folds da validação cruzada (padrão: SEARCH_CV_FOLDS)
+        profile: Perfilar o treino (?profile=true, requer X-Admin-Token)
         
     Returns:
-        Métricas do modelo treinado
+        Id do job de treino
     """
     # Validar test_size
     if test_size < 0.1 or test_size > 0.5:
@@ -70,55 +163,119 @@ async def train_model(
             detail="test_size deve estar entre 0.1 (10%) e 0.5 (50%)"
         )
     
+    _check_estimator(estimator, preprocessing)
+    search_params = _search_params(estimator, search, param_grid, cv_folds)
+    
+    use_store = _use_store(file, dataset_id, date_from, date_to)
+    if use_store:
+        dataset_query = _dataset_query(dataset_id, date_from, date_to)
+        logger.info(f"Iniciando treino com datasets: {dataset_query}, test_size: {test_size}")
+        job = await start_training_job(
+            "train", None, test_size, None, profile=profile, dataset_query=dataset_query,
+            preprocessing=preprocessing, estimator=estimator, search=search_params
+        )
+        return _job_accepted(job)
+    
     logger.info(f"Iniciando treino com arquivo: {file.filename}, test_size: {test_size}")
     
-    try:
-        # Ler arquivo CSV
-        contents = await file.read()
-        df = pd.read_csv(io.BytesIO(contents))
-        
-        logger.info(f"Dados carregados: {len(df)} linhas, {len(df.columns)} colunas")
-        logger.info(f"Colunas: {list(df.columns)}")
-        
-        # Treinar modelo com test_size customizado
-        result = predictor.train(df, test_size=test_size)
-        
-        # Salvar modelo
-        model_path = predictor.save()
-        logger.info(f"Modelo salvo em: {model_path}")
-        
-        return {
-            "status": "success",
-            "message": "Modelo treinado com sucesso",
-            "metrics": result["metrics"],
-            "warnings": result.get("warnings", []),
-            "version": result["version"],
-            "training_date": result["training_date"],
-            "model_path": model_path
-        }
+    # Copiar o upload para disco em blocos (sem manter tudo em memória)
+    csv_path = await spool_upload(file)
+    
+    # Leitura, treino e salvamento rodam no pool de processos
+    job = await start_training_job(
+        "train", csv_path, test_size, file.filename, drop_invalid, profile=profile,
+        preprocessing=preprocessing, estimator=estimator, search=search_params
+    )
+    
+    return _job_accepted(job)
+
+
+@router.post("/train/compare", status_code=202)
+async def compare_models(
+    file: Optional[UploadFile] = File(None, description="Arquivo CSV com dados de treino"),
+    test_size: float = Form(0.2, description="Proporção dos dados para teste (0.1 a 0.5)"),
+    drop_invalid: bool = Form(False, description="Descartar linhas inválidas e continuar"),
+    dataset_id: Optional[str] = Form(None, description="Ids de datasets do store, separados por vírgula"),
+    date_from: Optional[str] = Form(None, description="Datasets enviados a partir de (AAAA-MM-DD)"),
+    date_to: Optional[str] = Form(None, description="Datasets enviados até (AAAA-MM-DD)"),
+    estimators: Optional[str] = Form(None, description="Estimadores separados por vírgula (padrão: todos)"),
+    preprocessing: Optional[str] = Form(None, description="dense, sparse ou ordinal")
+):
+    """
+    Compara estimadores treinados nos mesmos dados
+    
+    Cada estimador é treinado com o mesmo split; o resultado do job traz,
+    lado a lado, o tempo de fit, a latência de predição, o tamanho do
+    modelo em disco, accuracy e AUC. Nenhum modelo é promovido: treine o
+    escolhido com POST /api/train (campo estimator).
+    
+    Args:
+        file: Arquivo CSV com os dados (ou dataset_id / date_from / date_to)
+        test_size: Proporção dos dados para teste (padrão: 0.2 = 20%)
+        drop_invalid: Descartar linhas inválidas em vez de falhar
+        estimators: Estimadores a comparar (padrão: ESTIMATOR_NAMES)
+        preprocessing: Codificação das categóricas (padrão: a de cada estimador)
         
-    except ValueError as e:
-        logger.error(f"Erro de validação: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"Erro durante treino: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Erro durante treino: {str(e)}")
+    Returns:
+        Id do job de comparação
+    """
+    if test_size < 0.1 or test_size > 0.5:
+        raise HTTPException(
+            status_code=400,
+            detail="test_size deve estar entre 0.1 (10%) e 0.5 (50%)"
+        )
+    
+    names = ESTIMATOR_NAMES
+    if estimators:
+        names = list(dict.fromkeys(part.strip() for part in estimators.split(",") if part.strip()))
+    for name in names:
+        _check_estimator(name, None)
+    if preprocessing is not None and preprocessing not in PREPROCESSING_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"preprocessing deve ser um de {PREPROCESSING_MODES}"
+        )
+    
+    if _use_store(file, dataset_id, date_from, date_to):
+        dataset_query = _dataset_query(dataset_id, date_from, date_to)
+        job = await start_compare_job(
+            None, test_size, None, names, preprocessing, dataset_query=dataset_query
+        )
+        return _job_accepted(job)
+    
+    csv_path = await spool_upload(file)
+    job = await start_compare_job(csv_path, test_size, file.filename, names, preprocessing, drop_invalid)
+    return _job_accepted(job)
 
 
-@router.post("/retrain")
+@router.post("/retrain", status_code=202)
 async def retrain_model(
     file: UploadFile = File(..., description="Arquivo CSV com novos dados"),
-    test_size: float = Form(0.2, description="Proporção dos dados para teste (0.1 a 0.5)")
+    test_size: float = Form(0.2, description="Proporção dos dados para teste (0.1 a 0.5)"),
+    drop_invalid: bool = Form(False, description="Descartar linhas inválidas e continuar"),
+    mode: str = Form(RETRAIN_DEFAULT_MODE, description="warm_start, window ou full"),
+    profile: bool = Depends(profiling_requested)
 ):
     """
-    Re-treina o modelo com novos dados
+    Inicia o re-treino do modelo com novos dados
+    
+    Os dados enviados são somados à base acumulada de treino. O modo define
+    como o modelo é atualizado:
+        warm_start: adiciona árvores treinadas só com os dados novos
+        window: re-treina do zero nas linhas mais recentes da base
+        full: re-treina do zero em toda a base
+    
+    O re-treino roda em segundo plano; acompanhe em GET /api/jobs/{job_id}.
     
     Args:
         file: Arquivo CSV com dados adicionais
         test_size: Proporção dos dados para teste (padrão: 0.2 = 20%)
+        drop_invalid: Descartar linhas inválidas em vez de falhar
+        mode: Modo de re-treino (padrão: RETRAIN_DEFAULT_MODE)
+        profile: Perfilar o re-treino (?profile=true, requer X-Admin-Token)
         
     Returns:
-        Métricas do modelo re-treinado
+        Id do job de re-treino
     """
     # Validar test_size
     if test_size < 0.1 or test_size > 0.5:
@@ -127,7 +284,16 @@ async def retrain_model(
             detail="test_size deve estar entre 0.1 (10%) e 0.5 (50%)"
         )
     
-    logger.info(f"Iniciando re-treino com arquivo: {file.filename}, test_size: {test_size}")
+    if mode not in RETRAIN_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"mode deve ser um de {RETRAIN_MODES}"
+        )
+    
+    logger.info(
+        f"Iniciando re-treino com arquivo: {file.filename}, "
+        f"test_size: {test_size}, mode: {mode}"
+    )
     
     if not predictor.is_trained:
         raise HTTPException(
@@ -135,42 +301,135 @@ async def retrain_model(
             detail="Modelo precisa ser treinado primeiro"
         )
     
+    spec = ESTIMATORS.get(predictor.estimator)
+    if mode == "warm_start" and (spec is None or not spec.incremental):
+        raise HTTPException(
+            status_code=400,
+            detail=f"{predictor.estimator} não suporta re-treino incremental; use window ou full"
+        )
+    
+    # Copiar o upload para disco em blocos (sem manter tudo em memória)
+    csv_path = await spool_upload(file)
+    
+    # Leitura, re-treino e salvamento rodam no pool de processos (mantendo o
+    # estimador e a codificação do modelo atual)
+    job = await start_training_job(
+        "retrain", csv_path, test_size, file.filename, drop_invalid, mode, profile,
+        preprocessing=predictor.preprocessing, estimator=spec.name if spec else None
+    )
+    
+    return _job_accepted(job)
+
+
+def _check_estimator(estimator: str, preprocessing: Optional[str]):
+    """Confere o estimador e o modo de pré-processamento antes de criar o job"""
+    if preprocessing is not None and preprocessing not in PREPROCESSING_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"preprocessing deve ser um de {PREPROCESSING_MODES}"
+        )
     try:
-        # Ler arquivo CSV
-        contents = await file.read()
-        df = pd.read_csv(io.BytesIO(contents))
-        
-        logger.info(f"Dados carregados: {len(df)} linhas")
-        
-        # Re-treinar modelo com test_size customizado
-        result = predictor.train(df, test_size=test_size)
-        
-        # Salvar modelo
-        model_path = predictor.save()
-        
-        return {
-            "status": "success",
-            "message": "Modelo re-treinado com sucesso",
-            "metrics": result["metrics"],
-            "version": result["version"],
-            "training_date": result["training_date"],
-            "model_path": model_path
-        }
-        
+        get_estimator(estimator).resolve_preprocessing(preprocessing)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"Erro durante re-treino: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Erro durante re-treino: {str(e)}")
+
+
+def _search_params(
+    estimator: str,
+    search: Optional[str],
+    param_grid: Optional[str],
+    cv_folds: int
+) -> Optional[Dict[str, Any]]:
+    """Argumentos da busca de hiperparâmetros (None sem search), conferidos antes do job"""
+    if search is None:
+        if param_grid is not None:
+            raise HTTPException(status_code=400, detail="param_grid requer search")
+        return None
+    
+    if search not in SEARCH_METHODS:
+        raise HTTPException(status_code=400, detail=f"search deve ser um de {SEARCH_METHODS}")
+    if cv_folds < 2 or cv_folds > 10:
+        raise HTTPException(status_code=400, detail="cv_folds deve estar entre 2 e 10")
+    
+    grid = None
+    if param_grid is not None:
+        try:
+            grid = json.loads(param_grid)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="param_grid deve ser um JSON válido")
+        if not isinstance(grid, dict) or not grid or not all(
+            isinstance(values, list) and values for values in grid.values()
+        ):
+            raise HTTPException(
+                status_code=400,
+                detail="param_grid deve mapear cada parâmetro para uma lista de valores"
+            )
+        spec = get_estimator(estimator)
+        unknown = sorted(set(grid) - set(spec.factory().get_params()))
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Parâmetros desconhecidos para {spec.name}: {unknown}"
+            )
+    
+    return {"method": search, "param_grid": grid, "cv_folds": cv_folds}
+
+
+def _use_store(
+    file: Optional[UploadFile],
+    dataset_id: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str]
+) -> bool:
+    """Se o treino usa datasets do store (exatamente uma fonte deve ser escolhida)"""
+    use_store = bool(dataset_id or date_from or date_to)
+    if (file is None) == (not use_store):
+        raise HTTPException(
+            status_code=400,
+            detail="Envie um arquivo CSV ou escolha datasets (dataset_id ou date_from/date_to)"
+        )
+    return use_store
+
+
+def _dataset_query(
+    dataset_id: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str]
+) -> Dict[str, Any]:
+    """Seleção de datasets do store, conferida antes de criar o job"""
+    dataset_ids = None
+    if dataset_id:
+        dataset_ids = [part.strip() for part in dataset_id.split(",") if part.strip()]
+    try:
+        dataset_store.select(dataset_ids, date_from, date_to)
+    except DatasetNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"dataset_ids": dataset_ids, "date_from": date_from, "date_to": date_to}
+
+
+def _job_accepted(job) -> Dict[str, Any]:
+    """Resposta padrão para um job aceito"""
+    return {
+        "status": "accepted",
+        "message": "Treino iniciado",
+        "job_id": job.id,
+        "job_url": f"/api/jobs/{job.id}"
+    }
 
 
 @router.post("/predict")
-async def predict_delay(data: Dict[str, Any]):
+async def predict_delay(
+    data: Dict[str, Any],
+    profile: bool = Depends(profiling_requested)
+):
     """
     Faz predição de atraso para novos dados
     
     Args:
         data: Dados do frete
+        profile: Anexar o perfil da predição à resposta (requer X-Admin-Token)
         
     Returns:
         Probabilidade de atraso
@@ -189,8 +448,12 @@ async def predict_delay(data: Dict[str, Any]):
         raise HTTPException(status_code=400, detail=f"Erros de validação: {errors}")
     
     try:
-        # Fazer predição
-        result = predictor.predict(data)
+        # Fazer predição (no pool de inferência)
+        if profile:
+            result, report = await run_inference(profile_call, predictor.predict, data)
+            result = {**result, "profile": report}
+        else:
+            result = await run_inference(predictor.predict, data)
         
         logger.info(
             f"Predição: {result['prediction']} "
@@ -206,6 +469,234 @@ async def predict_delay(data: Dict[str, Any]):
         raise HTTPException(status_code=500, detail=f"Erro durante predição: {str(e)}")
 
 
+def _parse_batch_body(body: bytes, content_type: str) -> List[Dict[str, Any]]:
+    """
+    Converte o corpo da requisição de lote em lista de fretes
+    
+    Aceita JSON (lista ou {"freights": [...]}), NDJSON e CSV.
+    """
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        return [
+            json.loads(line)
+            for line in body.decode("utf-8").splitlines()
+            if line.strip()
+        ]
+    
+    if content_type in ("text/csv", "application/csv"):
+        # Tipos do schema, mantendo a precisão dos numéricos da entrada
+        df = pd.read_csv(io.BytesIO(body), dtype=csv_dtypes(numeric_dtype="float64"))
+        # Células vazias viram None (faltantes), não NaN
+        df = df.astype(object).where(df.notna(), None)
+        return df.to_dict(orient="records")
+    
+    payload = json.loads(body)
+    if isinstance(payload, dict):
+        payload = payload.get("freights")
+    if not isinstance(payload, list):
+        raise ValueError(
+            "Corpo deve ser uma lista de fretes ou um objeto com a chave 'freights'"
+        )
+    return payload
+
+
+@router.post("/predict/batch")
+async def predict_delay_batch(
+    request: Request,
+    profile: bool = Depends(profiling_requested)
+):
+    """
+    Faz predição de atraso para uma lista de fretes
+    
+    O corpo pode ser um array JSON, NDJSON (um frete por linha) ou CSV.
+    Todas as linhas válidas passam por uma única chamada a predict_proba;
+    linhas inválidas retornam seus erros de validação individualmente.
+    Com ?profile=true (requer X-Admin-Token) a resposta traz o perfil da
+    predição. A resposta é JSON, Arrow ou MessagePack conforme o Accept
+    (ver app/utils/serialization.py).
+    
+    Returns:
+        Resultados por linha, na mesma ordem da entrada
+    """
+    if not predictor.is_trained:
+        raise HTTPException(
+            status_code=400,
+            detail="Modelo precisa ser treinado primeiro"
+        )
+    
+    try:
+        rows = await run_inference(
+            _parse_batch_body,
+            await request.body(),
+            request.headers.get("content-type", "application/json")
+        )
+    except (ValueError, pd.errors.ParserError) as e:
+        raise HTTPException(status_code=400, detail=f"Corpo inválido: {str(e)}")
+    
+    if len(rows) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lote excede o limite de {MAX_BATCH_SIZE} fretes"
+        )
+    
+    logger.info(f"Recebida requisição de predição em lote: {len(rows)} fretes")
+    
+    # Validar cada linha separadamente
+    results: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+    valid_indices = []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            results[index] = {
+                "index": index,
+                "status": "error",
+                "errors": ["Frete deve ser um objeto"]
+            }
+            continue
+        is_valid, errors = validate_prediction_input(row)
+        if is_valid:
+            valid_indices.append(index)
+        else:
+            results[index] = {"index": index, "status": "error", "errors": errors}
+    
+    try:
+        # Uma única chamada ao modelo para todas as linhas válidas
+        valid_rows = [rows[i] for i in valid_indices]
+        report = None
+        if profile:
+            predictions, report = await run_inference(
+                profile_call, predictor.predict_batch, valid_rows
+            )
+        else:
+            predictions = await run_inference(predictor.predict_batch, valid_rows)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erro durante predição em lote: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro durante predição: {str(e)}")
+    
+    for index, prediction in zip(valid_indices, predictions):
+        results[index] = {"index": index, "status": "success", **prediction}
+    
+    response = {
+        "results": results,
+        "total": len(rows),
+        "valid": len(valid_indices),
+        "invalid": len(rows) - len(valid_indices)
+    }
+    if report is not None:
+        response["profile"] = report
+    return table_response(request.headers.get("accept"), response, "results")
+
+
+@router.websocket("/predict/stream")
+async def predict_delay_stream(websocket: WebSocket):
+    """
+    Predição contínua por WebSocket
+    
+    Cada mensagem de texto é um frete {"id": ..., "freight": {...}} ou uma
+    lista deles; o id é escolhido pelo cliente e volta no resultado. Os
+    fretes que chegam dentro de STREAM_BATCH_WINDOW_MS são preditos em uma
+    única chamada a predict_batch, e cada lote volta como uma mensagem com
+    a lista de resultados, na ordem de chegada:
+        [{"id": ..., "status": "success", "probability": ..., ...},
+         {"id": ..., "status": "error", "errors": [...]}]
+    
+    Sem modelo treinado, a conexão é fechada com o código 1013.
+    """
+    await websocket.accept()
+    if not predictor.is_trained:
+        await websocket.close(code=1013, reason="Modelo precisa ser treinado primeiro")
+        return
+    
+    async def predict_items(batch: List[Dict[str, Any]]):
+        valid = [item for item in batch if "errors" not in item]
+        try:
+            predictions = await run_inference(
+                predictor.predict_batch, [item["freight"] for item in valid]
+            )
+        except Exception as e:
+            logger.error(f"Erro durante predição em streaming: {str(e)}")
+            for item in valid:
+                item["errors"] = [f"Erro durante predição: {str(e)}"]
+            predictions = []
+        
+        for item, prediction in zip(valid, predictions):
+            item["result"] = prediction
+        
+        results = [
+            {"id": item["id"], "status": "success", **item["result"]} if "result" in item
+            else {"id": item["id"], "status": "error", "errors": item["errors"]}
+            for item in batch
+        ]
+        await websocket.send_text(orjson.dumps(results).decode("utf-8"))
+    
+    batcher = MicroBatcher(
+        predict_items,
+        window_seconds=STREAM_BATCH_WINDOW_MS / 1000,
+        max_batch=min(STREAM_MAX_BATCH, MAX_BATCH_SIZE),
+        max_pending=STREAM_MAX_PENDING
+    )
+    worker = asyncio.create_task(batcher.run())
+    PREDICT_STREAM_CONNECTIONS.inc()
+    try:
+        while not worker.done():
+            # Validação na leitura; inválidos seguem na fila para manter a ordem
+            for item in _parse_stream_message(await websocket.receive_text()):
+                await batcher.put(item)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        PREDICT_STREAM_CONNECTIONS.dec()
+        worker.cancel()
+        try:
+            await worker
+        except (asyncio.CancelledError, WebSocketDisconnect, RuntimeError):
+            pass
+
+
+def _parse_stream_message(message: str) -> List[Dict[str, Any]]:
+    """
+    Itens de uma mensagem do streaming: {"id", "freight"} e, se inválido,
+    "errors" com os erros de validação
+    """
+    try:
+        payload = orjson.loads(message)
+    except orjson.JSONDecodeError:
+        return [{"id": None, "errors": ["Mensagem não é um JSON válido"]}]
+    
+    items = []
+    for entry in payload if isinstance(payload, list) else [payload]:
+        if not isinstance(entry, dict) or not isinstance(entry.get("freight"), dict):
+            client_id = entry.get("id") if isinstance(entry, dict) else None
+            items.append({"id": client_id, "errors": ["Mensagem deve ter o objeto freight"]})
+            continue
+        
+        item = {"id": entry.get("id"), "freight": entry["freight"]}
+        is_valid, errors = validate_prediction_input(entry["freight"])
+        if not is_valid:
+            item["errors"] = errors
+        items.append(item)
+    return items
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Retorna tamanho e contadores de acerto do cache de predições"""
+    return predictor.cache.stats()
+
+
+@router.delete("/cache")
+async def clear_cache():
+    """Esvazia o cache de predições"""
+    predictor.cache.clear()
+    return {
+        "status": "success",
+        "message": "Cache de predições esvaziado",
+        "cache": predictor.cache.stats()
+    }
+
+
 @router.get("/metrics")
 async def get_metrics():
     """Retorna métricas do último treino"""
@@ -219,36 +710,41 @@ async def get_metrics():
 
 
 @router.get("/features/importance")
-async def get_feature_importance():
-    """Retorna importância das features"""
+async def get_feature_importance(request: Request, aggregate: bool = False):
+    """
+    Retorna importância das features (JSON, Arrow ou MessagePack conforme o Accept)
+    
+    Args:
+        aggregate: Somar as colunas one-hot por feature de origem
+    """
     if not predictor.is_trained:
         raise HTTPException(
             status_code=400,
             detail="Modelo precisa ser treinado primeiro"
         )
     
-    importance = predictor.get_feature_importance()
+    importance = predictor.get_feature_importance(aggregate=aggregate)
     
-    return {
-        "features": importance,
-        "total_features": len(importance)
-    }
+    return table_response(
+        request.headers.get("accept"),
+        {"features": importance, "total_features": len(importance)},
+        "features"
+    )
 
 
 @router.post("/load-model")
 async def load_existing_model():
-    """Carrega o modelo salvo anteriormente"""
+    """Recarrega o modelo ativo do registro (ou o arquivo legado)"""
     from app.config import MODELS_DIR, MODEL_FILENAME
+    from app.models.registry import model_registry
     
-    model_path = MODELS_DIR / MODEL_FILENAME
-    
-    if not model_path.exists():
+    if model_registry.active_version() is None and not (MODELS_DIR / MODEL_FILENAME).exists():
         raise HTTPException(
             status_code=404,
             detail="Nenhum modelo encontrado"
         )
     
-    success = predictor.load(model_path)
+    success = await run_inference(predictor.load)
     
     if success:
         return {
@@ -0,0 +1,80 @@
+"""
+Controlador de datasets - Ingestão de uploads no store Parquet
+"""
+from pathlib import Path
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+
+from app.config import DATASET_PARTITION_BY, DATASET_PARTITION_KEYS
+from app.utils.dataset_store import dataset_store
+from app.utils.executor import run_training
+from app.utils.ingestion import spool_upload
+
+# Criar router
+router = APIRouter(prefix="/api/datasets", tags=["Datasets"])
+
+
+@router.post("", status_code=201)
+async def ingest_dataset(
+    file: UploadFile = File(..., description="Arquivo CSV, Parquet ou Arrow (IPC/Feather)"),
+    partition_by: str = Form(DATASET_PARTITION_BY, description="upload_date ou route_variant_id"),
+    drop_invalid: bool = Form(False, description="Descartar linhas inválidas e continuar")
+):
+    """
+    Valida o arquivo e o grava como dataset Parquet particionado
+
+    O formato é detectado pelo conteúdo. O dataset criado pode ser usado
+    em POST /api/train (dataset_id ou date_from/date_to) sem novo upload.
+    """
+    if partition_by not in DATASET_PARTITION_KEYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"partition_by deve ser um de {DATASET_PARTITION_KEYS}"
+        )
+
+    # Copiar o upload para disco em blocos (sem manter tudo em memória)
+    path = await spool_upload(file, suffix=Path(file.filename or "").suffix or ".upload")
+    try:
+        # Leitura, validação e escrita rodam no pool de processos
+        meta = await run_training(
+            dataset_store.ingest, str(path), file.filename, partition_by, drop_invalid
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        path.unlink(missing_ok=True)
+
+    return meta
+
+
+@router.get("")
+async def list_datasets():
+    """Lista os datasets do store, do mais novo para o mais antigo"""
+    datasets = dataset_store.list()
+    return {
+        "datasets": datasets,
+        "total": len(datasets),
+        "total_rows": sum(meta["n_rows"] for meta in datasets)
+    }
+
+
+@router.get("/{dataset_id}")
+async def get_dataset(dataset_id: str):
+    """Metadados de um dataset"""
+    meta = dataset_store.get(dataset_id)
+    if meta is None:
+        raise HTTPException(status_code=404, detail="Dataset não encontrado")
+
+    return meta
+
+
+@router.delete("/{dataset_id}")
+async def delete_dataset(dataset_id: str):
+    """Remove um dataset do store"""
+    if not dataset_store.delete(dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset não encontrado")
+
+    return {
+        "status": "success",
+        "message": f"Dataset {dataset_id} removido"
+    }
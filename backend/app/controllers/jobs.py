@@ -0,0 +1,90 @@
+"""
+Controlador de jobs - Acompanhamento e cancelamento de treinos
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.models.training import cancel_job
+from app.utils.auth import require_admin
+from app.utils.executor import run_inference
+from app.utils.jobs import job_store
+
+# Criar router
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+
+@router.get("")
+async def list_jobs():
+    """Lista os jobs mais recentes"""
+    jobs = await run_inference(job_store.list)
+    return {
+        "jobs": [job.to_dict() for job in jobs],
+        "total": len(jobs)
+    }
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Retorna status, estágio, tempo decorrido e resultado de um job"""
+    job = await run_inference(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    
+    return job.to_dict()
+
+
+@router.get("/{job_id}/profile", dependencies=[Depends(require_admin)])
+async def get_job_profile(
+    job_id: str,
+    format: str = Query("json", description="json ou text (relatório do pstats)")
+):
+    """
+    Relatório de profiling de um job pedido com profile=true (requer X-Admin-Token)
+    
+    Contém o tempo de relógio e de CPU por estágio, o pico de memória e as
+    funções com maior tempo acumulado. Com format=text, baixa o relatório
+    do pstats.
+    """
+    job = await run_inference(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    
+    if job.profile is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Job sem perfil (pedido sem profile=true ou ainda não concluído)"
+        )
+    
+    if format == "text":
+        return PlainTextResponse(
+            job.profile["text"],
+            headers={"Content-Disposition": f'attachment; filename="profile_{job_id}.txt"'}
+        )
+    if format != "json":
+        raise HTTPException(status_code=400, detail="format deve ser json ou text")
+    
+    return {"job_id": job_id, "kind": job.kind, **job.profile}
+
+
+@router.delete("/{job_id}")
+async def delete_job(job_id: str):
+    """Cancela um job em andamento"""
+    job = await run_inference(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    
+    if job.is_finished:
+        return JSONResponse(
+            status_code=409,
+            content={
+                "message": f"Job já finalizado (status: {job.status})",
+                "job": job.to_dict()
+            }
+        )
+    
+    job = await cancel_job(job_id)
+    return {
+        "status": "cancelling",
+        "message": "Cancelamento solicitado",
+        "job": job.to_dict()
+    }
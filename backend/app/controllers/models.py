@@ -0,0 +1,53 @@
+"""
+Controlador de modelos - Versões salvas, promoção e rollback
+"""
+from fastapi import APIRouter, HTTPException
+
+from app.models.predictor import predictor
+from app.models.registry import model_registry
+from app.utils.executor import run_inference
+
+# Criar router
+router = APIRouter(prefix="/api/models", tags=["Models"])
+
+
+@router.get("")
+async def list_models():
+    """Lista as versões salvas no registro, indicando a ativa"""
+    versions = model_registry.list()
+    return {
+        "versions": versions,
+        "active": model_registry.active_version(),
+        "serving": predictor.version if predictor.is_trained else None,
+        "total": len(versions)
+    }
+
+
+@router.post("/rollback")
+async def rollback_model():
+    """Volta para a versão ativa antes da atual"""
+    try:
+        version = await run_inference(predictor.promote, rollback=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "status": "success",
+        "message": f"Rollback para a versão {version}",
+        "version": version
+    }
+
+
+@router.post("/{version}/promote")
+async def promote_model(version: str):
+    """Coloca uma versão salva em uso (troca atômica, sem interromper predições)"""
+    if not model_registry.exists(version):
+        raise HTTPException(status_code=404, detail="Versão não encontrada")
+
+    version = await run_inference(predictor.promote, version)
+
+    return {
+        "status": "success",
+        "message": f"Versão {version} em uso",
+        "version": version
+    }
@@ -0,0 +1,44 @@
+"""
+Controlador de monitoramento - Métricas no formato Prometheus
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.models.predictor import predictor
+from app.utils.metrics import (
+    MODEL_INFO,
+    PREDICTION_CACHE_ENTRIES,
+    PREDICTION_CACHE_EVICTIONS_TOTAL,
+    PREDICTION_CACHE_HIT_RATIO,
+    PREDICTION_CACHE_LOOKUPS_TOTAL,
+    registry
+)
+
+# Criar router (sem prefixo: /metrics é o caminho padrão do Prometheus)
+router = APIRouter(tags=["Monitoring"])
+
+# O charset é acrescentado pela resposta
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _collect_model_metrics():
+    """Copia para o registro o estado do modelo ativo e do cache"""
+    MODEL_INFO.clear()
+    if predictor.is_trained:
+        MODEL_INFO.set(1, predictor.version)
+
+    stats = predictor.cache.stats()
+    PREDICTION_CACHE_LOOKUPS_TOTAL.set_total(stats["hits"], "hit")
+    PREDICTION_CACHE_LOOKUPS_TOTAL.set_total(stats["misses"], "miss")
+    PREDICTION_CACHE_EVICTIONS_TOTAL.set_total(stats["evictions"])
+    PREDICTION_CACHE_HIT_RATIO.set(stats["hit_ratio"])
+    PREDICTION_CACHE_ENTRIES.set(stats["size"])
+
+
+registry.add_collector(_collect_model_metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métricas do servidor no formato de texto do Prometheus"""
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -14,7 +14,15 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.controllers.api import router as ml_router
-from app.config import HOST, PORT
+from app.controllers.datasets import router as datasets_router
+from app.controllers.jobs import router as jobs_router
+from app.controllers.models import router as models_router
+from app.controllers.monitoring import router as monitoring_router
+from app.config import HOST, PORT, WEB_WORKERS
+from app.models.reloader import start_model_watcher, stop_model_watcher
+from app.utils.compression import CompressionMiddleware
+from app.utils.executor import shutdown_executors, limit_native_threads
+from app.utils.metrics import MetricsMiddleware, start_metrics_flusher, stop_metrics_flusher
 
 # Configurar logging
 logging.basicConfig(
@@ -39,8 +47,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressão brotli/gzip das respostas grandes
+app.add_middleware(CompressionMiddleware)
+
+# Latência por rota para o /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Incluir routers
 app.include_router(ml_router)
+app.include_router(datasets_router)
+app.include_router(jobs_router)
+app.include_router(models_router)
+app.include_router(monitoring_router)
 
 # Rota raiz
 @app.get("/")
@@ -54,10 +72,16 @@ async def root():
             "health": "/api/health",
             "train": "/api/train",
             "predict": "/api/predict",
+            "predict_batch": "/api/predict/batch",
             "retrain": "/api/retrain",
+            "jobs": "/api/jobs",
+            "datasets": "/api/datasets",
+            "models": "/api/models",
             "metrics": "/api/metrics",
             "feature_importance": "/api/features/importance",
-            "model_info": "/api/model/info"
+            "cache_stats": "/api/cache/stats",
+            "model_info": "/api/model/info",
+            "prometheus": "/metrics"
         }
     }
 
@@ -69,27 +93,48 @@ async def startup_event():
     logger.info("Iniciando Delivery Delay Predictor API")
     logger.info("=" * 50)
     
-    # Tentar carregar modelo existente
+    # Limitar threads BLAS/OpenMP do processo servidor
+    limit_native_threads()
+    
+    # Tentar carregar o modelo ativo do registro (ou o arquivo legado)
     from app.models.predictor import predictor
-    from app.config import MODELS_DIR, MODEL_FILENAME
     
-    model_path = MODELS_DIR / MODEL_FILENAME
-    if model_path.exists():
-        try:
-            predictor.load(model_path)
-            logger.info(f"Modelo carregado: versão {predictor.version}")
-        except Exception as e:
-            logger.warning(f"Não foi possível carregar modelo existente: {e}")
+    if predictor.is_trained:
+        # Pré-carregado no processo mestre (gunicorn preload_app); conferir
+        # se a versão ativa mudou desde o fork
+        predictor.sync_with_registry()
+        logger.info(f"Modelo pré-carregado: versão {predictor.version}")
+    elif predictor.load():
+        logger.info(f"Modelo carregado: versão {predictor.version}")
     else:
         logger.info("Nenhum modelo encontrado. Execute o treino primeiro.")
+    
+    # Jobs deixados em andamento por um worker que morreu
+    from app.utils.jobs import job_store
+    stale_jobs = job_store.fail_stale_jobs()
+    if stale_jobs:
+        logger.info(f"{stale_jobs} jobs órfãos marcados como failed")
+    
+    # Acompanhar promoções feitas por outros workers
+    start_model_watcher()
+    # Snapshot das métricas deste worker para o /metrics agregado
+    start_metrics_flusher()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Evento executado ao encerrar o servidor"""
     logger.info("Encerrando Delivery Delay Predictor API")
+    await stop_model_watcher()
+    await stop_metrics_flusher()
+    shutdown_executors()
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=HOST, port=PORT)
+    if WEB_WORKERS > 1:
+        # Vários processos, sem pré-carga do modelo (em produção use
+        # gunicorn -c gunicorn.conf.py app.main:app)
+        uvicorn.run("app.main:app", host=HOST, port=PORT, workers=WEB_WORKERS)
+    else:
+        uvicorn.run(app, host=HOST, port=PORT)
@@ -0,0 +1,174 @@
+"""
+Registro de estimadores
+
+Cada classificador disponível para o treino é descrito por um
+EstimatorSpec: a classe do sklearn, os parâmetros (dicionários de
+config.py, lidos a cada treino) e o que ele suporta (entrada esparsa,
+re-treino incremental e categóricas nativas).
+"""
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.base import ClassifierMixin
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    HistGradientBoostingClassifier,
+    RandomForestClassifier
+)
+from sklearn.inspection import permutation_importance
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from app import schema
+from app.config import (
+    EXTRA_TREES_PARAMS,
+    HIST_GRADIENT_BOOSTING_PARAMS,
+    LOGISTIC_REGRESSION_PARAMS,
+    PREPROCESSING_MODE,
+    RANDOM_FOREST_PARAMS
+)
+
+# Linhas usadas na importância por permutação (estimadores sem
+# feature_importances_ nem coef_)
+PERMUTATION_SAMPLE_ROWS = 2000
+
+
+class EstimatorSpec:
+    """
+    Definição de um estimador do registro
+
+    Attributes:
+        name: Nome usado na config e no pedido de treino
+        factory: Classe do sklearn
+        params: Parâmetros (o mesmo dicionário de config.py)
+        sparse_input: Aceita a saída CSR do modo sparse
+        incremental: Suporta o re-treino warm_start (floresta de árvores)
+        native_categorical: Trata as colunas do modo ordinal como categóricas
+        default_preprocessing: Modo usado quando o treino não escolhe um
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[..., ClassifierMixin],
+        params: Dict[str, Any],
+        sparse_input: bool = True,
+        incremental: bool = False,
+        native_categorical: bool = False,
+        default_preprocessing: Optional[str] = None
+    ):
+        self.name = name
+        self.factory = factory
+        self.params = params
+        self.sparse_input = sparse_input
+        self.incremental = incremental
+        self.native_categorical = native_categorical
+        self.default_preprocessing = default_preprocessing
+
+    def resolve_preprocessing(self, preprocessing: Optional[str] = None) -> str:
+        """
+        Modo de pré-processamento do treino
+
+        Raises:
+            ValueError: Se o estimador não aceitar o modo escolhido
+        """
+        mode = preprocessing or self.default_preprocessing or PREPROCESSING_MODE
+        if mode == "sparse" and not self.sparse_input:
+            raise ValueError(f"{self.name} não aceita preprocessing sparse")
+        return mode
+
+    def build(self, preprocessing: str, X: Optional[pd.DataFrame] = None) -> ClassifierMixin:
+        """
+        Cria o classificador
+
+        Args:
+            preprocessing: Modo de pré-processamento do pipeline
+            X: Features de treino; no modo ordinal, as categóricas com
+                cardinalidade suportada viram categóricas nativas
+        """
+        params = dict(self.params)
+        if self.native_categorical and preprocessing == "ordinal" and X is not None:
+            # Códigos precisam ficar abaixo de max_bins; acima disso a
+            # coluna segue como numérica (código ordinal)
+            max_bins = params.get("max_bins", 255)
+            categorical = [
+                X[name].nunique() < max_bins for name in schema.categorical_features()
+            ]
+            if any(categorical):
+                params["categorical_features"] = (
+                    [False] * len(schema.numerical_features()) + categorical
+                )
+        return self.factory(**params)
+
+
+ESTIMATORS: Dict[str, EstimatorSpec] = {
+    spec.name: spec for spec in [
+        EstimatorSpec(
+            "random_forest", RandomForestClassifier, RANDOM_FOREST_PARAMS, incremental=True
+        ),
+        EstimatorSpec(
+            "extra_trees", ExtraTreesClassifier, EXTRA_TREES_PARAMS, incremental=True
+        ),
+        EstimatorSpec(
+            "hist_gradient_boosting", HistGradientBoostingClassifier,
+            HIST_GRADIENT_BOOSTING_PARAMS, sparse_input=False, native_categorical=True,
+            default_preprocessing="ordinal"
+        ),
+        EstimatorSpec(
+            "logistic_regression", LogisticRegression, LOGISTIC_REGRESSION_PARAMS
+        ),
+    ]
+}
+
+ESTIMATOR_NAMES: List[str] = list(ESTIMATORS)
+
+
+def get_estimator(name: str) -> EstimatorSpec:
+    """
+    Estimador do registro pelo nome
+
+    Raises:
+        ValueError: Se o nome não estiver no registro
+    """
+    spec = ESTIMATORS.get(name)
+    if spec is None:
+        raise ValueError(f"estimator deve ser um de {ESTIMATOR_NAMES}")
+    return spec
+
+
+def estimator_name(classifier: ClassifierMixin) -> str:
+    """Nome no registro de um classificador treinado (modelos antigos incluídos)"""
+    for spec in ESTIMATORS.values():
+        if type(classifier) is spec.factory:
+            return spec.name
+    return type(classifier).__name__
+
+
+def feature_importances(
+    model: Pipeline,
+    X: pd.DataFrame,
+    y: pd.Series,
+    random_state: int = 42
+) -> np.ndarray:
+    """
+    Importância de cada coluna transformada, normalizada para somar 1
+
+    Usa feature_importances_ (árvores), |coef_| (modelos lineares) ou
+    importância por permutação em uma amostra de X (demais estimadores).
+    """
+    classifier = model.named_steps["classifier"]
+    importances = getattr(classifier, "feature_importances_", None)
+    if importances is None and hasattr(classifier, "coef_"):
+        importances = np.abs(classifier.coef_[0])
+    if importances is None:
+        Xt = model.named_steps["preprocessor"].transform(X.head(PERMUTATION_SAMPLE_ROWS))
+        result = permutation_importance(
+            classifier, Xt, y.head(PERMUTATION_SAMPLE_ROWS),
+            n_repeats=3, random_state=random_state
+        )
+        importances = np.clip(result.importances_mean, 0, None)
+
+    importances = np.asarray(importances, dtype=np.float64)
+    total = importances.sum()
+    return importances / total if total > 0 else importances
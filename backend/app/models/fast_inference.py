@@ -0,0 +1,353 @@
+"""
+Motor de inferência compilado (caminho rápido para poucas linhas)
+
+Para uma única linha, Pipeline.predict_proba gasta a maior parte do tempo
+com overhead de pandas/sklearn (seleção de colunas do ColumnTransformer,
+OneHotEncoder denso, validação de entrada). Este módulo pré-calcula os
+parâmetros do pré-processamento (one-hot ou ordinal) e exporta as árvores
+da floresta para arrays NumPy planos, permitindo pontuar dicionários sem
+montar DataFrame.
+
+O motor pode ser salvo em um diretório (arrays em .npy sem compressão e
+parâmetros em JSON) e carregado com mmap: vários workers passam a ler as
+mesmas páginas do cache do sistema operacional em vez de cada um ter sua
+cópia da floresta.
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledPreprocessor:
+    """
+    Equivalente do ColumnTransformer (StandardScaler + OneHotEncoder ou
+    OrdinalEncoder)
+    
+    A saída segue a mesma ordem de colunas do ColumnTransformer:
+    numéricas padronizadas seguidas das colunas one-hot (encoding="onehot")
+    ou de uma coluna de código por categórica (encoding="ordinal").
+    """
+    
+    def __init__(
+        self,
+        numerical_features: List[str],
+        means: np.ndarray,
+        scales: np.ndarray,
+        categorical_features: List[str],
+        category_maps: List[Dict[Any, int]],
+        n_outputs: int,
+        encoding: str = "onehot",
+        unknown_value: float = -1
+    ):
+        self.numerical_features = numerical_features
+        self.means = means
+        self.scales = scales
+        self.categorical_features = categorical_features
+        self.category_maps = category_maps
+        self.n_outputs = n_outputs
+        self.encoding = encoding
+        self.unknown_value = unknown_value
+    
+    @classmethod
+    def from_column_transformer(
+        cls, preprocessor: ColumnTransformer
+    ) -> Optional["CompiledPreprocessor"]:
+        """Compila um ColumnTransformer treinado (ou None se não suportado)"""
+        transformers = {name: (step, cols) for name, step, cols in preprocessor.transformers_}
+        if set(transformers) - {"num", "cat", "remainder"}:
+            return None
+        
+        scaler, numerical = transformers.get("num", (None, []))
+        encoder, categorical = transformers.get("cat", (None, []))
+        numerical, categorical = list(numerical), list(categorical)
+        
+        if numerical and not isinstance(scaler, StandardScaler):
+            return None
+        if categorical and not isinstance(encoder, (OneHotEncoder, OrdinalEncoder)):
+            return None
+        if isinstance(encoder, OrdinalEncoder) and encoder.encoded_missing_value != encoder.unknown_value:
+            # Faltantes e desconhecidas precisam do mesmo código
+            return None
+        
+        means = np.zeros(len(numerical))
+        scales = np.ones(len(numerical))
+        if numerical:
+            if scaler.mean_ is not None:
+                means = np.asarray(scaler.mean_, dtype=np.float64)
+            if scaler.scale_ is not None:
+                scales = np.asarray(scaler.scale_, dtype=np.float64)
+        
+        if isinstance(encoder, OrdinalEncoder):
+            # Mapear cada categoria para o seu código
+            category_maps = [
+                {category: i for i, category in enumerate(categories)}
+                for categories in encoder.categories_
+            ]
+            return cls(
+                numerical, means, scales, categorical, category_maps,
+                len(numerical) + len(categorical), "ordinal", float(encoder.unknown_value)
+            )
+        
+        # Mapear cada categoria para o índice da sua coluna one-hot na saída
+        category_maps = []
+        offset = len(numerical)
+        if categorical:
+            for categories in encoder.categories_:
+                category_maps.append(
+                    {category: offset + i for i, category in enumerate(categories)}
+                )
+                offset += len(categories)
+        
+        return cls(numerical, means, scales, categorical, category_maps, offset)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Parâmetros em formato JSON (categorias na ordem das colunas one-hot / códigos)"""
+        return {
+            "numerical_features": self.numerical_features,
+            "means": self.means.tolist(),
+            "scales": self.scales.tolist(),
+            "categorical_features": self.categorical_features,
+            "categories": [
+                [c.item() if isinstance(c, np.generic) else c for c in mapping]
+                for mapping in self.category_maps
+            ],
+            "encoding": self.encoding,
+            "unknown_value": self.unknown_value
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompiledPreprocessor":
+        numerical = data["numerical_features"]
+        # Motores salvos antes do modo ordinal não têm "encoding"
+        encoding = data.get("encoding", "onehot")
+        if encoding == "ordinal":
+            category_maps = [
+                {category: i for i, category in enumerate(categories)}
+                for categories in data["categories"]
+            ]
+            offset = len(numerical) + len(category_maps)
+        else:
+            category_maps = []
+            offset = len(numerical)
+            for categories in data["categories"]:
+                category_maps.append({category: offset + i for i, category in enumerate(categories)})
+                offset += len(categories)
+        
+        return cls(
+            numerical,
+            np.asarray(data["means"], dtype=np.float64),
+            np.asarray(data["scales"], dtype=np.float64),
+            data["categorical_features"],
+            category_maps,
+            offset,
+            encoding,
+            data.get("unknown_value", -1)
+        )
+    
+    def transform_records(self, rows: List[Dict[str, Any]]) -> np.ndarray:
+        """Transforma uma lista de dicionários na matriz de features"""
+        X = np.zeros((len(rows), self.n_outputs), dtype=np.float64)
+        n_num = len(self.numerical_features)
+        
+        if self.encoding == "ordinal":
+            for i, row in enumerate(rows):
+                for j, name in enumerate(self.numerical_features):
+                    X[i, j] = row[name]
+                for j, (name, mapping) in enumerate(
+                    zip(self.categorical_features, self.category_maps), start=n_num
+                ):
+                    X[i, j] = mapping.get(row[name], self.unknown_value)
+            if n_num:
+                X[:, :n_num] = (X[:, :n_num] - self.means) / self.scales
+            return X
+        
+        for i, row in enumerate(rows):
+            for j, name in enumerate(self.numerical_features):
+                X[i, j] = row[name]
+            for name, mapping in zip(self.categorical_features, self.category_maps):
+                # Categoria desconhecida: todas as colunas zeradas
+                # (equivalente a handle_unknown="ignore")
+                index = mapping.get(row[name])
+                if index is not None:
+                    X[i, index] = 1.0
+        
+        if n_num:
+            X[:, :n_num] = (X[:, :n_num] - self.means) / self.scales
+        return X
+
+
+class CompiledForest:
+    """
+    Floresta de decisão exportada para arrays planos
+    
+    Os nós de todas as árvores ficam concatenados; as folhas apontam para
+    si mesmas, de modo que a travessia vetorizada pode rodar um número
+    fixo de passos (a profundidade máxima) para todas as linhas e árvores.
+    """
+    
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children_left: np.ndarray,
+        children_right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+    
+    @classmethod
+    def from_estimator(
+        cls, forest: Union[RandomForestClassifier, ExtraTreesClassifier]
+    ) -> Optional["CompiledForest"]:
+        """Exporta as árvores de uma floresta treinada (ou None se não suportada)"""
+        if not isinstance(forest, (RandomForestClassifier, ExtraTreesClassifier)):
+            return None
+        if forest.n_outputs_ != 1:
+            return None
+        
+        # Probabilidade da classe positivo (atrasado = 1)
+        positive = int(np.flatnonzero(forest.classes_ == 1)[0])
+        
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+            
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+            
+            counts = tree.value[:, 0, :]
+            proba = counts[:, positive] / counts.sum(axis=1)
+            
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(proba)
+            roots.append(offset)
+            
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+        
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children_left=np.concatenate(lefts).astype(np.intp),
+            children_right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth
+        )
+    
+    ARRAYS = ("feature", "threshold", "children_left", "children_right", "value", "roots")
+    
+    def save(self, directory: Path):
+        """Salva cada array em um .npy sem compressão (carregável com mmap)"""
+        for name in self.ARRAYS:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+    
+    @classmethod
+    def load(cls, directory: Path, max_depth: int, mmap_mode: Optional[str] = "r") -> "CompiledForest":
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+            for name in cls.ARRAYS
+        }
+        return cls(max_depth=max_depth, **arrays)
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Probabilidade da classe positiva (média das árvores)"""
+        # As árvores do sklearn comparam em float32
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+        
+        return self.value[nodes].mean(axis=1)
+
+
+class FastInferenceEngine:
+    """Pré-processamento + floresta compilados, sem DataFrame"""
+    
+    def __init__(self, preprocessor: CompiledPreprocessor, forest: CompiledForest):
+        self.preprocessor = preprocessor
+        self.forest = forest
+    
+    @classmethod
+    def from_pipeline(cls, pipeline: Pipeline) -> Optional["FastInferenceEngine"]:
+        """
+        Compila um Pipeline treinado
+        
+        Returns:
+            Motor compilado, ou None se o pipeline não for suportado
+        """
+        try:
+            preprocessor = CompiledPreprocessor.from_column_transformer(
+                pipeline.named_steps["preprocessor"]
+            )
+            forest = CompiledForest.from_estimator(pipeline.named_steps["classifier"])
+        except Exception as e:
+            logger.warning(f"Não foi possível compilar o modelo: {e}")
+            return None
+        
+        if preprocessor is None or forest is None:
+            return None
+        return cls(preprocessor, forest)
+    
+    def save(self, directory: Path):
+        """Salva o motor em um diretório (engine.json + arrays da floresta)"""
+        directory.mkdir(parents=True, exist_ok=True)
+        self.forest.save(directory)
+        params = {
+            "preprocessor": self.preprocessor.to_dict(),
+            "max_depth": int(self.forest.max_depth)
+        }
+        with open(directory / "engine.json", "w", encoding="utf-8") as f:
+            json.dump(params, f, ensure_ascii=False)
+    
+    @classmethod
+    def load(cls, directory: Path, mmap_mode: Optional[str] = "r") -> "FastInferenceEngine":
+        """
+        Carrega um motor salvo por save
+        
+        Com mmap_mode="r" os arrays da floresta não são copiados para a
+        memória do processo; as páginas são lidas sob demanda e
+        compartilhadas entre processos.
+        """
+        with open(directory / "engine.json", encoding="utf-8") as f:
+            params = json.load(f)
+        return cls(
+            CompiledPreprocessor.from_dict(params["preprocessor"]),
+            CompiledForest.load(directory, params["max_depth"], mmap_mode)
+        )
+    
+    def predict_proba(self, rows: List[Dict[str, Any]]) -> np.ndarray:
+        """Probabilidade de atraso para cada dicionário"""
+        return self.forest.predict_proba(self.preprocessor.transform_records(rows))
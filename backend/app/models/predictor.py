@@ -1,16 +1,32 @@
 """
 Modelo preditor de atraso de entregas
+
+O modelo em uso fica em DelayPredictor.active, um LoadedModel que não é
+alterado depois de publicado. Treino, promoção e rollback montam e aquecem
+um LoadedModel novo e só então trocam a referência, de modo que uma
+predição em andamento nunca vê pipeline e metadados de versões diferentes.
 """
+import copy
+import hashlib
 import joblib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from joblib import parallel_config
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Tuple, Dict, Any, Optional, List
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.compose import ColumnTransformer
+from typing import Tuple, Dict, Any, Optional, List, Callable
 from sklearn.pipeline import Pipeline
-from sklearn.model_selection import train_test_split
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import (
+    GridSearchCV,
+    HalvingGridSearchCV,
+    StratifiedKFold,
+    train_test_split
+)
 from sklearn.metrics import (
     accuracy_score, 
     roc_auc_score, 
@@ -21,44 +37,366 @@ from sklearn.metrics import (
 from app.config import (
     MODELS_DIR, 
     MODEL_FILENAME, 
-    RANDOM_FOREST_PARAMS,
-    VALID_DELAY_LABELS
+    ESTIMATOR,
+    MODEL_SAMPLE_ROWS,
+    VALID_DELAY_LABELS,
+    FAST_INFERENCE_ENABLED,
+    FAST_INFERENCE_MAX_ROWS,
+    FIT_N_JOBS,
+    PREDICT_N_JOBS,
+    PREPROCESSING_MODE,
+    SEARCH_CV_FOLDS,
+    SEARCH_HALVING_FACTOR,
+    SEARCH_METHODS,
+    SEARCH_N_JOBS,
+    SEARCH_PARAM_GRIDS,
+    SEARCH_SCORING,
+    SERIAL_PREDICT_THRESHOLD
+)
+from app import schema
+from app.models import estimators
+from app.models.fast_inference import FastInferenceEngine
+from app.models.registry import ModelRegistry, increment_version, model_registry
+from app.utils.cache import PredictionCache
+from app.utils.metrics import (
+    MODEL_LOAD_SECONDS,
+    PREDICT_STAGE_SECONDS,
+    PREDICTED_ROWS_TOTAL,
+    PREDICTION_BATCH_ROWS,
+    StageTimer
 )
 from app.utils.validator import CSVValidator
 
+logger = logging.getLogger(__name__)
+
+
+class LoadedModel:
+    """
+    Modelo pronto para servir: pipeline, metadados e motor compilado
+    
+    Depois de publicado em DelayPredictor.active não é mais alterado; um
+    novo treino cria outra instância. Carregado do registro com motor
+    compilado, o pipeline sklearn só é lido do disco quando necessário
+    (lotes grandes ou re-treino incremental).
+    """
+    
+    def __init__(
+        self,
+        model: Optional[Pipeline],
+        version: str,
+        categorical_features: List[str],
+        numerical_features: List[str],
+        training_date: Optional[str] = None,
+        feature_importances: Optional[Dict[str, float]] = None,
+        last_metrics: Optional[Dict[str, Any]] = None,
+        sample_rows: Optional[List[Dict[str, Any]]] = None,
+        model_loader: Optional[Callable[[], Pipeline]] = None,
+        preprocessing: str = "dense",
+        estimator: str = "random_forest"
+    ):
+        self._model = model
+        self._model_loader = model_loader
+        self._model_lock = threading.Lock()
+        self.version = version
+        self.categorical_features = categorical_features
+        self.numerical_features = numerical_features
+        self.training_date = training_date
+        self.feature_importances = feature_importances or {}
+        self.last_metrics = last_metrics
+        self.sample_rows = sample_rows or []
+        self.preprocessing = preprocessing
+        self.estimator = estimator
+        self.fast_engine: Optional[FastInferenceEngine] = None
+        # Valores derivados dos atributos acima, calculados sob demanda
+        self._derived: Dict[str, Any] = {}
+    
+    @classmethod
+    def from_state(cls, model_data: Dict[str, Any]) -> "LoadedModel":
+        """Monta e aquece um modelo a partir de um estado exportado por to_state"""
+        loaded = cls(
+            model=model_data["model"],
+            version=model_data.get("version", "1.0.0"),
+            categorical_features=model_data.get("categorical_features", []),
+            numerical_features=model_data.get("numerical_features", []),
+            training_date=model_data.get("training_date"),
+            feature_importances=model_data.get("feature_importances"),
+            last_metrics=model_data.get("last_metrics"),
+            sample_rows=model_data.get("sample_rows"),
+            # Modelos salvos antes dos modos de pré-processamento usam one-hot denso
+            preprocessing=model_data.get("preprocessing", "dense"),
+            estimator=model_data.get("estimator")
+            or estimators.estimator_name(model_data["model"].named_steps["classifier"])
+        )
+        loaded.prepare()
+        return loaded
+    
+    @classmethod
+    def from_artifact(cls, registry: ModelRegistry, version: str) -> "LoadedModel":
+        """
+        Monta um modelo a partir de uma versão do registro
+        
+        Com motor compilado salvo, usa os arrays mapeados do disco e adia a
+        leitura de model.pkl; o motor foi conferido contra o pipeline ao
+        ser salvo. Versões sem motor carregam o estado completo.
+        """
+        meta = registry.meta(version)
+        serving = meta.get("serving")
+        engine = registry.load_engine(version) if FAST_INFERENCE_ENABLED and serving else None
+        if engine is None:
+            return cls.from_state(registry.load(version))
+        
+        loaded = cls(
+            model=None,
+            version=version,
+            categorical_features=serving["categorical_features"],
+            numerical_features=serving["numerical_features"],
+            training_date=meta.get("training_date"),
+            feature_importances=serving["feature_importances"],
+            last_metrics=meta.get("metrics"),
+            sample_rows=serving["sample_rows"],
+            model_loader=lambda: registry.load(version)["model"],
+            preprocessing=meta.get("preprocessing", "dense"),
+            estimator=meta.get("estimator", "random_forest")
+        )
+        loaded.fast_engine = engine
+        # Aquecer: lê as páginas da floresta usadas pelas linhas de amostra
+        if loaded.sample_rows:
+            engine.predict_proba(loaded.sample_rows)
+        return loaded
+    
+    @property
+    def model(self) -> Pipeline:
+        """Pipeline sklearn (lido do registro no primeiro uso, se adiado)"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    model = self._model_loader()
+                    self._apply_predict_parallelism(model)
+                    self._model = model
+        return self._model
+    
+    def to_state(self) -> Dict[str, Any]:
+        """
+        Exporta o estado do modelo (pipeline + metadados)
+        
+        Usado para persistir o modelo e para transferi-lo entre processos.
+        """
+        return {
+            "model": self.model,
+            "version": self.version,
+            "training_date": self.training_date,
+            "categorical_features": self.categorical_features,
+            "numerical_features": self.numerical_features,
+            "feature_importances": self.feature_importances,
+            "last_metrics": self.last_metrics,
+            "sample_rows": self.sample_rows,
+            "preprocessing": self.preprocessing,
+            "estimator": self.estimator
+        }
+    
+    def prepare(self, sample_rows: Optional[List[Dict[str, Any]]] = None):
+        """
+        Deixa o modelo pronto para servir antes da publicação
+        
+        Desacopla o n_jobs de treino do de predição, compila o motor rápido
+        e aquece os dois caminhos pontuando as linhas de amostra.
+        """
+        self._apply_predict_parallelism(self.model)
+        rows = sample_rows or self.sample_rows
+        expected = self.predict_proba(pd.DataFrame(rows)) if rows else None
+        self._build_fast_engine(rows, expected)
+    
+    @staticmethod
+    def _apply_predict_parallelism(model: Pipeline):
+        """
+        Desacopla o n_jobs de treino do n_jobs de predição
+        
+        Com n_jobs=None o classificador usa o valor definido por
+        parallel_config em predict_proba, escolhido por tamanho de lote.
+        """
+        classifier = model.named_steps["classifier"]
+        if "n_jobs" in classifier.get_params():
+            classifier.set_params(n_jobs=None)
+    
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Probabilidade de atraso via pipeline, aplicando a política de paralelismo
+        
+        Lotes pequenos rodam de forma serial; lotes grandes usam PREDICT_N_JOBS.
+        """
+        n_jobs = PREDICT_N_JOBS if len(df) >= SERIAL_PREDICT_THRESHOLD else 1
+        model = self.model
+        with parallel_config(n_jobs=n_jobs):
+            # Mesmo que Pipeline.predict_proba, com os dois estágios medidos
+            start = time.perf_counter()
+            Xt = df
+            for _, step in model.steps[:-1]:
+                Xt = step.transform(Xt)
+            transformed = time.perf_counter()
+            proba = model.steps[-1][1].predict_proba(Xt)[:, 1]
+        
+        PREDICT_STAGE_SECONDS.observe(transformed - start, "preprocess")
+        PREDICT_STAGE_SECONDS.observe(time.perf_counter() - transformed, "classifier")
+        return proba
+    
+    def score_records(self, rows: List[Dict[str, Any]], use_engine: bool = True) -> np.ndarray:
+        """
+        Probabilidade de atraso para linhas em dicionário
+        
+        Usa o motor compilado quando disponível (e use_engine); senão monta
+        um único DataFrame e faz uma única passada pelo pipeline. Lotes com
+        numéricos não finitos também vão para o pipeline: o motor sempre
+        manda NaN para o filho direito, e o sklearn tem roteamento próprio
+        de faltantes.
+        """
+        engine = self.fast_engine
+        if engine is not None and use_engine:
+            # Caminho rápido: sem DataFrame nem validação do sklearn
+            start = time.perf_counter()
+            X = engine.preprocessor.transform_records(rows)
+            if np.isfinite(X).all():
+                transformed = time.perf_counter()
+                proba = engine.forest.predict_proba(X)
+                PREDICT_STAGE_SECONDS.observe(transformed - start, "engine_preprocess")
+                PREDICT_STAGE_SECONDS.observe(time.perf_counter() - transformed, "engine_forest")
+                PREDICTED_ROWS_TOTAL.inc("engine", amount=len(rows))
+                return proba
+        
+        start = time.perf_counter()
+        df = pd.DataFrame(rows)
+        PREDICT_STAGE_SECONDS.observe(time.perf_counter() - start, "dataframe")
+        PREDICTED_ROWS_TOTAL.inc("pipeline", amount=len(rows))
+        return self.predict_proba(df)
+    
+    def _build_fast_engine(
+        self,
+        sample_rows: Optional[List[Dict[str, Any]]] = None,
+        expected: Optional[np.ndarray] = None
+    ):
+        """
+        Compila o motor de inferência rápido a partir do pipeline
+        
+        Se uma amostra for fornecida, o motor só é usado se reproduzir as
+        probabilidades do pipeline dentro da tolerância numérica.
+        """
+        self.fast_engine = None
+        if not FAST_INFERENCE_ENABLED:
+            return
+        
+        engine = FastInferenceEngine.from_pipeline(self.model)
+        if engine is None:
+            return
+        
+        if sample_rows:
+            if not np.allclose(engine.predict_proba(sample_rows), expected, atol=1e-9):
+                logger.warning("Motor compilado divergiu do pipeline; usando o pipeline")
+                return
+        
+        self.fast_engine = engine
+    
+    def derived(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Valor calculado uma vez por modelo (ex.: importâncias ordenadas)
+        
+        Só deve ser usado depois de publicado, quando os atributos não
+        mudam mais; chamadas concorrentes podem calcular o mesmo valor
+        duas vezes, sem efeito além do custo.
+        """
+        value = self._derived.get(key)
+        if value is None:
+            value = compute()
+            self._derived[key] = value
+        return value
+    
+    def n_trees(self) -> Optional[int]:
+        """Quantidade de árvores do classificador (None se não for um ensemble)"""
+        estimators = getattr(self.model.named_steps["classifier"], "estimators_", None)
+        return len(estimators) if estimators is not None else None
+
+
+class PreparedData:
+    """
+    Split de treino/teste e matriz de treino já pré-processada
+    
+    Montado por DelayPredictor.prepare_data; o pré-processador ajustado
+    entra sem novo fit no pipeline de cada modelo treinado sobre ele.
+    """
+    
+    def __init__(
+        self,
+        X_train: pd.DataFrame,
+        X_test: pd.DataFrame,
+        y_train: pd.Series,
+        y_test: pd.Series,
+        preprocessor: Any,
+        Xt_train: Any,
+        preprocessing: str
+    ):
+        self.X_train = X_train
+        self.X_test = X_test
+        self.y_train = y_train
+        self.y_test = y_test
+        self.preprocessor = preprocessor
+        self.Xt_train = Xt_train
+        self.preprocessing = preprocessing
+
 
 class DelayPredictor:
     """
-    Modelo de predição de atraso de entregas usando RandomForest
+    Modelo de predição de atraso de entregas (classificador do registro de
+    estimadores; RandomForest por padrão)
     """
     
     def __init__(self):
-        self.model: Optional[Pipeline] = None
-        self.categorical_features: List[str] = []
-        self.numerical_features: List[str] = []
+        self.active: Optional[LoadedModel] = None
         self.validator = CSVValidator()
-        self.is_trained = False
-        self.version = "0.0.0"
-        self.training_date: Optional[str] = None
-        self.feature_importances_: Optional[Dict[str, float]] = None
-        self.last_metrics: Optional[Dict[str, float]] = None
+        self.cache = PredictionCache()
+        # Serializa promoções/rollbacks; predições não usam o lock
+        self._swap_lock = threading.Lock()
+    
+    # Atalhos de leitura do modelo ativo
+    @property
+    def is_trained(self) -> bool:
+        return self.active is not None
+    
+    @property
+    def model(self) -> Optional[Pipeline]:
+        active = self.active
+        return active.model if active else None
+    
+    @property
+    def fast_engine(self) -> Optional[FastInferenceEngine]:
+        active = self.active
+        return active.fast_engine if active else None
+    
+    @property
+    def version(self) -> str:
+        active = self.active
+        return active.version if active else "0.0.0"
+    
+    @property
+    def training_date(self) -> Optional[str]:
+        active = self.active
+        return active.training_date if active else None
+    
+    @property
+    def last_metrics(self) -> Optional[Dict[str, Any]]:
+        active = self.active
+        return active.last_metrics if active else None
+    
+    @property
+    def preprocessing(self) -> str:
+        active = self.active
+        return active.preprocessing if active else PREPROCESSING_MODE
+    
+    @property
+    def estimator(self) -> str:
+        active = self.active
+        return active.estimator if active else ESTIMATOR
     
     def _get_feature_columns(self, df: pd.DataFrame) -> Tuple[List[str], List[str]]:
-        """Extrai colunas categóricas e numéricas do DataFrame"""
-        # Remover colunas que não são features
-        exclude_cols = ["freight_description", "delay_label"]
-        feature_cols = [col for col in df.columns if col not in exclude_cols]
-        
-        categorical = []
-        numerical = []
-        
-        for col in feature_cols:
-            if df[col].dtype == "object":
-                categorical.append(col)
-            else:
-                numerical.append(col)
-        
-        return categorical, numerical
+        """Colunas categóricas e numéricas do modelo (definidas pelo schema)"""
+        return schema.categorical_features(), schema.numerical_features()
     
     def _prepare_target(self, df: pd.DataFrame) -> pd.Series:
         """Converte delay_label para binário"""
@@ -66,17 +404,21 @@ class DelayPredictor:
         return (df["delay_label"] == "atrasado").astype(int)
     
     def _prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Prepara as features para o modelo"""
-        # Remover colunas que não são features
-        exclude_cols = ["freight_description", "delay_label"]
-        feature_cols = [col for col in df.columns if col not in exclude_cols]
-        return df[feature_cols].copy()
+        """Prepara as features para o modelo (colunas extras são ignoradas)"""
+        return df[schema.feature_columns()].copy()
     
     def train(
         self, 
         df: pd.DataFrame, 
         test_size: float = 0.2,
-        random_state: int = 42
+        random_state: int = 42,
+        progress: Optional[Callable[[str], None]] = None,
+        validated: bool = False,
+        version: Optional[str] = None,
+        timer: Optional[StageTimer] = None,
+        preprocessing: Optional[str] = None,
+        estimator: Optional[str] = None,
+        prepared: Optional["PreparedData"] = None
     ) -> Dict[str, Any]:
         """
         Treina o modelo com os dados fornecidos
@@ -85,102 +427,486 @@ class DelayPredictor:
             df: DataFrame com os dados de treino
             test_size: Proporção dos dados para teste
             random_state: Semente aleatória
+            progress: Callback chamado a cada estágio do treino (opcional)
+            validated: Dados já validados na ingestão (pula a validação)
+            version: Versão do novo modelo (padrão: próxima após a atual)
+            timer: Acumula a duração de cada estágio (opcional)
+            preprocessing: Codificação das categóricas (ver
+                PREPROCESSING_MODES; padrão: a do estimador ou
+                PREPROCESSING_MODE)
+            estimator: Classificador do registro de estimadores (padrão:
+                ESTIMATOR)
+            prepared: Split e matriz já pré-processada (ver prepare_data);
+                pula o split e o ajuste do pré-processador
             
         Returns:
             Dicionário com métricas e informações do treino
         """
+        progress = progress or (lambda stage: None)
+        timer = timer or StageTimer()
+        spec = estimators.get_estimator(estimator or ESTIMATOR)
+        preprocessing = spec.resolve_preprocessing(preprocessing)
+        
         # Validar dados
-        is_valid, errors, warnings = self.validator.validate_csv(df)
-        if not is_valid:
-            raise ValueError(f"Erros de validação: {errors}")
+        progress("validating")
+        warnings: List[str] = []
+        if not validated:
+            with timer("validate"):
+                is_valid, errors, warnings = self.validator.validate_csv(df)
+            if not is_valid:
+                raise ValueError(f"Erros de validação: {errors}")
         
         # Identificar colunas
-        self.categorical_features, self.numerical_features = self._get_feature_columns(df)
+        categorical_features, numerical_features = self._get_feature_columns(df)
+        
+        # Dividir dados e ajustar o pré-processador (ou reaproveitar)
+        progress("fitting")
+        if prepared is None:
+            prepared = self.prepare_data(df, test_size, random_state, preprocessing, timer)
+        elif prepared.preprocessing != preprocessing:
+            raise ValueError("Matriz preparada com outro modo de pré-processamento")
         
-        # Preparar X e y
-        X = self._prepare_features(df)
-        y = self._prepare_target(df)
+        # Treinar o classificador sobre a matriz pré-processada
+        classifier = spec.build(preprocessing, prepared.X_train)
+        with timer("fit"):
+            classifier.fit(prepared.Xt_train, prepared.y_train)
         
-        # Dividir dados
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=random_state, stratify=y
+        # Pipeline com o pré-processador já ajustado
+        model = Pipeline([
+            ("preprocessor", prepared.preprocessor),
+            ("classifier", classifier)
+        ])
+        
+        candidate = LoadedModel(
+            model,
+            version or increment_version(self.version),
+            categorical_features,
+            numerical_features,
+            preprocessing=preprocessing,
+            estimator=spec.name
         )
+        with timer("evaluate"):
+            return self._evaluate(
+                candidate, prepared.X_train, prepared.X_test, prepared.y_test, warnings, progress
+            )
+    
+    def prepare_data(
+        self,
+        df: pd.DataFrame,
+        test_size: float = 0.2,
+        random_state: int = 42,
+        preprocessing: str = PREPROCESSING_MODE,
+        timer: Optional[StageTimer] = None
+    ) -> "PreparedData":
+        """
+        Divide os dados e ajusta o pré-processador na parte de treino
         
-        # Criar pré-processador
-        preprocessor = ColumnTransformer(
-            transformers=[
-                ("num", StandardScaler(), self.numerical_features),
-                ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), 
-                 self.categorical_features)
-            ]
+        O resultado depende só dos dados, de test_size, de random_state e
+        do modo de pré-processamento: pode ser reaproveitado por treinos
+        com outro estimador ou outros hiperparâmetros.
+        """
+        timer = timer or StageTimer()
+        with timer("split"):
+            X = self._prepare_features(df)
+            y = self._prepare_target(df)
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=test_size, random_state=random_state, stratify=y
+            )
+        
+        with timer("fit"):
+            preprocessor = schema.build_preprocessor(preprocessing)
+            Xt_train = preprocessor.fit_transform(X_train)
+        
+        return PreparedData(
+            X_train, X_test, y_train, y_test, preprocessor, Xt_train, preprocessing
         )
+    
+    def search(
+        self,
+        df: pd.DataFrame,
+        test_size: float = 0.2,
+        random_state: int = 42,
+        progress: Optional[Callable[[str], None]] = None,
+        version: Optional[str] = None,
+        timer: Optional[StageTimer] = None,
+        preprocessing: Optional[str] = None,
+        estimator: Optional[str] = None,
+        method: str = "grid",
+        param_grid: Optional[Dict[str, List[Any]]] = None,
+        cv_folds: int = SEARCH_CV_FOLDS,
+        prepared: Optional["PreparedData"] = None
+    ) -> Dict[str, Any]:
+        """
+        Treina com busca de hiperparâmetros e publica o melhor candidato
         
-        # Criar pipeline
-        self.model = Pipeline([
-            ("preprocessor", preprocessor),
-            ("classifier", RandomForestClassifier(**RANDOM_FOREST_PARAMS))
-        ])
+        O pré-processador é ajustado uma única vez na parte de treino e a
+        matriz transformada é compartilhada por todos os candidatos e folds
+        (o joblib a mapeia em memória nos processos do pool, em vez de
+        copiá-la). A avaliação final usa o mesmo holdout de train.
+        
+        Args:
+            df: DataFrame com os dados de treino (já validados)
+            test_size: Proporção dos dados reservada para o holdout
+            random_state: Semente aleatória (split e folds)
+            progress: Callback chamado a cada estágio do treino (opcional)
+            version: Versão do novo modelo (padrão: próxima após a atual)
+            timer: Acumula a duração de cada estágio (opcional)
+            preprocessing: Codificação das categóricas (ver train)
+            estimator: Classificador do registro de estimadores
+            method: "grid" (validação cruzada em toda a grade) ou "halving"
+                (successive halving: candidatos fracos saem com poucos dados)
+            param_grid: Grade de parâmetros do classificador (padrão:
+                SEARCH_PARAM_GRIDS do estimador)
+            cv_folds: Quantidade de folds da validação cruzada
+            prepared: Split e matriz já pré-processada (ver prepare_data)
+        
+        Returns:
+            Dicionário de train com "search": melhor candidato e leaderboard
+        """
+        progress = progress or (lambda stage: None)
+        timer = timer or StageTimer()
+        spec = estimators.get_estimator(estimator or ESTIMATOR)
+        preprocessing = spec.resolve_preprocessing(preprocessing)
+        if method not in SEARCH_METHODS:
+            raise ValueError(f"search deve ser um de {SEARCH_METHODS}")
+        param_grid = param_grid or SEARCH_PARAM_GRIDS.get(spec.name, {})
+        
+        progress("fitting")
+        categorical_features, numerical_features = self._get_feature_columns(df)
+        if prepared is None:
+            prepared = self.prepare_data(df, test_size, random_state, preprocessing, timer)
+        elif prepared.preprocessing != preprocessing:
+            raise ValueError("Matriz preparada com outro modo de pré-processamento")
+        
+        classifier = spec.build(preprocessing, prepared.X_train)
+        unknown = sorted(set(param_grid) - set(classifier.get_params()))
+        if unknown:
+            raise ValueError(f"Parâmetros desconhecidos para {spec.name}: {unknown}")
+        # O paralelismo fica entre candidatos, não dentro de cada fit
+        if "n_jobs" in classifier.get_params():
+            classifier.set_params(n_jobs=1)
+        
+        folds = StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=random_state)
+        if method == "halving":
+            searcher = HalvingGridSearchCV(
+                classifier, param_grid, factor=SEARCH_HALVING_FACTOR, cv=folds,
+                scoring=SEARCH_SCORING, n_jobs=SEARCH_N_JOBS, random_state=random_state
+            )
+        else:
+            searcher = GridSearchCV(
+                classifier, param_grid, cv=folds, scoring=SEARCH_SCORING, n_jobs=SEARCH_N_JOBS
+            )
         
-        # Treinar modelo
-        self.model.fit(X_train, y_train)
+        with timer("fit"):
+            searcher.fit(prepared.Xt_train, prepared.y_train)
         
-        # Fazer predições
-        y_pred = self.model.predict(X_test)
-        y_pred_proba = self.model.predict_proba(X_test)[:, 1]
+        best = searcher.best_estimator_
+        if "n_jobs" in best.get_params():
+            best.set_params(n_jobs=None)
+        model = Pipeline([("preprocessor", prepared.preprocessor), ("classifier", best)])
+        
+        candidate = LoadedModel(
+            model,
+            version or increment_version(self.version),
+            categorical_features,
+            numerical_features,
+            preprocessing=preprocessing,
+            estimator=spec.name
+        )
+        with timer("evaluate"):
+            result = self._evaluate(
+                candidate, prepared.X_train, prepared.X_test, prepared.y_test, [], progress
+            )
+        
+        result["search"] = {
+            "method": method,
+            "scoring": SEARCH_SCORING,
+            "cv_folds": cv_folds,
+            "n_candidates": len(searcher.cv_results_["params"]),
+            "best_params": searcher.best_params_,
+            "best_score": float(searcher.best_score_),
+            "leaderboard": self._leaderboard(searcher.cv_results_)
+        }
+        return result
+    
+    @staticmethod
+    def _leaderboard(cv_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Candidatos da busca ordenados pelo score médio da validação cruzada
+        
+        No successive halving cada candidato aparece uma vez, com o
+        resultado da última rodada que alcançou (iteration / n_resources).
+        """
+        rows: Dict[str, Dict[str, Any]] = {}
+        for i, params in enumerate(cv_results["params"]):
+            row = {
+                "params": params,
+                "mean_score": float(cv_results["mean_test_score"][i]),
+                "std_score": float(cv_results["std_test_score"][i]),
+                "mean_fit_seconds": round(float(cv_results["mean_fit_time"][i]), 4)
+            }
+            if "iter" in cv_results:
+                row["iteration"] = int(cv_results["iter"][i])
+                row["n_resources"] = int(cv_results["n_resources"][i])
+            # Rodadas posteriores do halving sobrescrevem as anteriores
+            rows[repr(sorted(params.items()))] = row
+        
+        leaderboard = sorted(
+            rows.values(),
+            key=lambda row: (-row.get("iteration", 0), -np.nan_to_num(row["mean_score"], nan=-1))
+        )
+        for rank, row in enumerate(leaderboard, start=1):
+            row["rank"] = rank
+        return leaderboard
+    
+    def warm_start_fit(
+        self,
+        df: pd.DataFrame,
+        n_new_trees: int,
+        max_trees: int,
+        test_size: float = 0.2,
+        random_state: int = 42,
+        progress: Optional[Callable[[str], None]] = None,
+        version: Optional[str] = None,
+        timer: Optional[StageTimer] = None
+    ) -> Dict[str, Any]:
+        """
+        Re-treino incremental: adiciona árvores treinadas só com os dados novos
+        
+        Trabalha sobre uma cópia do pipeline ativo. O pré-processador
+        ajustado no treino anterior é mantido (categorias novas são
+        ignoradas pelo OneHotEncoder ou viram o código de desconhecida no
+        modo ordinal). Quando a floresta passa de
+        max_trees, as árvores mais antigas são descartadas.
+        
+        Args:
+            df: DataFrame com os dados novos (já validados)
+            n_new_trees: Quantidade de árvores a adicionar
+            max_trees: Tamanho máximo da floresta
+            test_size: Proporção dos dados novos reservada para teste
+            random_state: Semente aleatória
+            progress: Callback chamado a cada estágio do treino (opcional)
+            version: Versão do novo modelo (padrão: próxima após a atual)
+            timer: Acumula a duração de cada estágio (opcional)
+            
+        Returns:
+            Dicionário com métricas e informações do treino
+        """
+        progress = progress or (lambda stage: None)
+        timer = timer or StageTimer()
+        
+        active = self.active
+        if active is None:
+            raise ValueError("Modelo não foi treinado ainda")
+        
+        spec = estimators.ESTIMATORS.get(active.estimator)
+        if spec is None or not spec.incremental:
+            raise ValueError(f"{active.estimator} não suporta re-treino incremental")
+        
+        model = copy.deepcopy(active.model)
+        classifier = model.named_steps["classifier"]
+        
+        progress("validating")
+        with timer("split"):
+            X = self._prepare_features(df)
+            y = self._prepare_target(df)
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=test_size, random_state=random_state, stratify=y
+            )
+        
+        # Ajustar apenas as árvores novas sobre as features já transformadas
+        progress("fitting")
+        with timer("fit"):
+            Xt_train = model.named_steps["preprocessor"].transform(X_train)
+            n_estimators = len(classifier.estimators_) + n_new_trees
+            classifier.set_params(
+                warm_start=True, n_estimators=n_estimators, n_jobs=FIT_N_JOBS
+            )
+            classifier.fit(Xt_train, y_train)
+            classifier.set_params(warm_start=False)
+        
+        if len(classifier.estimators_) > max_trees:
+            classifier.estimators_ = classifier.estimators_[-max_trees:]
+            classifier.set_params(n_estimators=max_trees)
+        
+        candidate = LoadedModel(
+            model,
+            version or increment_version(active.version),
+            active.categorical_features,
+            active.numerical_features,
+            preprocessing=active.preprocessing,
+            estimator=active.estimator
+        )
+        with timer("evaluate"):
+            return self._evaluate(candidate, X_train, X_test, y_test, [], progress)
+    
+    def _evaluate(
+        self,
+        candidate: LoadedModel,
+        X_train: pd.DataFrame,
+        X_test: pd.DataFrame,
+        y_test: pd.Series,
+        warnings: List[str],
+        progress: Callable[[str], None]
+    ) -> Dict[str, Any]:
+        """Avalia o pipeline recém-ajustado, completa os metadados e o publica"""
+        progress("evaluating")
+        
+        # Compilar o caminho rápido e conferir contra o pipeline, com a
+        # entrada no mesmo formato da predição (dicionários)
+        sample_rows = X_test.head(200).to_dict(orient="records")
+        candidate.sample_rows = sample_rows[:MODEL_SAMPLE_ROWS]
+        candidate.prepare(sample_rows)
+        
+        # Fazer predições (predict = classe com maior probabilidade)
+        y_pred_proba = candidate.predict_proba(X_test)
+        y_pred = (y_pred_proba > 0.5).astype(int)
         
         # Calcular métricas
         accuracy = accuracy_score(y_test, y_pred)
         auc = roc_auc_score(y_test, y_pred_proba)
         cm = confusion_matrix(y_test, y_pred)
         
-        # Feature importances (apenas das features numéricas + categorias do OneHot)
+        # Feature importances (features numéricas + categorias do OneHot, ou
+        # uma por feature categórica no modo ordinal)
         # Precisamos mapear de volta para nomes originais
         try:
             feature_names = (
-                self.numerical_features + 
-                list(self.model.named_steps["preprocessor"]
+                candidate.numerical_features + 
+                list(candidate.model.named_steps["preprocessor"]
                      .named_transformers_["cat"]
-                     .get_feature_names_out(self.categorical_features))
+                     .get_feature_names_out(candidate.categorical_features))
             )
-            importances = self.model.named_steps["classifier"].feature_importances_
-            self.feature_importances_ = dict(zip(feature_names, importances))
+            importances = estimators.feature_importances(candidate.model, X_test, y_test)
+            candidate.feature_importances = dict(zip(feature_names, importances))
         except:
-            self.feature_importances_ = {}
+            candidate.feature_importances = {}
+        
+        # Latência de predição no caminho usado pela API
+        latency = self._measure_latency(candidate, X_test)
         
         # Salvar métricas
-        self.last_metrics = {
+        candidate.last_metrics = {
             "accuracy": float(accuracy),
             "auc": float(auc),
             "confusion_matrix": cm.tolist(),
             "train_size": len(X_train),
             "test_size": len(X_test)
         }
+        candidate.training_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        # Marcar como treinado
-        self.is_trained = True
-        from datetime import datetime
-        self.training_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Incrementar versão
-        self._increment_version()
+        # Publicar o modelo completo
+        self.activate(candidate)
         
         return {
             "status": "success",
-            "metrics": self.last_metrics,
+            "metrics": candidate.last_metrics,
             "warnings": warnings,
-            "version": self.version,
-            "training_date": self.training_date,
-            "n_features": len(self.categorical_features) + len(self.numerical_features)
+            "version": candidate.version,
+            "training_date": candidate.training_date,
+            "n_features": len(candidate.categorical_features) + len(candidate.numerical_features),
+            "n_trees": candidate.n_trees(),
+            "preprocessing": candidate.preprocessing,
+            "estimator": candidate.estimator,
+            "latency": latency
         }
     
-    def _increment_version(self):
-        """Incrementa a versão do modelo"""
-        if self.version == "0.0.0":
-            self.version = "1.0.0"
-        else:
-            parts = self.version.split(".")
-            parts[-1] = str(int(parts[-1]) + 1)
-            self.version = ".".join(parts)
+    @staticmethod
+    def _measure_latency(
+        candidate: LoadedModel,
+        X_test: pd.DataFrame,
+        n_single: int = 50,
+        n_batch: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        Latência de predição do modelo recém-treinado (já aquecido)
+        
+        Returns:
+            Mediana de uma linha (ms), tempo de um lote (ms) e o caminho
+            usado ("engine" ou "pipeline")
+        """
+        rows = X_test.head(max(n_single, n_batch)).to_dict(orient="records")
+        
+        single = []
+        for row in rows[:n_single]:
+            start = time.perf_counter()
+            candidate.score_records([row])
+            single.append(time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        candidate.score_records(rows[:n_batch])
+        batch_seconds = time.perf_counter() - start
+        
+        return {
+            "single_row_ms": round(float(np.median(single)) * 1000, 3),
+            "batch_rows": len(rows[:n_batch]),
+            "batch_ms": round(batch_seconds * 1000, 3),
+            "path": "engine" if candidate.fast_engine is not None else "pipeline"
+        }
+    
+    def activate(self, loaded: LoadedModel):
+        """
+        Publica um modelo já preparado
+        
+        A troca é uma única atribuição: predições em andamento terminam com
+        o modelo anterior e as seguintes usam o novo. As entradas de cache
+        são por versão; o cache é esvaziado apenas para liberar memória.
+        """
+        self.active = loaded
+        self.cache.clear()
+    
+    def sync_with_registry(self) -> bool:
+        """
+        Carrega a versão ativa do registro se outro processo a trocou
+        
+        Returns:
+            True se o modelo em uso foi trocado
+        """
+        with self._swap_lock:
+            version = model_registry.active_version()
+            if version is None or version == self.version or not model_registry.exists(version):
+                return False
+            self.activate(self._load_version(version))
+        
+        logger.info(f"Modelo {version} carregado do registro")
+        return True
+    
+    def promote(self, version: Optional[str] = None, rollback: bool = False) -> str:
+        """
+        Coloca em uso uma versão do registro
+        
+        Args:
+            version: Versão a promover (ignorada no rollback)
+            rollback: Voltar para a versão ativa antes da atual
+            
+        Returns:
+            Versão ativada
+        """
+        with self._swap_lock:
+            if rollback:
+                version = model_registry.rollback_target()
+                if version is None:
+                    raise ValueError("Nenhuma versão anterior para rollback")
+            
+            loaded = self._load_version(version)
+            self.activate(loaded)
+            model_registry.set_active(version, rollback=rollback)
+        
+        logger.info(f"Modelo {version} em uso")
+        return version
+    
+    @staticmethod
+    def _load_version(version: str) -> LoadedModel:
+        """Carrega e aquece uma versão do registro, medindo o tempo de carga"""
+        with MODEL_LOAD_SECONDS.time("registry"):
+            return LoadedModel.from_artifact(model_registry, version)
+    
+    def _predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """Probabilidade de atraso via pipeline do modelo ativo"""
+        return self.active.predict_proba(df)
+    
+    def _n_trees(self) -> Optional[int]:
+        return self.active.n_trees() if self.active else None
     
     def predict(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -192,15 +918,71 @@ class DelayPredictor:
         Returns:
             Dicionário com probabilidade de atraso
         """
-        if not self.is_trained or self.model is None:
+        # Ler o modelo ativo uma única vez: a predição inteira usa a mesma versão
+        active = self.active
+        if active is None:
             raise ValueError("Modelo não foi treinado ainda")
         
-        # Converter para DataFrame
-        df = pd.DataFrame([data])
+        key = self._cache_key(data, active)
+        cached = self.cache.get(key)
+        if cached is not None:
+            PREDICTED_ROWS_TOTAL.inc("cache")
+            return cached
+        
+        probability = active.score_records([data])[0]
+        
+        result = self._build_result(probability)
+        self.cache.set(key, result)
+        return result
+    
+    def predict_batch(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Faz predição para vários fretes com uma única chamada a predict_proba
+        
+        Args:
+            rows: Lista de dicionários com os dados dos fretes
+            
+        Returns:
+            Lista de resultados, na mesma ordem da entrada
+        """
+        active = self.active
+        if active is None:
+            raise ValueError("Modelo não foi treinado ainda")
+        
+        if not rows:
+            return []
+        PREDICTION_BATCH_ROWS.observe(len(rows))
+        
+        # Consultar o cache e enviar ao modelo apenas as linhas faltantes
+        start = time.perf_counter()
+        keys = [self._cache_key(row, active) for row in rows]
+        results: List[Optional[Dict[str, Any]]] = [self.cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        PREDICT_STAGE_SECONDS.observe(time.perf_counter() - start, "cache_lookup")
+        PREDICTED_ROWS_TOTAL.inc("cache", amount=len(rows) - len(missing))
+        if not missing:
+            return results
         
-        # Fazer predição
-        probability = self.model.predict_proba(df)[0, 1]
+        missing_rows = [rows[i] for i in missing]
+        probabilities = active.score_records(
+            missing_rows, use_engine=len(missing_rows) <= FAST_INFERENCE_MAX_ROWS
+        )
+        
+        for i, probability in zip(missing, probabilities):
+            results[i] = self._build_result(probability)
+            self.cache.set(keys[i], results[i])
         
+        return results
+    
+    def _cache_key(self, data: Dict[str, Any], active: LoadedModel):
+        """Chave de cache da entrada para o modelo informado"""
+        return self.cache.make_key(
+            data, active.categorical_features, active.numerical_features, active.version
+        )
+    
+    @staticmethod
+    def _build_result(probability: float) -> Dict[str, Any]:
+        """Monta o resultado da predição a partir da probabilidade de atraso"""
         # Determinar risco
         if probability < 0.3:
             risk_level = "baixo"
@@ -214,7 +996,7 @@ class DelayPredictor:
         
         return {
             "probability": float(probability),
-            "probability_percent": round(probability * 100, 2),
+            "probability_percent": round(float(probability) * 100, 2),
             "risk_level": risk_level,
             "risk_color": risk_color,
             "prediction": "atrasado" if probability >= 0.5 else "em_tempo"
@@ -222,89 +1004,125 @@ class DelayPredictor:
     
     def save(self, filepath: Optional[Path] = None) -> str:
         """
-        Salva o modelo em arquivo
+        Salva o modelo ativo
         
         Args:
-            filepath: Caminho do arquivo (opcional)
+            filepath: Arquivo avulso (opcional; padrão: registro de versões)
             
         Returns:
-            Caminho do arquivo salvo
+            Caminho salvo
         """
-        if not self.is_trained:
+        active = self.active
+        if active is None:
             raise ValueError("Modelo não foi treinado ainda")
         
         if filepath is None:
-            filepath = MODELS_DIR / MODEL_FILENAME
+            return model_registry.save(active.to_state(), active.fast_engine)
         
         # Criar diretório se não existir
         filepath.parent.mkdir(parents=True, exist_ok=True)
         
-        # Salvar modelo com metadados
-        model_data = {
-            "model": self.model,
-            "version": self.version,
-            "training_date": self.training_date,
-            "categorical_features": self.categorical_features,
-            "numerical_features": self.numerical_features,
-            "feature_importances": self.feature_importances_,
-            "last_metrics": self.last_metrics
-        }
-        
-        joblib.dump(model_data, filepath)
+        joblib.dump(active.to_state(), filepath)
         return str(filepath)
     
     def load(self, filepath: Optional[Path] = None) -> bool:
         """
-        Carrega o modelo de arquivo
+        Carrega um modelo salvo
+        
+        Sem filepath, carrega a versão ativa do registro; se o registro
+        estiver vazio, usa o arquivo legado models/delay_predictor.pkl.
         
         Args:
-            filepath: Caminho do arquivo (opcional)
+            filepath: Arquivo avulso (opcional)
             
         Returns:
             True se carregou com sucesso
         """
-        if filepath is None:
-            filepath = MODELS_DIR / MODEL_FILENAME
-        
-        if not filepath.exists():
-            return False
-        
         try:
-            model_data = joblib.load(filepath)
+            if filepath is None:
+                version = model_registry.active_version()
+                if version is not None:
+                    self.activate(self._load_version(version))
+                    return True
+                filepath = MODELS_DIR / MODEL_FILENAME
             
-            self.model = model_data["model"]
-            self.version = model_data.get("version", "1.0.0")
-            self.training_date = model_data.get("training_date")
-            self.categorical_features = model_data.get("categorical_features", [])
-            self.numerical_features = model_data.get("numerical_features", [])
-            self.feature_importances_ = model_data.get("feature_importances", {})
-            self.last_metrics = model_data.get("last_metrics")
-            self.is_trained = True
+            if not filepath.exists():
+                return False
+            
+            with MODEL_LOAD_SECONDS.time("file"):
+                model_data = joblib.load(filepath)
+                self.set_state(model_data)
             
             return True
         except Exception as e:
             print(f"Erro ao carregar modelo: {e}")
             return False
     
+    def get_state(self) -> Dict[str, Any]:
+        """Exporta o estado do modelo ativo (ver LoadedModel.to_state)"""
+        active = self.active
+        if active is None:
+            raise ValueError("Modelo não foi treinado ainda")
+        return active.to_state()
+    
+    def set_state(self, model_data: Dict[str, Any]):
+        """Prepara e publica um estado exportado por get_state"""
+        self.activate(LoadedModel.from_state(model_data))
+    
     def get_info(self) -> Dict[str, Any]:
         """Retorna informações sobre o modelo"""
+        return self._info(self.active)
+    
+    @staticmethod
+    def _info(active: Optional[LoadedModel]) -> Dict[str, Any]:
+        if active is None:
+            return {
+                "is_trained": False,
+                "version": "0.0.0",
+                "training_date": None,
+                "categorical_features": [],
+                "numerical_features": [],
+                "last_metrics": None,
+                "preprocessing": None,
+                "estimator": None
+            }
+        
         return {
-            "is_trained": self.is_trained,
-            "version": self.version,
-            "training_date": self.training_date,
-            "categorical_features": self.categorical_features,
-            "numerical_features": self.numerical_features,
-            "last_metrics": self.last_metrics
+            "is_trained": True,
+            "version": active.version,
+            "training_date": active.training_date,
+            "categorical_features": active.categorical_features,
+            "numerical_features": active.numerical_features,
+            "last_metrics": active.last_metrics,
+            "preprocessing": active.preprocessing,
+            "estimator": active.estimator
         }
     
-    def get_feature_importance(self) -> List[Dict[str, Any]]:
-        """Retorna importância das features"""
-        if not self.feature_importances_:
+    def get_feature_importance(self, aggregate: bool = False) -> List[Dict[str, Any]]:
+        """
+        Retorna importância das features
+        
+        Args:
+            aggregate: Somar as colunas one-hot de cada feature categórica
+                (no modo ordinal já há uma importância por feature)
+        """
+        active = self.active
+        if active is None or not active.feature_importances:
             return []
         
+        # Ordenada uma vez por modelo publicado
+        key = "importance_aggregated" if aggregate else "importance"
+        return active.derived(key, lambda: self._rank_importances(active, aggregate))
+    
+    @classmethod
+    def _rank_importances(cls, active: LoadedModel, aggregate: bool) -> List[Dict[str, Any]]:
+        importances = active.feature_importances
+        if aggregate:
+            importances = cls._aggregate_importances(active)
+        
         # Ordenar por importância
         sorted_features = sorted(
-            self.feature_importances_.items(), 
+            importances.items(), 
             key=lambda x: x[1], 
             reverse=True
         )
@@ -313,6 +1131,60 @@ class DelayPredictor:
             {"feature": name, "importance": float(importance)}
             for name, importance in sorted_features
         ]
+    
+    def get_summary(self) -> Tuple[bytes, str]:
+        """
+        Resumo do painel em JSON e o seu ETag
+        
+        Junta informações do modelo, métricas do último treino e
+        importância agregada por feature; montado uma vez por modelo
+        publicado (o ETag muda junto com o conteúdo).
+        
+        Returns:
+            Tupla (corpo JSON, ETag fraco: W/ e o hash entre aspas)
+        """
+        active = self.active
+        if active is None:
+            return self._summary_payload(None)
+        return active.derived("summary", lambda: self._summary_payload(active))
+    
+    @classmethod
+    def _summary_payload(cls, active: Optional[LoadedModel]) -> Tuple[bytes, str]:
+        info = cls._info(active)
+        features = []
+        if active is not None and active.feature_importances:
+            features = active.derived(
+                "importance_aggregated", lambda: cls._rank_importances(active, True)
+            )
+        
+        summary = {
+            "model": {name: value for name, value in info.items() if name != "last_metrics"},
+            "metrics": info["last_metrics"],
+            "features": features,
+            "total_features": len(features)
+        }
+        body = json.dumps(summary, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        # Fraco: o middleware comprime o mesmo conteúdo em bytes diferentes
+        # (br, gzip ou sem compressão), e um ETag forte exige bytes idênticos
+        etag = f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+        return body, etag
+    
+    @staticmethod
+    def _aggregate_importances(active: LoadedModel) -> Dict[str, float]:
+        """Importância por feature de origem (colunas one-hot "feature_categoria")"""
+        # Nomes mais longos primeiro: evita casar um prefixo de outra feature
+        categorical = sorted(active.categorical_features, key=len, reverse=True)
+        totals: Dict[str, float] = {}
+        for name, importance in active.feature_importances.items():
+            source = name
+            if name not in active.numerical_features:
+                source = next(
+                    (feature for feature in categorical
+                     if name == feature or name.startswith(f"{feature}_")),
+                    name
+                )
+            totals[source] = totals.get(source, 0.0) + float(importance)
+        return totals
 
 
 # Instância global do modelo
@@ -0,0 +1,235 @@
+"""
+Registro de versões do modelo
+
+Cada modelo treinado é um artefato imutável em models/<versão>/:
+    model.pkl   estado completo (pipeline sklearn + metadados)
+    compiled/   motor compilado (arrays .npy, carregados com mmap)
+    meta.json   metadados e dados de serviço (gravado por último)
+O arquivo models/registry.json guarda a versão ativa e o histórico de
+ativações, usado no rollback.
+"""
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+
+from app.config import (
+    MODEL_ARTIFACT_FILENAME,
+    MODEL_COMPILED_DIRNAME,
+    MODEL_META_FILENAME,
+    MODEL_MMAP_MODE,
+    MODEL_REGISTRY_FILENAME,
+    MODELS_DIR
+)
+from app.models.fast_inference import FastInferenceEngine
+from app.utils.file_lock import FileLock
+
+
+def parse_version(version: str) -> tuple:
+    """Converte "1.0.10" em (1, 0, 10) para ordenação"""
+    return tuple(int(part) for part in version.split("."))
+
+
+def increment_version(version: Optional[str]) -> str:
+    """Próxima versão de patch ("0.0.0" ou None viram "1.0.0")"""
+    if not version or version == "0.0.0":
+        return "1.0.0"
+    parts = version.split(".")
+    parts[-1] = str(int(parts[-1]) + 1)
+    return ".".join(parts)
+
+
+class ModelRegistry:
+    """Artefatos versionados em disco e ponteiro para a versão ativa"""
+
+    def __init__(self, root: Path = MODELS_DIR):
+        self.root = Path(root)
+        # Entre processos: workers diferentes promovem versões no mesmo registry.json
+        self._lock = FileLock(self.root / ".registry.lock")
+
+    @property
+    def registry_path(self) -> Path:
+        return self.root / MODEL_REGISTRY_FILENAME
+
+    def _version_dir(self, version: str) -> Path:
+        # Impede caminhos fora do registro ("../x")
+        parse_version(version)
+        return self.root / version
+
+    def exists(self, version: str) -> bool:
+        """Versão salva por completo (meta.json é gravado por último)"""
+        try:
+            return (self._version_dir(version) / MODEL_META_FILENAME).exists()
+        except ValueError:
+            return False
+
+    def versions(self) -> List[str]:
+        """Versões salvas, da mais antiga para a mais nova"""
+        found = []
+        if self.root.exists():
+            for path in self.root.iterdir():
+                if path.is_dir() and self.exists(path.name):
+                    found.append(path.name)
+        return sorted(found, key=parse_version)
+
+    def reserve_version(self, after: Optional[str] = None) -> str:
+        """
+        Reserva a próxima versão livre criando o diretório dela
+
+        A versão é maior que a última salva e que `after`; a criação
+        exclusiva do diretório evita que dois treinos usem a mesma versão.
+        """
+        candidates = self.versions() + ([after] if after and after != "0.0.0" else [])
+        latest = max(candidates, key=parse_version) if candidates else None
+        version = increment_version(latest)
+        self.root.mkdir(parents=True, exist_ok=True)
+        while True:
+            try:
+                self._version_dir(version).mkdir()
+                return version
+            except FileExistsError:
+                version = increment_version(version)
+
+    def release(self, version: str):
+        """Descarta uma versão reservada que não chegou a ser salva"""
+        if not self.exists(version):
+            shutil.rmtree(self._version_dir(version), ignore_errors=True)
+
+    def save(
+        self,
+        state: Dict[str, Any],
+        engine: Optional[FastInferenceEngine] = None
+    ) -> str:
+        """
+        Salva o estado de um modelo no diretório da sua versão
+
+        Args:
+            state: Estado exportado por LoadedModel.to_state
+            engine: Motor compilado já conferido contra o pipeline (opcional)
+
+        Returns:
+            Caminho do diretório da versão
+        """
+        version = state["version"]
+        path = self._version_dir(version)
+        if self.exists(version):
+            raise ValueError(f"Versão {version} já existe no registro")
+        path.mkdir(parents=True, exist_ok=True)
+
+        joblib.dump(state, path / MODEL_ARTIFACT_FILENAME)
+        if engine is not None:
+            engine.save(path / MODEL_COMPILED_DIRNAME)
+
+        meta = {
+            "version": version,
+            "training_date": state.get("training_date"),
+            "metrics": state.get("last_metrics"),
+            "preprocessing": state.get("preprocessing", "dense"),
+            "estimator": state.get("estimator", "random_forest"),
+            "compiled": engine is not None,
+            # Tamanho em disco de model.pkl + motor compilado
+            "size_bytes": sum(f.stat().st_size for f in path.rglob("*") if f.is_file()),
+            "saved_at": time.time(),
+            # Dados para servir a versão sem carregar model.pkl
+            "serving": {
+                "categorical_features": state.get("categorical_features", []),
+                "numerical_features": state.get("numerical_features", []),
+                "feature_importances": state.get("feature_importances") or {},
+                "sample_rows": state.get("sample_rows") or []
+            }
+        }
+        self._write_json(path / MODEL_META_FILENAME, meta)
+        return str(path)
+
+    def load(self, version: str) -> Dict[str, Any]:
+        """Carrega o estado salvo de uma versão"""
+        if not self.exists(version):
+            raise FileNotFoundError(f"Versão {version} não encontrada")
+        return joblib.load(self._version_dir(version) / MODEL_ARTIFACT_FILENAME)
+
+    def load_engine(self, version: str) -> Optional[FastInferenceEngine]:
+        """Motor compilado da versão, com os arrays mapeados do disco (None se ausente)"""
+        directory = self._version_dir(version) / MODEL_COMPILED_DIRNAME
+        if not directory.exists():
+            return None
+        return FastInferenceEngine.load(directory, mmap_mode=MODEL_MMAP_MODE)
+
+    def meta(self, version: str) -> Dict[str, Any]:
+        with open(self._version_dir(version) / MODEL_META_FILENAME, encoding="utf-8") as f:
+            return json.load(f)
+
+    def active_version(self) -> Optional[str]:
+        return self._read_registry().get("active")
+
+    def active_stamp(self) -> Optional[tuple]:
+        """
+        Carimbo barato do registry.json (muda a cada ativação)
+
+        Usado pelos workers para detectar promoções sem ler o arquivo.
+        """
+        try:
+            st = os.stat(self.registry_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def set_active(self, version: str, rollback: bool = False):
+        """
+        Registra a versão ativa
+
+        Ativações são empilhadas no histórico; no rollback a versão atual
+        é retirada do topo em vez de empilhar a anterior de novo.
+        """
+        if not self.exists(version):
+            raise FileNotFoundError(f"Versão {version} não encontrada")
+
+        with self._lock:
+            registry = self._read_registry()
+            history = registry.get("history", [])
+            if rollback and len(history) >= 2 and history[-2] == version:
+                history.pop()
+            elif not history or history[-1] != version:
+                history.append(version)
+            registry.update(active=version, history=history, activated_at=time.time())
+            self._write_json(self.registry_path, registry)
+
+    def rollback_target(self) -> Optional[str]:
+        """Versão ativa antes da atual (ignora versões removidas do disco)"""
+        history = self._read_registry().get("history", [])
+        for version in reversed(history[:-1]):
+            if self.exists(version):
+                return version
+        return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Versões salvas com metadados, da mais nova para a mais antiga"""
+        active = self.active_version()
+        versions = []
+        for version in reversed(self.versions()):
+            meta = self.meta(version)
+            meta.pop("serving", None)
+            versions.append({**meta, "active": version == active})
+        return versions
+
+    def _read_registry(self) -> Dict[str, Any]:
+        try:
+            with open(self.registry_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    @staticmethod
+    def _write_json(path: Path, data: Dict[str, Any]):
+        """Grava JSON de forma atômica (arquivo temporário + rename)"""
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+# Instância global do registro
+model_registry = ModelRegistry()
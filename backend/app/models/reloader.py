@@ -0,0 +1,56 @@
+"""
+Sincronização do modelo entre workers
+
+Com vários processos servindo a API, uma promoção (treino, promote ou
+rollback) só troca o modelo do worker que atendeu a requisição. Cada
+worker roda esta task, que confere o carimbo do registry.json e carrega
+a nova versão ativa em até MODEL_WATCH_INTERVAL_SECONDS.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import MODEL_WATCH_INTERVAL_SECONDS
+from app.models.predictor import predictor
+from app.models.registry import model_registry
+from app.utils.executor import run_inference
+
+logger = logging.getLogger(__name__)
+
+_watcher: Optional[asyncio.Task] = None
+
+
+async def _watch_registry(interval: float):
+    """Recarrega o modelo quando a versão ativa do registro muda"""
+    last_stamp = None
+    while True:
+        await asyncio.sleep(interval)
+        stamp = model_registry.active_stamp()
+        if stamp is None or stamp == last_stamp:
+            continue
+        
+        try:
+            # Carga e aquecimento fora do event loop; a troca é atômica
+            await run_inference(predictor.sync_with_registry)
+            last_stamp = stamp
+        except Exception as e:
+            logger.error(f"Erro ao recarregar o modelo do registro: {str(e)}")
+
+
+def start_model_watcher(interval: float = MODEL_WATCH_INTERVAL_SECONDS):
+    """Inicia a task de sincronização (interval <= 0 desativa)"""
+    global _watcher
+    if interval > 0 and _watcher is None:
+        _watcher = asyncio.create_task(_watch_registry(interval))
+
+
+async def stop_model_watcher():
+    """Encerra a task de sincronização"""
+    global _watcher
+    if _watcher is not None:
+        _watcher.cancel()
+        try:
+            await _watcher
+        except asyncio.CancelledError:
+            pass
+        _watcher = None
@@ -0,0 +1,772 @@
+"""
+Treino em segundo plano
+
+train_from_csv roda no pool de processos: recebe dados serializáveis,
+treina um DelayPredictor novo e salva a versão no registro. As funções de
+job rodam no event loop: criam o Job, acompanham o estágio publicado pelo
+processo de treino e, ao final, promovem a versão salva na instância
+global (carregada do registro, com o motor compilado mapeado do disco).
+
+compare_estimators treina vários estimadores nos mesmos dados, também no
+pool de processos, sem promover nem registrar nenhum deles.
+"""
+import asyncio
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+import sklearn
+
+from app.config import (
+    ESTIMATOR,
+    JOB_HEARTBEAT_SECONDS,
+    JOB_POLL_INTERVAL_SECONDS,
+    PROFILE_TRAINING_JOBS,
+    RETRAIN_MAX_TREES,
+    RETRAIN_WARM_START_TREES,
+    RETRAIN_WINDOW_ROWS
+)
+from app.models.estimators import get_estimator
+from app.models.predictor import DelayPredictor, PreparedData, predictor
+from app.models.registry import ModelRegistry, model_registry
+from app.utils.artifact_cache import artifact_cache, file_digest, make_key
+from app.utils.dataset_store import dataset_store
+from app.utils.executor import get_progress_board, run_inference, run_training
+from app.utils.ingestion import read_training_csv
+from app.utils.jobs import Job, JobCancelledError, JobProgress, job_store
+from app.utils.metrics import (
+    ARTIFACT_CACHE_LOOKUPS_TOTAL,
+    TRAINING_JOBS_TOTAL,
+    TRAINING_STAGE_SECONDS,
+    StageTimer
+)
+from app.utils.profiling import Profiler
+from app.utils.training_store import training_store
+
+logger = logging.getLogger(__name__)
+
+# Referências às tasks em andamento (evita coleta pelo GC)
+_running_tasks: Set[asyncio.Task] = set()
+_progress: Dict[str, JobProgress] = {}
+
+
+def train_from_csv(
+    csv_path: Optional[str],
+    test_size: float,
+    base_version: str,
+    progress: Optional[Callable[[str], None]] = None,
+    drop_invalid: bool = False,
+    mode: Optional[str] = None,
+    base_state: Optional[Dict[str, Any]] = None,
+    profile: bool = False,
+    dataset_query: Optional[Dict[str, Any]] = None,
+    preprocessing: Optional[str] = None,
+    estimator: Optional[str] = None,
+    search: Optional[Dict[str, Any]] = None
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Lê o CSV (ou datasets do store), treina e salva um novo modelo
+    
+    Sem mode, treina do zero e a base acumulada passa a ser este CSV. Com
+    mode (re-treino), as linhas são somadas à base acumulada e o modelo é
+    re-treinado conforme RETRAIN_MODES.
+    
+    Args:
+        csv_path: Caminho do CSV enviado (arquivo temporário), ou None
+            para ler do dataset store
+        test_size: Proporção dos dados para teste
+        base_version: Versão atual do modelo (será incrementada)
+        progress: Callback de estágio (ver JobProgress)
+        drop_invalid: Descartar linhas inválidas em vez de falhar
+        mode: Modo de re-treino ("warm_start", "window" ou "full")
+        base_state: Estado do modelo atual, se ele não estiver no registro
+            (usado no warm_start)
+        profile: Anexar ao resultado um perfil da execução (result["profile"])
+        dataset_query: Argumentos de dataset_store.load (dataset_ids,
+            date_from, date_to), usados quando csv_path é None
+        preprocessing: Codificação das categóricas (ver PREPROCESSING_MODES);
+            o warm_start mantém a do modelo atual
+        estimator: Classificador (ver ESTIMATOR_NAMES); o warm_start mantém
+            o do modelo atual
+        search: Argumentos de DelayPredictor.search (method, param_grid,
+            cv_folds) para treinar com busca de hiperparâmetros (sem mode)
+        
+    Returns:
+        Tuple de (resultado do treino, caminho salvo)
+    """
+    timer = StageTimer()
+    if not profile:
+        result, model_path = _train_and_save(
+            csv_path, test_size, base_version, progress, drop_invalid, mode, base_state,
+            timer, dataset_query, preprocessing, estimator, search
+        )
+    else:
+        with Profiler(timer) as profiler:
+            result, model_path = _train_and_save(
+                csv_path, test_size, base_version, progress, drop_invalid, mode, base_state,
+                timer, dataset_query, preprocessing, estimator, search
+            )
+        result["profile"] = profiler.report
+    
+    # Duração por estágio (read_csv ou read_parquet, validate, split, fit,
+    # evaluate, save e, com o cache de artefatos, hash, read_cache e
+    # write_cache), registrada nas métricas pelo processo servidor
+    result["stage_seconds"] = timer.rounded()
+    return result, model_path
+
+
+def _train_and_save(
+    csv_path: Optional[str],
+    test_size: float,
+    base_version: str,
+    progress: Optional[Callable[[str], None]],
+    drop_invalid: bool,
+    mode: Optional[str],
+    base_state: Optional[Dict[str, Any]],
+    timer: StageTimer,
+    dataset_query: Optional[Dict[str, Any]] = None,
+    preprocessing: Optional[str] = None,
+    estimator: Optional[str] = None,
+    search: Optional[Dict[str, Any]] = None
+) -> Tuple[Dict[str, Any], str]:
+    """Corpo de train_from_csv, com os estágios medidos em timer"""
+    progress = progress or (lambda stage: None)
+    
+    progress("parsing")
+    
+    # Treino do zero: dados, matriz e resultado podem vir do cache de
+    # artefatos (chave = conteúdo enviado + configuração)
+    source_key = result_key = None
+    cache_info: Dict[str, str] = {}
+    if mode is None and artifact_cache.enabled:
+        spec = get_estimator(estimator or ESTIMATOR)
+        estimator = spec.name
+        preprocessing = spec.resolve_preprocessing(preprocessing)
+        with timer("hash"):
+            source_key = _source_key(csv_path, drop_invalid, dataset_query)
+        result_key = make_key(
+            "result", source_key, test_size, estimator, spec.params, preprocessing, search,
+            sklearn.__version__
+        )
+        cached = _cached_result(
+            result_key, source_key, csv_path, drop_invalid, timer, dataset_query, cache_info
+        )
+        if cached is not None:
+            return cached
+        cache_info["result"] = "miss"
+    
+    df, warnings, datasets = _load_training_data(
+        csv_path, drop_invalid, timer, dataset_query, source_key, cache_info
+    )
+    
+    # Base acumulada (gravada apenas se o treino concluir). O fit usa esta
+    # cópia, sem lock; a base é relida sob o lock só na hora de gravar
+    had_store = training_store.exists()
+    store_df, n_replaced = training_store.merge(df, replace=mode is None)
+    if n_replaced and mode is not None:
+        warnings.append(
+            f"{n_replaced} linhas substituíram registros anteriores "
+            f"(mesmo freight_description)"
+        )
+    elif n_replaced:
+        # Treino do zero: a base foi descartada, as repetições são do próprio upload
+        warnings.append(
+            f"{n_replaced} linhas duplicadas descartadas "
+            f"(mesmo freight_description; vale a última)"
+        )
+    if mode in ("window", "full") and not had_store:
+        warnings.append("Base acumulada vazia; re-treino usou apenas os dados enviados")
+    
+    # Reservar a versão no registro (exclusiva entre treinos simultâneos)
+    version = model_registry.reserve_version(base_version)
+    try:
+        trainer = DelayPredictor()
+        start = time.perf_counter()
+        if mode == "warm_start":
+            if base_state is None:
+                if not model_registry.exists(base_version):
+                    raise ValueError("Re-treino incremental requer um modelo treinado")
+                base_state = model_registry.load(base_version)
+            trainer.set_state(base_state)
+            result = trainer.warm_start_fit(
+                df, RETRAIN_WARM_START_TREES, RETRAIN_MAX_TREES,
+                test_size=test_size, progress=progress, version=version, timer=timer
+            )
+        elif mode == "window":
+            result = trainer.train(
+                store_df.tail(RETRAIN_WINDOW_ROWS), test_size=test_size,
+                progress=progress, validated=True, version=version, timer=timer,
+                preprocessing=preprocessing, estimator=estimator
+            )
+        elif mode == "full":
+            result = trainer.train(
+                store_df, test_size=test_size, progress=progress, validated=True,
+                version=version, timer=timer, preprocessing=preprocessing, estimator=estimator
+            )
+        else:
+            prepared = None
+            if source_key is not None:
+                prepared = _prepared_data(
+                    trainer, df, source_key, test_size, preprocessing, timer, cache_info
+                )
+            if search:
+                result = trainer.search(
+                    df, test_size=test_size, progress=progress, version=version, timer=timer,
+                    preprocessing=preprocessing, estimator=estimator, prepared=prepared,
+                    **search
+                )
+            else:
+                result = trainer.train(
+                    df, test_size=test_size, progress=progress, validated=True,
+                    version=version, timer=timer, preprocessing=preprocessing,
+                    estimator=estimator, prepared=prepared
+                )
+        
+        result["fit_seconds"] = round(time.perf_counter() - start, 3)
+        result["mode"] = mode
+        result["warnings"] = warnings + result.get("warnings", [])
+        result["n_rows"] = len(df)
+        result["datasets"] = datasets
+        
+        progress("saving")
+        with timer("save"):
+            with training_store.lock():
+                if mode is not None:
+                    # Outro worker pode ter gravado a base durante o fit:
+                    # junta as linhas enviadas à versão atual, sem perdê-las
+                    store_df, _ = training_store.merge(df)
+                training_store.save(store_df, source=source_key)
+            model_path = trainer.save()
+        result["store_rows"] = len(store_df)
+        result["model_size_bytes"] = model_registry.meta(version)["size_bytes"]
+    except BaseException:
+        model_registry.release(version)
+        raise
+    
+    result["cache"] = cache_info or None
+    if result_key is not None:
+        artifact_cache.put("result", result_key, {"result": result, "model_path": model_path})
+    return result, model_path
+
+
+def _source_key(
+    csv_path: Optional[str],
+    drop_invalid: bool,
+    dataset_query: Optional[Dict[str, Any]]
+) -> str:
+    """Chave dos dados de entrada: hash dos bytes enviados ou ids dos datasets (imutáveis)"""
+    if csv_path is not None:
+        return make_key("csv", file_digest(Path(csv_path)), drop_invalid)
+    selected = dataset_store.select(**dataset_query)
+    return make_key("datasets", [meta["id"] for meta in selected])
+
+
+def _cached_result(
+    result_key: str,
+    source_key: str,
+    csv_path: Optional[str],
+    drop_invalid: bool,
+    timer: StageTimer,
+    dataset_query: Optional[Dict[str, Any]],
+    cache_info: Dict[str, str]
+) -> Optional[Tuple[Dict[str, Any], str]]:
+    """
+    Resultado de um treino idêntico, se a versão produzida ainda estiver no registro
+    
+    A versão é promovida de novo em vez de re-treinada. A base acumulada
+    volta a ser a deste upload (só é regravada se outro treino a alterou).
+    Latência e tamanho continuam os da versão reaproveitada; fit_seconds
+    é 0, pois nada foi treinado.
+    """
+    with timer("read_cache"):
+        cached = artifact_cache.get("result", result_key)
+    if cached is None or not model_registry.exists(cached["result"]["version"]):
+        return None
+    
+    cache_info["result"] = "hit"
+    if training_store.source() != source_key:
+        df, _, _ = _load_training_data(
+            csv_path, drop_invalid, timer, dataset_query, source_key, cache_info
+        )
+        with timer("save"):
+            store_df, _ = training_store.merge(df, replace=True)
+            training_store.save(store_df, source=source_key)
+    
+    result = dict(cached["result"])
+    result["fit_seconds"] = 0
+    result["reused_version"] = True
+    result["cache"] = cache_info
+    result["warnings"] = result.get("warnings", []) + [
+        f"Mesmos dados e configuração de um treino anterior; versão {result['version']} reaproveitada"
+    ]
+    return result, cached["model_path"]
+
+
+def _load_training_data(
+    csv_path: Optional[str],
+    drop_invalid: bool,
+    timer: StageTimer,
+    dataset_query: Optional[Dict[str, Any]],
+    source_key: Optional[str],
+    cache_info: Dict[str, str]
+) -> Tuple[pd.DataFrame, List[str], Optional[List[str]]]:
+    """_read_training_data passando pelo cache de artefatos (sem source_key, lê direto)"""
+    if source_key is None:
+        return _read_training_data(csv_path, drop_invalid, timer, dataset_query)
+    
+    with timer("read_cache"):
+        cached = artifact_cache.get("dataset", source_key)
+    if cached is not None:
+        cache_info["dataset"] = "hit"
+        df, warnings, datasets = cached
+        return df, list(warnings), datasets
+    
+    cache_info["dataset"] = "miss"
+    data = _read_training_data(csv_path, drop_invalid, timer, dataset_query)
+    with timer("write_cache"):
+        artifact_cache.put("dataset", source_key, data)
+    return data
+
+
+def _prepared_data(
+    trainer: DelayPredictor,
+    df: pd.DataFrame,
+    source_key: str,
+    test_size: float,
+    preprocessing: str,
+    timer: StageTimer,
+    cache_info: Dict[str, str]
+) -> PreparedData:
+    """Split e matriz pré-processada do cache, ou montados e gravados nele"""
+    key = make_key("matrix", source_key, test_size, preprocessing, sklearn.__version__)
+    with timer("read_cache"):
+        # Arrays mapeados do disco (somente leitura), sem cópia em memória
+        prepared = artifact_cache.get("matrix", key, mmap_mode="r")
+    if prepared is not None:
+        cache_info["matrix"] = "hit"
+        return prepared
+    
+    cache_info["matrix"] = "miss"
+    prepared = trainer.prepare_data(df, test_size, preprocessing=preprocessing, timer=timer)
+    with timer("write_cache"):
+        artifact_cache.put("matrix", key, prepared)
+    return prepared
+
+
+def _read_training_data(
+    csv_path: Optional[str],
+    drop_invalid: bool,
+    timer: StageTimer,
+    dataset_query: Optional[Dict[str, Any]]
+) -> Tuple[pd.DataFrame, List[str], Optional[List[str]]]:
+    """Lê o CSV enviado ou os datasets do store: (DataFrame, warnings, ids dos datasets)"""
+    if csv_path is not None:
+        # Leitura em chunks com tipos explícitos, validando cada chunk
+        df, warnings = read_training_csv(Path(csv_path), drop_invalid=drop_invalid, timer=timer)
+        return df, warnings, None
+    
+    # Datasets já validados na ingestão: leitura colunar das colunas do modelo
+    df, selected = dataset_store.load(**dataset_query, timer=timer)
+    return df, [], [meta["id"] for meta in selected]
+
+
+def compare_estimators(
+    csv_path: Optional[str],
+    test_size: float,
+    estimator_names: List[str],
+    preprocessing: Optional[str] = None,
+    progress: Optional[Callable[[str], None]] = None,
+    drop_invalid: bool = False,
+    dataset_query: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Treina cada estimador nos mesmos dados e compara custo e qualidade
+    
+    Roda no pool de processos. Nenhum modelo é promovido nem entra no
+    registro: cada candidato é salvo em um registro temporário apenas para
+    medir o tamanho em disco. A base acumulada não é alterada. Estimadores
+    com o mesmo modo de pré-processamento treinam sobre a mesma matriz
+    (também reaproveitada do cache de artefatos).
+    
+    Args:
+        csv_path: Caminho do CSV enviado, ou None para ler do dataset store
+        test_size: Proporção dos dados para teste (mesmo split para todos)
+        estimator_names: Estimadores a comparar (ver ESTIMATOR_NAMES)
+        preprocessing: Codificação das categóricas (padrão: a de cada estimador)
+        progress: Callback de estágio (publicado como "<estimador>:<estágio>")
+        drop_invalid: Descartar linhas inválidas em vez de falhar
+        dataset_query: Argumentos de dataset_store.load, usados quando
+            csv_path é None
+        
+    Returns:
+        Resultado com uma linha por estimador (fit, latência, tamanho,
+        accuracy e AUC), na ordem pedida
+    """
+    progress = progress or (lambda stage: None)
+    timer = StageTimer()
+    
+    progress("parsing")
+    source_key = None
+    cache_info: Dict[str, str] = {}
+    if artifact_cache.enabled:
+        with timer("hash"):
+            source_key = _source_key(csv_path, drop_invalid, dataset_query)
+    df, warnings, datasets = _load_training_data(
+        csv_path, drop_invalid, timer, dataset_query, source_key, cache_info
+    )
+    
+    # Um split e uma matriz por modo de pré-processamento, compartilhados
+    # pelos estimadores (fit_seconds mede apenas o classificador)
+    prepared: Dict[str, PreparedData] = {}
+    
+    results = []
+    with tempfile.TemporaryDirectory(prefix="compare_") as tmp:
+        registry = ModelRegistry(Path(tmp))
+        for name in estimator_names:
+            trainer = DelayPredictor()
+            candidate_timer = StageTimer()
+            try:
+                mode = get_estimator(name).resolve_preprocessing(preprocessing)
+                if mode not in prepared:
+                    progress(f"{name}:preprocessing")
+                    prepared[mode] = (
+                        _prepared_data(trainer, df, source_key, test_size, mode, timer, cache_info)
+                        if source_key is not None
+                        else trainer.prepare_data(df, test_size, preprocessing=mode, timer=timer)
+                    )
+                result = trainer.train(
+                    df, test_size=test_size, validated=True, version=registry.reserve_version(),
+                    progress=lambda stage: progress(f"{name}:{stage}"), timer=candidate_timer,
+                    preprocessing=mode, estimator=name, prepared=prepared[mode]
+                )
+            except ValueError as e:
+                # Combinação não suportada (ex.: estimador sem entrada esparsa)
+                results.append({"estimator": name, "error": str(e)})
+                continue
+            
+            progress(f"{name}:saving")
+            registry.save(trainer.get_state(), trainer.fast_engine)
+            results.append({
+                "estimator": name,
+                "preprocessing": result["preprocessing"],
+                "fit_seconds": candidate_timer.rounded()["fit"],
+                "latency": result["latency"],
+                "model_size_bytes": registry.meta(result["version"])["size_bytes"],
+                "accuracy": result["metrics"]["accuracy"],
+                "auc": result["metrics"]["auc"],
+                "n_trees": result["n_trees"]
+            })
+    
+    return {
+        "results": results,
+        "warnings": warnings,
+        "n_rows": len(df),
+        "datasets": datasets,
+        "cache": cache_info or None,
+        "stage_seconds": timer.rounded()
+    }
+
+
+async def start_training_job(
+    kind: str,
+    csv_path: Optional[Path],
+    test_size: float,
+    filename: Optional[str],
+    drop_invalid: bool = False,
+    mode: Optional[str] = None,
+    profile: bool = False,
+    dataset_query: Optional[Dict[str, Any]] = None,
+    preprocessing: Optional[str] = None,
+    estimator: Optional[str] = None,
+    search: Optional[Dict[str, Any]] = None
+) -> Job:
+    """
+    Cria um job de treino e agenda sua execução no event loop
+    
+    Args:
+        kind: "train" ou "retrain"
+        csv_path: CSV enviado, já copiado para disco (removido ao final),
+            ou None para treinar com datasets do store
+        test_size: Proporção dos dados para teste
+        filename: Nome do arquivo enviado (apenas informativo)
+        drop_invalid: Descartar linhas inválidas em vez de falhar
+        mode: Modo de re-treino (apenas para kind="retrain")
+        profile: Perfilar o treino (também ativado por PROFILE_TRAINING_JOBS);
+            o relatório fica em GET /api/jobs/{job_id}/profile
+        dataset_query: Seleção de datasets (ver dataset_store.load)
+        preprocessing: Codificação das categóricas (ver PREPROCESSING_MODES)
+        estimator: Classificador (ver ESTIMATOR_NAMES)
+        search: Busca de hiperparâmetros (ver train_from_csv)
+        
+    Returns:
+        Job criado (status "queued")
+    """
+    profile = profile or PROFILE_TRAINING_JOBS
+    job = await run_inference(job_store.add, Job(
+        kind,
+        {
+            "filename": filename,
+            "test_size": test_size,
+            "drop_invalid": drop_invalid,
+            "mode": mode,
+            "profile": profile,
+            "datasets": dataset_query,
+            "preprocessing": preprocessing,
+            "estimator": estimator,
+            "search": search
+        }
+    ))
+    _progress[job.id] = JobProgress(get_progress_board(), job.id)
+    
+    _schedule(_run_training_job(
+        job.id, csv_path, test_size, drop_invalid, mode, profile, dataset_query,
+        preprocessing, estimator, search
+    ))
+    return job
+
+
+async def start_compare_job(
+    csv_path: Optional[Path],
+    test_size: float,
+    filename: Optional[str],
+    estimator_names: List[str],
+    preprocessing: Optional[str] = None,
+    drop_invalid: bool = False,
+    dataset_query: Optional[Dict[str, Any]] = None
+) -> Job:
+    """
+    Cria um job de comparação de estimadores (ver compare_estimators)
+    
+    Returns:
+        Job criado (status "queued", kind "compare")
+    """
+    job = await run_inference(job_store.add, Job(
+        "compare",
+        {
+            "filename": filename,
+            "test_size": test_size,
+            "drop_invalid": drop_invalid,
+            "estimators": estimator_names,
+            "preprocessing": preprocessing,
+            "datasets": dataset_query
+        }
+    ))
+    _progress[job.id] = JobProgress(get_progress_board(), job.id)
+    
+    _schedule(_run_compare_job(
+        job.id, csv_path, test_size, estimator_names, preprocessing, drop_invalid,
+        dataset_query
+    ))
+    return job
+
+
+def _schedule(coro):
+    """Agenda a execução de um job no event loop (mantendo a referência)"""
+    task = asyncio.create_task(coro)
+    _running_tasks.add(task)
+    task.add_done_callback(_running_tasks.discard)
+
+
+async def cancel_job(job_id: str) -> Optional[Job]:
+    """
+    Solicita o cancelamento de um job
+    
+    O processo de treino interrompe o trabalho na próxima troca de estágio.
+    Se o job roda em outro worker, o pedido chega a ele pelo JobStore.
+    """
+    job = await run_inference(job_store.get, job_id)
+    if job is None or job.is_finished:
+        return job
+    
+    progress = _progress.get(job_id)
+    if progress is not None:
+        progress.cancel()
+    return await run_inference(job_store.update, job_id, cancel_requested=True)
+
+
+async def _run_training_job(
+    job_id: str,
+    csv_path: Optional[Path],
+    test_size: float,
+    drop_invalid: bool,
+    mode: Optional[str],
+    profile: bool = False,
+    dataset_query: Optional[Dict[str, Any]] = None,
+    preprocessing: Optional[str] = None,
+    estimator: Optional[str] = None,
+    search: Optional[Dict[str, Any]] = None
+):
+    """Executa o treino no pool de processos e acompanha o estágio"""
+    progress = _progress[job_id]
+    
+    # O processo de treino lê o modelo atual do registro; só um modelo
+    # carregado do arquivo legado precisa ser enviado
+    base_state = None
+    if mode == "warm_start" and not model_registry.exists(predictor.version):
+        base_state = predictor.get_state()
+    future = asyncio.ensure_future(
+        run_training(
+            train_from_csv, str(csv_path) if csv_path is not None else None, test_size,
+            predictor.version, progress, drop_invalid, mode, base_state, profile, dataset_query,
+            preprocessing, estimator, search
+        )
+    )
+    
+    try:
+        result, model_path = await _follow(job_id, future, progress)
+        for stage, seconds in result["stage_seconds"].items():
+            TRAINING_STAGE_SECONDS.observe(seconds, stage)
+        for artifact, outcome in (result.get("cache") or {}).items():
+            ARTIFACT_CACHE_LOOKUPS_TOTAL.inc(artifact, outcome)
+        
+        # Preparar o novo modelo fora do event loop e trocar de uma vez
+        await run_inference(predictor.promote, result["version"])
+        
+        logger.info(f"Job {job_id}: {result['n_rows']} linhas, modelo salvo em {model_path}")
+        
+        job = await run_inference(job_store.get, job_id)
+        await run_inference(
+            job_store.update,
+            job_id,
+            status="completed",
+            profile=result.get("profile"),
+            result={
+                "status": "success",
+                "message": (
+                    "Modelo re-treinado com sucesso" if job.kind == "retrain"
+                    else "Modelo treinado com sucesso"
+                ),
+                "metrics": result["metrics"],
+                "warnings": result.get("warnings", []),
+                "version": result["version"],
+                "training_date": result["training_date"],
+                "mode": result["mode"],
+                "n_rows": result["n_rows"],
+                "store_rows": result["store_rows"],
+                "datasets": result["datasets"],
+                "n_trees": result["n_trees"],
+                "preprocessing": result["preprocessing"],
+                "estimator": result["estimator"],
+                "fit_seconds": result["fit_seconds"],
+                "reused_version": result.get("reused_version", False),
+                "latency": result["latency"],
+                "model_size_bytes": result["model_size_bytes"],
+                "search": result.get("search"),
+                "cache": result.get("cache"),
+                "stage_seconds": result["stage_seconds"],
+                "model_path": model_path
+            }
+        )
+    except JobCancelledError:
+        logger.info(f"Job {job_id} cancelado")
+        await run_inference(job_store.update, job_id, status="cancelled")
+    except ValueError as e:
+        logger.error(f"Job {job_id}: erro de validação: {str(e)}")
+        await run_inference(job_store.update, job_id, status="failed", error=str(e))
+    except Exception as e:
+        logger.error(f"Job {job_id}: erro durante treino: {str(e)}")
+        await run_inference(
+            job_store.update, job_id, status="failed", error=f"Erro durante treino: {str(e)}"
+        )
+    finally:
+        job = await run_inference(job_store.update, job_id, finished_at=time.time())
+        if job is not None:
+            TRAINING_JOBS_TOTAL.inc(job.kind, job.status)
+        if csv_path is not None:
+            csv_path.unlink(missing_ok=True)
+        progress.clear()
+        _progress.pop(job_id, None)
+
+
+async def _run_compare_job(
+    job_id: str,
+    csv_path: Optional[Path],
+    test_size: float,
+    estimator_names: List[str],
+    preprocessing: Optional[str],
+    drop_invalid: bool,
+    dataset_query: Optional[Dict[str, Any]]
+):
+    """Executa a comparação no pool de processos e acompanha o estágio"""
+    progress = _progress[job_id]
+    future = asyncio.ensure_future(
+        run_training(
+            compare_estimators, str(csv_path) if csv_path is not None else None, test_size,
+            estimator_names, preprocessing, progress, drop_invalid, dataset_query
+        )
+    )
+    
+    try:
+        result = await _follow(job_id, future, progress)
+        for artifact, outcome in (result.get("cache") or {}).items():
+            ARTIFACT_CACHE_LOOKUPS_TOTAL.inc(artifact, outcome)
+        await run_inference(
+            job_store.update,
+            job_id,
+            status="completed",
+            result={"status": "success", "message": "Comparação concluída", **result}
+        )
+    except JobCancelledError:
+        logger.info(f"Job {job_id} cancelado")
+        await run_inference(job_store.update, job_id, status="cancelled")
+    except ValueError as e:
+        logger.error(f"Job {job_id}: erro de validação: {str(e)}")
+        await run_inference(job_store.update, job_id, status="failed", error=str(e))
+    except Exception as e:
+        logger.error(f"Job {job_id}: erro durante comparação: {str(e)}")
+        await run_inference(
+            job_store.update, job_id, status="failed", error=f"Erro durante comparação: {str(e)}"
+        )
+    finally:
+        job = await run_inference(job_store.update, job_id, finished_at=time.time())
+        if job is not None:
+            TRAINING_JOBS_TOTAL.inc(job.kind, job.status)
+        if csv_path is not None:
+            csv_path.unlink(missing_ok=True)
+        progress.clear()
+        _progress.pop(job_id, None)
+
+
+async def _follow(job_id: str, future: asyncio.Future, progress: JobProgress) -> Any:
+    """
+    Acompanha o estágio publicado pelo processo até o fim e retorna o resultado
+    
+    O job fica queued enquanto espera na fila do pool de processos; passa a
+    running quando o processo publica o primeiro estágio, com started_at
+    no instante publicado pelo processo (ver JobProgress). A cada
+    JOB_HEARTBEAT_SECONDS grava heartbeat_at, para que os outros workers
+    detectem um job cujo dono morreu.
+    """
+    last_stage = None
+    last_heartbeat = time.time()
+    while not future.done():
+        await asyncio.wait({future}, timeout=JOB_POLL_INTERVAL_SECONDS)
+        stage = progress.stage()
+        fields: Dict[str, Any] = {}
+        if stage is not None and stage != last_stage:
+            fields["stage"] = stage
+            if last_stage is None:
+                fields.update(status="running", started_at=progress.started_at() or time.time())
+            last_stage = stage
+        # Sinal de vida para os outros workers (ver Job.is_stale)
+        if time.time() - last_heartbeat >= JOB_HEARTBEAT_SECONDS:
+            last_heartbeat = time.time()
+            fields["heartbeat_at"] = last_heartbeat
+        if fields:
+            job = await run_inference(job_store.update, job_id, **fields)
+        else:
+            job = await run_inference(job_store.get, job_id)
+        # Cancelamento pedido em outro worker (JobStore compartilhado)
+        if job is not None and job.cancel_requested:
+            progress.cancel()
+    
+    if last_stage is None:
+        # Terminou entre duas consultas, sem o estágio ter sido visto
+        await run_inference(
+            job_store.update, job_id, status="running",
+            started_at=progress.started_at() or time.time()
+        )
+    return future.result()
@@ -0,0 +1,185 @@
+"""
+Schema das colunas do dataset
+
+Fonte única para o tipo de cada coluna: os dtypes de leitura do CSV, as
+regras do validador, o ColumnTransformer do modelo e a validação da
+entrada de predição são todos derivados daqui, em vez de inferidos a
+partir do dtype que o pandas escolher.
+"""
+from typing import Any, Dict, List, Optional
+
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+from app.config import (
+    PREPROCESSING_MODE,
+    PREPROCESSING_MODES,
+    REQUIRED_COLUMNS,
+    VALID_DELAY_LABELS,
+    VALID_TRAFFIC_LEVELS
+)
+
+
+class FeatureSpec:
+    """
+    Definição de uma coluna
+    
+    Attributes:
+        name: Nome da coluna
+        kind: "categorical" ou "numerical"
+        dtype: dtype do pandas usado na leitura do CSV
+        role: "feature", "target" ou "id" (apenas features entram no modelo)
+        allowed_values: Valores permitidos (categóricas), ou None
+        min_value / max_value: Faixa permitida (numéricas), ou None
+        nullable: Se a coluna aceita valores faltantes
+        integer: Se o valor numérico é conceitualmente inteiro
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        dtype: str,
+        role: str = "feature",
+        allowed_values: Optional[List[str]] = None,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None,
+        nullable: bool = False,
+        integer: bool = False
+    ):
+        self.name = name
+        self.kind = kind
+        self.dtype = dtype
+        self.role = role
+        self.allowed_values = allowed_values
+        self.min_value = min_value
+        self.max_value = max_value
+        self.nullable = nullable
+        self.integer = integer
+    
+    @property
+    def is_feature(self) -> bool:
+        return self.role == "feature"
+    
+    @property
+    def type_label(self) -> str:
+        """Nome do tipo nas mensagens de erro"""
+        if self.kind == "numerical":
+            return "int" if self.integer else "float"
+        return "str"
+    
+    def range_message(self) -> Optional[str]:
+        """Descrição da faixa permitida (ou None se não houver)"""
+        if self.min_value is not None and self.max_value is not None:
+            return f"{self.name} deve estar entre {self.min_value:g} e {self.max_value:g}"
+        if self.min_value is not None:
+            return f"{self.name} deve ser maior ou igual a {self.min_value:g}"
+        if self.max_value is not None:
+            return f"{self.name} deve ser menor ou igual a {self.max_value:g}"
+        return None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+# Categóricos como category; numéricos como float32 (compacto e aceita NaN,
+# que é reportado pelo validador)
+_SPECS = {
+    spec.name: spec for spec in [
+        FeatureSpec("freight_description", "categorical", "object", role="id", nullable=True),
+        FeatureSpec(
+            "delay_label", "categorical", "category",
+            role="target", allowed_values=VALID_DELAY_LABELS
+        ),
+        FeatureSpec("route_variant_id", "categorical", "category", nullable=True),
+        FeatureSpec(
+            "planned_departure_hour", "numerical", "float32",
+            min_value=0, max_value=23, integer=True
+        ),
+        FeatureSpec(
+            "traffic_level_forecast", "categorical", "category",
+            allowed_values=VALID_TRAFFIC_LEVELS
+        ),
+        FeatureSpec("rain_forecast_mm", "numerical", "float32", min_value=0),
+        FeatureSpec("cargo_weight_kg", "numerical", "float32", min_value=0),
+        FeatureSpec("vehicle_type", "categorical", "category"),
+        FeatureSpec("historical_avg_route_time_min", "numerical", "float32", min_value=0),
+        FeatureSpec("distance_km", "numerical", "float32", min_value=0),
+    ]
+}
+
+# Schema na ordem das colunas do CSV
+SCHEMA: List[FeatureSpec] = [_SPECS[name] for name in REQUIRED_COLUMNS]
+SCHEMA_BY_NAME: Dict[str, FeatureSpec] = {spec.name: spec for spec in SCHEMA}
+
+TARGET_COLUMN = next(spec.name for spec in SCHEMA if spec.role == "target")
+
+
+def feature_specs() -> List[FeatureSpec]:
+    """Especificações das colunas que entram no modelo"""
+    return [spec for spec in SCHEMA if spec.is_feature]
+
+
+def categorical_features() -> List[str]:
+    return [spec.name for spec in feature_specs() if spec.kind == "categorical"]
+
+
+def numerical_features() -> List[str]:
+    return [spec.name for spec in feature_specs() if spec.kind == "numerical"]
+
+
+def feature_columns() -> List[str]:
+    """Colunas de entrada do modelo, na ordem do ColumnTransformer"""
+    return numerical_features() + categorical_features()
+
+
+def csv_dtypes(numeric_dtype: Optional[str] = None) -> Dict[str, str]:
+    """
+    dtypes para pd.read_csv (sem inferência de tipos)
+    
+    Args:
+        numeric_dtype: Sobrescreve o dtype das colunas numéricas (ex.:
+            "float64" na predição, para manter a precisão da entrada)
+    """
+    return {
+        spec.name: numeric_dtype if numeric_dtype and spec.kind == "numerical" else spec.dtype
+        for spec in SCHEMA
+    }
+
+
+# Código das categorias desconhecidas ou faltantes no modo ordinal
+ORDINAL_UNKNOWN_VALUE = -1
+
+
+def build_preprocessor(mode: str = PREPROCESSING_MODE) -> ColumnTransformer:
+    """
+    ColumnTransformer montado a partir do schema
+    
+    Args:
+        mode: Codificação das categóricas (ver PREPROCESSING_MODES)
+            dense: one-hot denso, uma coluna float64 por categoria
+            sparse: one-hot em matriz CSR (memória proporcional às linhas,
+                não às categorias)
+            ordinal: uma coluna por feature com o código da categoria
+                (desconhecidas e faltantes = ORDINAL_UNKNOWN_VALUE)
+    """
+    if mode not in PREPROCESSING_MODES:
+        raise ValueError(f"preprocessing deve ser um de {PREPROCESSING_MODES}")
+    
+    if mode == "ordinal":
+        encoder = OrdinalEncoder(
+            handle_unknown="use_encoded_value",
+            unknown_value=ORDINAL_UNKNOWN_VALUE,
+            encoded_missing_value=ORDINAL_UNKNOWN_VALUE
+        )
+    else:
+        encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=mode == "sparse")
+    
+    return ColumnTransformer(
+        transformers=[
+            ("num", StandardScaler(), numerical_features()),
+            ("cat", encoder, categorical_features())
+        ],
+        # No modo sparse a saída fica em CSR mesmo com poucas categorias
+        sparse_threshold=1.0 if mode == "sparse" else 0.0
+    )
@@ -0,0 +1,168 @@
+"""
+Cache de artefatos de treino endereçado por conteúdo
+
+Cada entrada é um arquivo joblib em <root>/<tipo>/<chave>.joblib, onde a
+chave é o hash dos bytes de entrada e da configuração que produziu o
+artefato. Um arquivo nunca é sobrescrito com conteúdo diferente, então
+vários processos podem ler e gravar sem lock: a gravação é atômica
+(arquivo temporário + rename) e a remoção de um arquivo lido por outro
+processo não afeta a leitura em andamento.
+
+A ordem de uso (LRU) é o mtime do arquivo, atualizado a cada leitura;
+depois de cada gravação, as entradas mais antigas são removidas até o
+total caber em max_bytes.
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib
+
+from app.config import ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_ENABLED, ARTIFACT_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Incrementar quando o formato de algum artefato mudar (invalida o cache)
+CACHE_FORMAT_VERSION = 1
+
+_READ_BLOCK_BYTES = 1024 * 1024
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 do conteúdo de um arquivo, lido em blocos"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_READ_BLOCK_BYTES)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_key(*parts: Any) -> str:
+    """Chave estável para partes serializáveis em JSON (dicts em qualquer ordem)"""
+    payload = json.dumps([CACHE_FORMAT_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ArtifactCache:
+    """Artefatos em disco por (tipo, chave), com limite de tamanho e remoção LRU"""
+
+    def __init__(
+        self,
+        root: Path = ARTIFACT_CACHE_DIR,
+        max_bytes: int = ARTIFACT_CACHE_MAX_BYTES,
+        enabled: bool = ARTIFACT_CACHE_ENABLED
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.enabled = enabled and max_bytes > 0
+
+    def _path(self, kind: str, key: str) -> Path:
+        return self.root / kind / f"{key}.joblib"
+
+    def get(self, kind: str, key: str, mmap_mode: Optional[str] = None) -> Optional[Any]:
+        """
+        Lê um artefato (None se ausente ou ilegível)
+
+        Args:
+            kind: Tipo do artefato (subdiretório)
+            key: Chave (ver make_key)
+            mmap_mode: Repassado a joblib.load (arrays grandes mapeados do disco)
+        """
+        if not self.enabled:
+            return None
+        path = self._path(kind, key)
+        try:
+            value = joblib.load(path, mmap_mode=mmap_mode)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Entrada do cache ilegível ({kind}/{key}): {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        # Marca o uso para a ordem LRU
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return value
+
+    def put(self, kind: str, key: str, value: Any):
+        """Grava um artefato e remove as entradas mais antigas acima do limite"""
+        if not self.enabled:
+            return
+        path = self._path(kind, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            joblib.dump(value, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def delete(self, kind: str, key: str):
+        self._path(kind, key).unlink(missing_ok=True)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Entradas do cache, da usada há mais tempo para a mais recente"""
+        found = []
+        if self.root.exists():
+            for path in self.root.glob("*/*.joblib"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                found.append({
+                    "kind": path.parent.name,
+                    "key": path.stem,
+                    "size_bytes": stat.st_size,
+                    "last_used": stat.st_mtime,
+                    "path": path
+                })
+        return sorted(found, key=lambda entry: entry["last_used"])
+
+    def evict(self) -> int:
+        """
+        Remove as entradas usadas há mais tempo até o total caber em max_bytes
+
+        Returns:
+            Quantidade de entradas removidas
+        """
+        entries = self.entries()
+        total = sum(entry["size_bytes"] for entry in entries)
+        removed = 0
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            entry["path"].unlink(missing_ok=True)
+            total -= entry["size_bytes"]
+            removed += 1
+        if removed:
+            logger.info(f"Cache de artefatos: {removed} entradas removidas (limite {self.max_bytes} bytes)")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Tamanho e quantidade de entradas por tipo"""
+        kinds: Dict[str, Dict[str, int]] = {}
+        for entry in self.entries():
+            kind = kinds.setdefault(entry["kind"], {"entries": 0, "size_bytes": 0})
+            kind["entries"] += 1
+            kind["size_bytes"] += entry["size_bytes"]
+        return {
+            "enabled": self.enabled,
+            "max_bytes": self.max_bytes,
+            "size_bytes": sum(kind["size_bytes"] for kind in kinds.values()),
+            "kinds": kinds
+        }
+
+
+# Instância global do cache de artefatos
+artifact_cache = ArtifactCache()
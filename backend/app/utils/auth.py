@@ -0,0 +1,28 @@
+"""
+Autorização de recursos administrativos
+
+Não há usuários na API: recursos restritos exigem o header X-Admin-Token
+igual a ADMIN_TOKEN. Sem ADMIN_TOKEN configurado, ficam desativados.
+"""
+import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.config import ADMIN_TOKEN
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Confere o token (comparação em tempo constante)"""
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Dependência FastAPI: responde 403 sem um token de administrador válido"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=403,
+            detail="Recurso administrativo desativado (ADMIN_TOKEN não configurado)"
+        )
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Token de administrador inválido")
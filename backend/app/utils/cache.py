@@ -0,0 +1,117 @@
+"""
+Cache de predições em memória (LRU + TTL)
+
+A chave é o vetor de features canonicalizado mais a versão do modelo, de
+modo que o mesmo frete reenviado (ex.: o formulário de predição postado
+de novo com campos irrelevantes alterados) não passa pelo modelo outra vez.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from app.config import (
+    PREDICTION_CACHE_ENABLED,
+    PREDICTION_CACHE_SIZE,
+    PREDICTION_CACHE_TTL_SECONDS
+)
+
+
+class PredictionCache:
+    """Cache LRU com expiração por tempo e contadores de acerto"""
+    
+    def __init__(
+        self,
+        max_size: int = PREDICTION_CACHE_SIZE,
+        ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS,
+        enabled: bool = PREDICTION_CACHE_ENABLED
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled and max_size > 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def make_key(
+        data: Dict[str, Any],
+        categorical_features: List[str],
+        numerical_features: List[str],
+        model_version: str
+    ) -> Optional[Tuple]:
+        """
+        Canonicaliza as features de entrada em uma chave
+        
+        Numéricos viram float (8 == 8.0) e categóricos viram str; campos
+        que não são features do modelo são ignorados.
+        
+        Returns:
+            Chave do cache, ou None se a entrada não puder ser normalizada
+        """
+        try:
+            return (
+                model_version,
+                tuple(str(data[name]) for name in categorical_features),
+                tuple(float(data[name]) for name in numerical_features)
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+    
+    def get(self, key: Optional[Hashable]) -> Optional[Dict[str, Any]]:
+        """Retorna uma cópia do resultado em cache (ou None)"""
+        if not self.enabled or key is None:
+            return None
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            stored_at, value = entry
+            if self.ttl_seconds > 0 and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+    
+    def set(self, key: Optional[Hashable], value: Dict[str, Any]):
+        """Armazena um resultado, removendo o menos usado se necessário"""
+        if not self.enabled or key is None:
+            return
+        
+        with self._lock:
+            self._entries[key] = (time.monotonic(), dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Invalida todas as entradas (ex.: troca de modelo)"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Contadores do cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
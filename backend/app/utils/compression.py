@@ -0,0 +1,115 @@
+"""
+Compressão das respostas HTTP (brotli ou gzip)
+
+Middleware ASGI que comprime o corpo de respostas a partir de um tamanho
+mínimo, escolhendo a codificação pelo Accept-Encoding do cliente (brotli
+tem preferência sobre gzip com a mesma qualidade). Só respostas com o
+corpo em uma única mensagem são comprimidas; streams (arquivos
+estáticos, por exemplo) passam sem alteração.
+"""
+import gzip
+from typing import Optional
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import (
+    RESPONSE_BROTLI_QUALITY,
+    RESPONSE_COMPRESSION_ENABLED,
+    RESPONSE_COMPRESSION_MIN_BYTES,
+    RESPONSE_GZIP_LEVEL
+)
+
+# Em ordem de preferência
+ENCODINGS = ["br", "gzip"]
+
+# Tipos que já chegam comprimidos
+_SKIP_CONTENT_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Codificação aceita pelo cliente (None se nenhuma for suportada)"""
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name.lower()] = q
+
+    wildcard = accepted.get("*", 0.0)
+    candidates = [(accepted.get(name, wildcard), -rank, name) for rank, name in enumerate(ENCODINGS)]
+    q, _, name = max(candidates)
+    return name if q > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=RESPONSE_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI de compressão das respostas
+
+    Segura o início da resposta até o primeiro bloco do corpo para decidir
+    se comprime (corpo inteiro, acima de minimum_size e ainda sem
+    Content-Encoding) e ajustar Content-Length.
+    """
+
+    def __init__(self, app, minimum_size: int = RESPONSE_COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not RESPONSE_COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or content_type.startswith(_SKIP_CONTENT_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,352 @@
+"""
+Store de datasets de treino em Parquet
+
+Cada upload ingerido vira um dataset imutável em DATASETS_DIR/<id>/:
+    <chave>=<valor>/part-0.parquet   dados particionados (estilo Hive)
+    meta.json                        metadados (gravado por último)
+A chave de partição é a data do upload ou a rota (route_variant_id).
+
+Os dados são gravados já validados, com os tipos do schema: categóricas
+viram colunas com dictionary encoding e numéricas float32. O treino lê
+apenas as colunas usadas (sem freight_description), sem re-interpretar
+texto; um treino pode usar um ou mais datasets por id ou por intervalo
+de datas de upload.
+"""
+import json
+import os
+import shutil
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from app.config import CSV_CHUNK_ROWS, DATASET_PARTITION_KEYS, DATASETS_DIR
+from app.schema import SCHEMA, SCHEMA_BY_NAME, csv_dtypes
+from app.utils.ingestion import concat_chunks, read_training_csv, validate_chunks
+from app.utils.metrics import StageTimer
+
+DATASET_META_FILENAME = "meta.json"
+
+# Colunas lidas no treino (o identificador do frete não entra no modelo)
+TRAINING_COLUMNS = [spec.name for spec in SCHEMA if spec.role != "id"]
+
+# Assinaturas dos formatos aceitos no upload
+_PARQUET_MAGIC = b"PAR1"
+_ARROW_FILE_MAGIC = b"ARROW1"
+_ARROW_STREAM_MAGIC = b"\xff\xff\xff\xff"
+
+
+class DatasetNotFoundError(LookupError):
+    """Dataset pedido não existe no store"""
+
+
+def detect_format(path: Path) -> str:
+    """Formato do arquivo pelos primeiros bytes: "parquet", "arrow" ou "csv" """
+    with open(path, "rb") as f:
+        head = f.read(6)
+    if head.startswith(_PARQUET_MAGIC):
+        return "parquet"
+    if head.startswith(_ARROW_FILE_MAGIC) or head.startswith(_ARROW_STREAM_MAGIC):
+        return "arrow"
+    return "csv"
+
+
+def parse_date(value: Optional[str], field: str) -> Optional[date]:
+    """Converte "AAAA-MM-DD" (ou None) em date"""
+    if value is None or value == "":
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{field} deve estar no formato AAAA-MM-DD")
+
+
+class DatasetStore:
+    """Datasets de treino particionados em Parquet, um diretório por upload"""
+
+    def __init__(self, root: Path = DATASETS_DIR):
+        self.root = Path(root)
+
+    def _dataset_dir(self, dataset_id: str) -> Path:
+        # Impede caminhos fora do store ("../x")
+        if not dataset_id or dataset_id != Path(dataset_id).name or dataset_id.startswith("."):
+            raise DatasetNotFoundError(f"Dataset {dataset_id} não encontrado")
+        return self.root / dataset_id
+
+    def exists(self, dataset_id: str) -> bool:
+        """Dataset gravado por completo (meta.json é gravado por último)"""
+        try:
+            return (self._dataset_dir(dataset_id) / DATASET_META_FILENAME).exists()
+        except DatasetNotFoundError:
+            return False
+
+    def get(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Metadados de um dataset (None se não existir)"""
+        if not self.exists(dataset_id):
+            return None
+        with open(self._dataset_dir(dataset_id) / DATASET_META_FILENAME, encoding="utf-8") as f:
+            return json.load(f)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Datasets gravados, do mais novo para o mais antigo"""
+        datasets = []
+        if self.root.exists():
+            for path in self.root.iterdir():
+                meta = self.get(path.name) if path.is_dir() else None
+                if meta is not None:
+                    datasets.append(meta)
+        return sorted(datasets, key=lambda meta: meta["created_at"], reverse=True)
+
+    def delete(self, dataset_id: str) -> bool:
+        if not self.exists(dataset_id):
+            return False
+        shutil.rmtree(self._dataset_dir(dataset_id))
+        return True
+
+    def ingest(
+        self,
+        path: str,
+        filename: Optional[str] = None,
+        partition_by: str = "upload_date",
+        drop_invalid: bool = False,
+        timer: Optional[StageTimer] = None
+    ) -> Dict[str, Any]:
+        """
+        Lê, valida e grava um upload (CSV, Parquet ou Arrow) como dataset
+
+        Roda no pool de processos (ver run_training).
+
+        Args:
+            path: Arquivo enviado (já copiado para disco)
+            filename: Nome original do arquivo (apenas informativo)
+            partition_by: "upload_date" ou "route_variant_id"
+            drop_invalid: Descartar linhas inválidas em vez de falhar
+            timer: Acumula a duração de cada estágio (opcional)
+
+        Returns:
+            Metadados do dataset criado
+
+        Raises:
+            ValueError: Se o arquivo não puder ser lido ou não passar na validação
+        """
+        if partition_by not in DATASET_PARTITION_KEYS:
+            raise ValueError(f"partition_by deve ser um de {DATASET_PARTITION_KEYS}")
+        timer = timer or StageTimer()
+        path = Path(path)
+
+        source_format = detect_format(path)
+        if source_format == "csv":
+            df, warnings = read_training_csv(path, drop_invalid=drop_invalid, timer=timer)
+        else:
+            df, warnings = read_training_table(path, source_format, drop_invalid, timer)
+
+        now = datetime.now()
+        dataset_id = f"{now:%Y%m%d}-{uuid.uuid4().hex[:8]}"
+        upload_date = now.strftime("%Y-%m-%d")
+
+        with timer("write_parquet"):
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if partition_by == "upload_date":
+                table = table.append_column(
+                    "upload_date", pa.array([upload_date] * len(table), pa.string())
+                )
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp_dir = self.root / f".{dataset_id}.tmp"
+            try:
+                pq.write_to_dataset(
+                    table, tmp_dir,
+                    partition_cols=[partition_by],
+                    basename_template="part-{i}.parquet"
+                )
+                meta = {
+                    "id": dataset_id,
+                    "filename": filename,
+                    "source_format": source_format,
+                    "upload_date": upload_date,
+                    "created_at": now.strftime("%Y-%m-%d %H:%M:%S"),
+                    "partition_by": partition_by,
+                    "partitions": sorted(
+                        p.name.split("=", 1)[1] for p in tmp_dir.iterdir() if p.is_dir()
+                    ),
+                    "n_rows": len(df),
+                    "size_bytes": sum(f.stat().st_size for f in tmp_dir.rglob("*.parquet")),
+                    "columns": list(df.columns),
+                    "warnings": warnings
+                }
+                with open(tmp_dir / DATASET_META_FILENAME, "w", encoding="utf-8") as f:
+                    json.dump(meta, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_dir, self._dataset_dir(dataset_id))
+            except BaseException:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+        return meta
+
+    def select(
+        self,
+        dataset_ids: Optional[List[str]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Datasets escolhidos por id ou por intervalo de datas de upload
+
+        Args:
+            dataset_ids: Ids dos datasets (têm prioridade sobre as datas)
+            date_from / date_to: Intervalo fechado "AAAA-MM-DD" (um dos
+                lados pode ficar em aberto)
+
+        Returns:
+            Metadados dos datasets, do mais antigo para o mais novo
+
+        Raises:
+            DatasetNotFoundError: Id inexistente ou intervalo sem datasets
+            ValueError: Data em formato inválido
+        """
+        if dataset_ids:
+            selected = []
+            for dataset_id in dataset_ids:
+                meta = self.get(dataset_id)
+                if meta is None:
+                    raise DatasetNotFoundError(f"Dataset {dataset_id} não encontrado")
+                selected.append(meta)
+            return selected
+
+        start = parse_date(date_from, "date_from")
+        end = parse_date(date_to, "date_to")
+        if start and end and start > end:
+            raise ValueError("date_from deve ser anterior ou igual a date_to")
+        selected = [
+            meta for meta in reversed(self.list())
+            if (start is None or date.fromisoformat(meta["upload_date"]) >= start)
+            and (end is None or date.fromisoformat(meta["upload_date"]) <= end)
+        ]
+        if not selected:
+            raise DatasetNotFoundError("Nenhum dataset no intervalo de datas informado")
+        return selected
+
+    def load(
+        self,
+        dataset_ids: Optional[List[str]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        timer: Optional[StageTimer] = None
+    ) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        """
+        Lê os datasets escolhidos (ver select) em um único DataFrame
+
+        Args:
+            columns: Colunas lidas (padrão: TRAINING_COLUMNS)
+            timer: Acumula o tempo de leitura (read_parquet)
+
+        Returns:
+            Tuple de (DataFrame com os tipos do schema, metadados dos datasets)
+        """
+        timer = timer or StageTimer()
+        columns = columns or TRAINING_COLUMNS
+        selected = self.select(dataset_ids, date_from, date_to)
+        dtypes = {name: dtype for name, dtype in csv_dtypes().items() if name in columns}
+
+        frames = []
+        with timer("read_parquet"):
+            for meta in selected:
+                dataset_dir = self._dataset_dir(meta["id"])
+                dataset = ds.dataset(
+                    sorted(str(f) for f in dataset_dir.rglob("*.parquet")),
+                    format="parquet",
+                    # Chave de partição como texto simples: um dicionário
+                    # inferido não unifica com a partição de nulos
+                    # (__HIVE_DEFAULT_PARTITION__, lida de volta como nulo)
+                    partitioning=ds.HivePartitioning(
+                        pa.schema([(meta["partition_by"], pa.string())])
+                    ),
+                    partition_base_dir=str(dataset_dir)
+                )
+                table = dataset.to_table(columns=columns)
+                # Dicionários e a coluna de partição viram category
+                frames.append(table.to_pandas().astype(dtypes))
+            df = concat_chunks(frames)
+        return df[columns], selected
+
+
+def read_training_table(
+    path: Path,
+    source_format: str,
+    drop_invalid: bool = False,
+    timer: Optional[StageTimer] = None,
+    chunk_rows: int = CSV_CHUNK_ROWS
+) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Lê e valida um upload Parquet ou Arrow (IPC) em lotes, como read_training_csv
+
+    Returns:
+        Tuple de (DataFrame com os tipos do schema, warnings)
+    """
+    try:
+        schema = (
+            pq.read_schema(path) if source_format == "parquet"
+            else _open_arrow(path).schema
+        )
+    except (pa.ArrowException, OSError) as e:
+        raise ValueError(f"Erro ao ler arquivo {source_format}: {e}")
+
+    warnings = []
+    extra_columns = [name for name in schema.names if name not in SCHEMA_BY_NAME]
+    if extra_columns:
+        warnings.append(
+            f"Colunas extras detectadas (serão ignoradas): {', '.join(extra_columns)}"
+        )
+    columns = [name for name in schema.names if name in SCHEMA_BY_NAME]
+
+    df, chunk_warnings = validate_chunks(
+        _iter_table_chunks(path, source_format, columns, chunk_rows),
+        drop_invalid=drop_invalid,
+        timer=timer,
+        read_stage=f"read_{source_format}"
+    )
+    return df, warnings + chunk_warnings
+
+
+def _open_arrow(path: Path):
+    """Leitor de Arrow IPC: formato de arquivo (Feather v2) ou de stream"""
+    try:
+        return ipc.open_file(path)
+    except pa.ArrowInvalid:
+        return ipc.open_stream(pa.memory_map(str(path)))
+
+
+def _iter_table_chunks(
+    path: Path, source_format: str, columns: List[str], chunk_rows: int
+) -> Iterator[pd.DataFrame]:
+    """Lotes do arquivo com os dtypes do schema (índice = posição no arquivo)"""
+    dtypes = {name: dtype for name, dtype in csv_dtypes().items() if name in columns}
+    try:
+        if source_format == "parquet":
+            batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns)
+        else:
+            reader = _open_arrow(path)
+            if isinstance(reader, ipc.RecordBatchFileReader):
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            else:
+                batches = iter(reader)
+
+        offset = 0
+        for batch in batches:
+            chunk = batch.select(columns).to_pandas().astype(dtypes)
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+    except (pa.ArrowException, OSError, TypeError, ValueError) as e:
+        raise ValueError(
+            f"Erro ao ler arquivo {source_format} (verifique os tipos das colunas): {e}"
+        )
+
+
+# Instância global do store
+dataset_store = DatasetStore()
@@ -0,0 +1,148 @@
+"""
+Camada de execução para trabalho bloqueante
+
+Inferência (sklearn/pandas) roda em um pool de threads limitado e treino
+roda em um pool de processos separado, para que o event loop do uvicorn
+continue respondendo (/api/health, predições) durante um treino.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from threadpoolctl import threadpool_limits
+
+from app.config import INFERENCE_THREADS, TRAINING_PROCESSES, NATIVE_THREADS_PER_WORKER
+from app.utils.metrics import INFERENCE_QUEUE_SECONDS
+
+
+_lock = threading.Lock()
+_inference_pool: Optional[ThreadPoolExecutor] = None
+_training_pool: Optional[ProcessPoolExecutor] = None
+_manager = None
+_progress_board = None
+
+
+# Variáveis lidas pelas bibliotecas nativas ao iniciar um processo
+_NATIVE_THREAD_ENV_VARS = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS"
+]
+
+
+def limit_native_threads(n_threads: int = NATIVE_THREADS_PER_WORKER):
+    """
+    Limita as threads BLAS/OpenMP do processo atual
+    
+    Ajusta as bibliotecas já carregadas (threadpoolctl) e as variáveis de
+    ambiente herdadas por processos filhos. 0 desativa o limite.
+    """
+    if n_threads <= 0:
+        return
+    for var in _NATIVE_THREAD_ENV_VARS:
+        os.environ[var] = str(n_threads)
+    threadpool_limits(limits=n_threads)
+
+
+def get_inference_pool() -> ThreadPoolExecutor:
+    """Retorna o pool de threads de inferência (criado sob demanda)"""
+    global _inference_pool
+    with _lock:
+        if _inference_pool is None:
+            _inference_pool = ThreadPoolExecutor(
+                max_workers=INFERENCE_THREADS,
+                thread_name_prefix="inference"
+            )
+        return _inference_pool
+
+
+def get_training_pool() -> ProcessPoolExecutor:
+    """
+    Retorna o pool de processos de treino (criado sob demanda)
+    
+    Usa o contexto "spawn" para não herdar threads e locks do servidor.
+    """
+    global _training_pool
+    with _lock:
+        if _training_pool is None:
+            _training_pool = ProcessPoolExecutor(
+                max_workers=TRAINING_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=limit_native_threads,
+                initargs=(NATIVE_THREADS_PER_WORKER,)
+            )
+        return _training_pool
+
+
+def get_progress_board():
+    """
+    Retorna um dicionário compartilhado entre processos (Manager)
+    
+    Usado pelos jobs de treino para publicar o estágio atual e receber
+    pedidos de cancelamento a partir do processo do servidor.
+    """
+    global _manager, _progress_board
+    with _lock:
+        if _progress_board is None:
+            _manager = multiprocessing.get_context("spawn").Manager()
+            _progress_board = _manager.dict()
+        return _progress_board
+
+
+async def run_inference(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Executa uma função de inferência no pool de threads"""
+    loop = asyncio.get_running_loop()
+    submitted = time.perf_counter()
+    
+    def call():
+        # Espera na fila do pool (todas as threads ocupadas)
+        INFERENCE_QUEUE_SECONDS.observe(time.perf_counter() - submitted)
+        return func(*args, **kwargs)
+    
+    return await loop.run_in_executor(get_inference_pool(), call)
+
+
+async def run_training(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Executa uma função de treino no pool de processos
+    
+    A função e seus argumentos precisam ser serializáveis (pickle).
+    """
+    global _training_pool
+    loop = asyncio.get_running_loop()
+    pool = get_training_pool()
+    try:
+        return await loop.run_in_executor(
+            pool, functools.partial(func, *args, **kwargs)
+        )
+    except BrokenProcessPool:
+        # Um worker morreu (ex.: falta de memória): descartar o pool
+        # para que o próximo treino crie um novo
+        with _lock:
+            if _training_pool is pool:
+                _training_pool = None
+        raise
+
+
+def shutdown_executors():
+    """Encerra os pools (chamado no shutdown da aplicação)"""
+    global _inference_pool, _training_pool, _manager, _progress_board
+    with _lock:
+        if _inference_pool is not None:
+            _inference_pool.shutdown(wait=False, cancel_futures=True)
+            _inference_pool = None
+        if _training_pool is not None:
+            _training_pool.shutdown(wait=False, cancel_futures=True)
+            _training_pool = None
+        if _manager is not None:
+            _manager.shutdown()
+            _manager = None
+            _progress_board = None
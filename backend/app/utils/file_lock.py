@@ -0,0 +1,56 @@
+"""
+Lock exclusivo entre processos
+
+Os workers do servidor (gunicorn) e os processos de treino compartilham
+arquivos em disco (base acumulada, registry.json). FileLock usa flock em
+um arquivo de lock ao lado do arquivo protegido: o lock é liberado pelo
+sistema se o processo morrer. É reentrante na mesma thread, para que um
+método que trava possa ser chamado dentro de um trecho já travado.
+"""
+import fcntl
+import os
+import threading
+from pathlib import Path
+
+
+class FileLock:
+    """
+    Lock de um arquivo, usado como context manager
+
+    Uso:
+        lock = FileLock(path.with_suffix(".lock"))
+        with lock:
+            ...  # leitura → escrita sem outro processo no meio
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def acquire(self):
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                # Bloqueia até o outro processo (ou thread) liberar
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                os.close(fd)
+                raise
+            self._local.fd = fd
+        self._local.depth = depth + 1
+
+    def release(self):
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            fd, self._local.fd = self._local.fd, None
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,206 @@
+"""
+Ingestão de CSV em streaming
+
+O upload é copiado em blocos para um arquivo temporário (sem manter os
+bytes inteiros em memória) e lido em chunks com os tipos do schema (apenas
+as colunas do schema são lidas), sendo validado chunk a chunk antes de
+montar o DataFrame final.
+"""
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from fastapi import UploadFile
+from pandas.api.types import union_categoricals
+from starlette.concurrency import run_in_threadpool
+
+from app.config import CSV_CHUNK_ROWS, UPLOAD_CHUNK_BYTES, UPLOAD_SPOOL_DIR
+from app.schema import SCHEMA_BY_NAME, csv_dtypes
+from app.utils.metrics import StageTimer
+from app.utils.validator import CSVValidator
+
+
+async def spool_upload(
+    file: UploadFile,
+    chunk_size: int = UPLOAD_CHUNK_BYTES,
+    suffix: str = ".csv"
+) -> Path:
+    """
+    Copia o upload para um arquivo temporário em blocos
+    
+    Args:
+        file: Arquivo enviado
+        chunk_size: Tamanho de cada bloco em bytes
+        suffix: Extensão do arquivo temporário
+        
+    Returns:
+        Caminho do arquivo temporário (o chamador deve removê-lo)
+    """
+    UPLOAD_SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    spool = tempfile.NamedTemporaryFile(
+        dir=UPLOAD_SPOOL_DIR, prefix="upload_", suffix=suffix, delete=False
+    )
+    try:
+        with spool:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                await run_in_threadpool(spool.write, chunk)
+    except BaseException:
+        Path(spool.name).unlink(missing_ok=True)
+        raise
+    
+    return Path(spool.name)
+
+
+def read_training_csv(
+    path: Path,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    drop_invalid: bool = False,
+    timer: Optional[StageTimer] = None
+) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Lê e valida o CSV de treino chunk a chunk
+    
+    Sem drop_invalid, a leitura é interrompida no primeiro chunk inválido,
+    sem carregar o restante do arquivo. Com drop_invalid, linhas inválidas
+    são descartadas e resumidas nos warnings.
+    
+    Args:
+        path: Caminho do CSV
+        chunk_rows: Linhas por chunk
+        drop_invalid: Descartar linhas inválidas e continuar
+        timer: Acumula o tempo de leitura (read_csv) e de validação (validate)
+        
+    Returns:
+        Tuple de (DataFrame com tipos compactos, warnings)
+        
+    Raises:
+        ValueError: Se o CSV não puder ser lido ou não passar na validação
+    """
+    warnings: List[str] = []
+    
+    # Colunas fora do schema não são lidas
+    extra_columns = [col for col in _read_header(path) if col not in SCHEMA_BY_NAME]
+    if extra_columns:
+        warnings.append(
+            f"Colunas extras detectadas (serão ignoradas): {', '.join(extra_columns)}"
+        )
+    
+    df, chunk_warnings = validate_chunks(
+        _iter_chunks(path, chunk_rows), drop_invalid=drop_invalid, timer=timer
+    )
+    return df, warnings + chunk_warnings
+
+
+def validate_chunks(
+    chunks: Iterator[pd.DataFrame],
+    drop_invalid: bool = False,
+    timer: Optional[StageTimer] = None,
+    read_stage: str = "read_csv"
+) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Valida chunks já tipados e monta o DataFrame final
+    
+    Args:
+        chunks: Chunks com os dtypes do schema (índice = posição no arquivo)
+        drop_invalid: Descartar linhas inválidas e continuar
+        timer: Acumula o tempo de leitura (read_stage) e de validação (validate)
+        read_stage: Nome do estágio de leitura no timer
+        
+    Returns:
+        Tuple de (DataFrame concatenado, warnings)
+        
+    Raises:
+        ValueError: No primeiro chunk inválido (sem drop_invalid) ou sem linhas
+    """
+    timer = timer or StageTimer()
+    validator = CSVValidator()
+    chunks_ok: List[pd.DataFrame] = []
+    warnings: List[str] = []
+    row_errors: Dict[str, Dict[str, Any]] = {}
+    n_dropped = 0
+    
+    for chunk in timer.iterate(read_stage, chunks):
+        with timer("validate"):
+            is_valid, errors, chunk_warnings = validator.validate_csv(
+                chunk, drop_invalid=drop_invalid
+            )
+        if not is_valid:
+            first = chunk.index[0] + 1
+            last = chunk.index[-1] + 1
+            raise ValueError(f"Erros de validação (linhas {first}-{last}): {errors}")
+        
+        if validator.row_errors:
+            # Só chega aqui com drop_invalid
+            n_dropped += int(validator.invalid_mask.sum())
+            validator.merge_row_errors(row_errors, validator.row_errors)
+            chunk = validator.drop_invalid_rows(chunk)
+        
+        warnings.extend(w for w in chunk_warnings if w not in warnings)
+        if len(chunk):
+            chunks_ok.append(chunk)
+    
+    if not chunks_ok:
+        if n_dropped:
+            raise ValueError(
+                "Todas as linhas são inválidas: "
+                f"{CSVValidator.format_row_errors(row_errors)}"
+            )
+        raise ValueError("Arquivo sem linhas de dados")
+    
+    if n_dropped:
+        warnings.append(f"{n_dropped} linhas inválidas descartadas")
+        warnings.extend(CSVValidator.format_row_errors(row_errors))
+    
+    with timer(read_stage):
+        df = concat_chunks(chunks_ok)
+    return df, warnings
+
+
+def _read_header(path: Path) -> List[str]:
+    """Lê apenas o cabeçalho do CSV"""
+    try:
+        return list(pd.read_csv(path, nrows=0).columns)
+    except pd.errors.EmptyDataError:
+        raise ValueError("Arquivo CSV vazio")
+
+
+def _iter_chunks(path: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Itera sobre os chunks do CSV convertendo erros de leitura em ValueError"""
+    try:
+        reader = pd.read_csv(
+            path,
+            usecols=lambda col: col in SCHEMA_BY_NAME,
+            dtype=csv_dtypes(),
+            chunksize=chunk_rows
+        )
+        with reader:
+            yield from reader
+    except pd.errors.EmptyDataError:
+        raise ValueError("Arquivo CSV vazio")
+    except (TypeError, ValueError, pd.errors.ParserError) as e:
+        raise ValueError(f"Erro ao ler CSV (verifique os tipos das colunas): {e}")
+
+
+def concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatena chunks preservando as colunas category
+    
+    pd.concat converte para object quando as categorias dos chunks
+    diferem; aqui as categorias são unificadas antes.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            categories = union_categoricals(
+                [chunk[col] for chunk in chunks], ignore_order=True
+            ).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,408 @@
+"""
+Subsistema de jobs (treino assíncrono)
+
+Cada treino vira um Job com id, status e estágio. O armazenamento é
+feito por um JobStore plugável: em memória (um processo) ou SQLite
+(compartilhado entre os workers do servidor).
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.config import (
+    JOB_HISTORY_LIMIT,
+    JOB_STALE_SECONDS,
+    JOB_STORE_BACKEND,
+    JOB_STORE_BUSY_TIMEOUT_SECONDS,
+    JOB_STORE_PATH
+)
+
+
+# Status possíveis de um job
+JOB_STATUSES = ["queued", "running", "completed", "failed", "cancelled"]
+
+# Estágios do treino, na ordem em que acontecem
+TRAINING_STAGES = ["parsing", "validating", "fitting", "evaluating", "saving"]
+
+
+class JobCancelledError(Exception):
+    """Levantada dentro do treino quando o job foi cancelado"""
+
+
+def process_owner() -> str:
+    """Identificação do processo atual como dono de jobs ("host:pid")"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    """Se o processo dono ainda existe (só verificável no mesmo host)"""
+    host, _, pid = (owner or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Job:
+    """Estado de um job de treino"""
+    
+    def __init__(self, kind: str, params: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.status = "queued"
+        self.stage: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = False
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        # Relatório de profiling (apenas jobs pedidos com profile)
+        self.profile: Optional[Dict[str, Any]] = None
+        # Processo que acompanha o job e último sinal de vida dele
+        self.owner: Optional[str] = process_owner()
+        self.heartbeat_at: Optional[float] = self.created_at
+    
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+    
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        """
+        Se o job ficou órfão: não finalizado e sem heartbeat recente ou com
+        o processo dono morto
+        """
+        if self.is_finished:
+            return False
+        last_seen = self.heartbeat_at or self.created_at
+        if (now or time.time()) - last_seen > JOB_STALE_SECONDS:
+            return True
+        return not _owner_alive(self.owner)
+    
+    def elapsed_seconds(self) -> Optional[float]:
+        """Tempo de execução (até agora, se ainda estiver rodando)"""
+        if self.started_at is None:
+            return None
+        end = self.finished_at or time.time()
+        return round(end - self.started_at, 3)
+    
+    def to_record(self) -> Dict[str, Any]:
+        """Campos brutos do job (para armazenamento)"""
+        return dict(vars(self))
+    
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "Job":
+        job = cls.__new__(cls)
+        # Registros gravados antes de um campo existir ficam com o padrão
+        job.profile = None
+        job.owner = None
+        job.heartbeat_at = None
+        job.__dict__.update(record)
+        return job
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Representação pública do job"""
+        def fmt(ts: Optional[float]) -> Optional[str]:
+            if ts is None:
+                return None
+            return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+        
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "params": self.params,
+            "created_at": fmt(self.created_at),
+            "started_at": fmt(self.started_at),
+            "finished_at": fmt(self.finished_at),
+            "elapsed_seconds": self.elapsed_seconds(),
+            "cancel_requested": self.cancel_requested,
+            "owner": self.owner,
+            "result": self.result,
+            "error": self.error,
+            "profile_url": f"/api/jobs/{self.id}/profile" if self.profile else None
+        }
+
+
+class JobStore(ABC):
+    """
+    Interface do armazenamento de jobs
+    
+    Implementações precisam ser thread-safe: as chamadas feitas a partir
+    do event loop rodam nas threads de run_inference.
+    """
+    
+    @abstractmethod
+    def add(self, job: Job) -> Job:
+        ...
+    
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        ...
+    
+    @abstractmethod
+    def update(self, job_id: str, **fields) -> Optional[Job]:
+        ...
+    
+    @abstractmethod
+    def list(self) -> List[Job]:
+        ...
+    
+    def fail_stale_jobs(self) -> int:
+        """
+        Marca como failed os jobs órfãos (ver Job.is_stale)
+        
+        Só faz sentido em stores compartilhados: em memória, os jobs morrem
+        junto com o processo que os acompanha.
+        
+        Returns:
+            Quantidade de jobs marcados
+        """
+        return 0
+
+
+class InMemoryJobStore(JobStore):
+    """JobStore em memória do processo, com histórico limitado"""
+    
+    def __init__(self, max_jobs: int = JOB_HISTORY_LIMIT):
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+    
+    def add(self, job: Job) -> Job:
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        return job
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def update(self, job_id: str, **fields) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            for name, value in fields.items():
+                setattr(job, name, value)
+            return job
+    
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+    
+    def _evict(self):
+        """Remove os jobs finalizados mais antigos acima do limite"""
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.is_finished][:excess]:
+            del self._jobs[job_id]
+
+
+class SQLiteJobStore(JobStore):
+    """
+    JobStore em arquivo SQLite, visível a todos os processos do servidor
+    
+    Cada processo mantém uma única conexão (reaberta após fork), usada por
+    uma thread de cada vez; o SQLite serializa as escritas entre processos.
+    Em modo WAL, leituras não esperam pelas escritas. As chamadas são
+    bloqueantes: no event loop, rode-as com run_inference.
+    """
+    
+    def __init__(self, path: Path = JOB_STORE_PATH, max_jobs: int = JOB_HISTORY_LIMIT):
+        self.path = Path(path)
+        self.max_jobs = max_jobs
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        with self._connect() as conn:
+            # Persistente no arquivo: vale para as conexões dos outros processos
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " created_at REAL NOT NULL,"
+                " finished INTEGER NOT NULL,"
+                " data TEXT NOT NULL)"
+            )
+    
+    @contextmanager
+    def _connect(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        Conexão do processo, reservada para uma operação
+        
+        Com write=True tudo roda em uma transação BEGIN IMMEDIATE: a
+        leitura e a escrita de update não se intercalam com outro processo.
+        """
+        with self._lock:
+            if self._conn is None or self._conn_pid != os.getpid():
+                # Conexão herdada de outro processo (fork) não é reutilizada
+                self._conn = sqlite3.connect(
+                    self.path, timeout=JOB_STORE_BUSY_TIMEOUT_SECONDS,
+                    isolation_level=None, check_same_thread=False
+                )
+                self._conn_pid = os.getpid()
+            conn = self._conn
+            try:
+                if write:
+                    conn.execute("BEGIN IMMEDIATE")
+                yield conn
+                if write:
+                    conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+    
+    def add(self, job: Job) -> Job:
+        with self._connect(write=True) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, created_at, finished, data) VALUES (?, ?, ?, ?)",
+                (job.id, job.created_at, int(job.is_finished), self._dumps(job))
+            )
+            self._evict(conn)
+        return job
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            job = self._get(conn, job_id)
+        if job is not None and job.is_stale():
+            job = self._fail_stale(job_id) or job
+        return job
+    
+    def update(self, job_id: str, **fields) -> Optional[Job]:
+        with self._connect(write=True) as conn:
+            job = self._get(conn, job_id)
+            if job is None:
+                return None
+            for name, value in fields.items():
+                setattr(job, name, value)
+            conn.execute(
+                "UPDATE jobs SET finished = ?, data = ? WHERE id = ?",
+                (int(job.is_finished), self._dumps(job), job_id)
+            )
+            return job
+    
+    def list(self) -> List[Job]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM jobs ORDER BY created_at DESC").fetchall()
+        jobs = [Job.from_record(json.loads(data)) for (data,) in rows]
+        return [
+            (self._fail_stale(job.id) or job) if job.is_stale() else job
+            for job in jobs
+        ]
+    
+    def fail_stale_jobs(self) -> int:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM jobs WHERE finished = 0").fetchall()
+        stale = [job for job in (Job.from_record(json.loads(data)) for (data,) in rows) if job.is_stale()]
+        return sum(1 for job in stale if self._fail_stale(job.id) is not None)
+    
+    def _fail_stale(self, job_id: str) -> Optional[Job]:
+        """Marca um job órfão como failed (conferido de novo dentro da transação)"""
+        with self._connect(write=True) as conn:
+            job = self._get(conn, job_id)
+            if job is None or not job.is_stale():
+                return None
+            job.status = "failed"
+            job.error = f"Worker {job.owner or 'desconhecido'} parou de acompanhar o job"
+            job.finished_at = time.time()
+            conn.execute(
+                "UPDATE jobs SET finished = ?, data = ? WHERE id = ?",
+                (int(job.is_finished), self._dumps(job), job_id)
+            )
+            return job
+    
+    @staticmethod
+    def _dumps(job: Job) -> str:
+        return json.dumps(job.to_record(), default=str)
+    
+    @staticmethod
+    def _get(conn: sqlite3.Connection, job_id: str) -> Optional[Job]:
+        row = conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_record(json.loads(row[0])) if row else None
+    
+    def _evict(self, conn: sqlite3.Connection):
+        """Remove os jobs finalizados mais antigos acima do limite"""
+        (total,) = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()
+        excess = total - self.max_jobs
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM jobs WHERE id IN ("
+                " SELECT id FROM jobs WHERE finished = 1 ORDER BY created_at LIMIT ?)",
+                (excess,)
+            )
+
+
+def create_job_store(backend: str = JOB_STORE_BACKEND) -> JobStore:
+    """Cria o JobStore configurado"""
+    if backend == "memory":
+        return InMemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore()
+    raise ValueError(f"JOB_STORE_BACKEND desconhecido: {backend}")
+
+
+class JobProgress:
+    """
+    Callback de progresso enviado para o processo de treino
+    
+    Publica o estágio atual em um dicionário compartilhado (Manager) e
+    interrompe o treino com JobCancelledError se o job foi cancelado.
+    O cancelamento é cooperativo: é verificado a cada troca de estágio.
+    Junto com o primeiro estágio publica o instante em que o processo de
+    treino começou o job (o servidor só o vê na consulta seguinte).
+    """
+    
+    def __init__(self, board, job_id: str):
+        self.board = board
+        self.job_id = job_id
+        self._started = False
+    
+    def __call__(self, stage: str):
+        if self.board.get(f"{self.job_id}:cancel"):
+            raise JobCancelledError(f"Job {self.job_id} cancelado")
+        if not self._started:
+            # Gravado antes do estágio: quem vê o estágio já encontra o início
+            self.board[f"{self.job_id}:started"] = time.time()
+            self._started = True
+        self.board[self.job_id] = stage
+    
+    def stage(self) -> Optional[str]:
+        return self.board.get(self.job_id)
+    
+    def started_at(self) -> Optional[float]:
+        """Início do job no processo de treino (None se ainda não começou)"""
+        return self.board.get(f"{self.job_id}:started")
+    
+    def cancel(self):
+        self.board[f"{self.job_id}:cancel"] = True
+    
+    def clear(self):
+        self.board.pop(self.job_id, None)
+        self.board.pop(f"{self.job_id}:cancel", None)
+        self.board.pop(f"{self.job_id}:started", None)
+
+
+# Instância global do armazenamento de jobs
+job_store = create_job_store()
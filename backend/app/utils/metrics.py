@@ -0,0 +1,525 @@
+"""
+Métricas no formato de texto do Prometheus
+
+Contadores, gauges e histogramas com rótulos, mantidos em memória e sem
+dependências externas. Cada observação custa uma busca binária nos buckets
+e um lock sem disputa (da ordem de 1 µs), o que permite instrumentar o
+caminho quente da predição.
+
+Com vários workers (METRICS_MULTIPROC_DIR), cada processo grava
+periodicamente um snapshot em <dir>/<pid>.json; o /metrics soma contadores
+e histogramas de todos os snapshots e expõe os gauges com o rótulo pid.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import METRICS_ENABLED, METRICS_FLUSH_SECONDS, METRICS_MULTIPROC_DIR
+
+logger = logging.getLogger(__name__)
+
+# Buckets de latência (segundos): de 50 µs (motor compilado) a 10 s
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+# Buckets de duração de estágios do treino e de carga de modelo (segundos)
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+# Buckets de tamanho de lote (linhas)
+BATCH_SIZE_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[Any]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    Base das métricas: valores por combinação de rótulos
+
+    Os rótulos são passados por posição, na ordem de labelnames.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Any]:
+        """Cópia dos valores atuais"""
+        with self._lock:
+            return {labels: self._copy(value) for labels, value in self._values.items()}
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return value
+
+    def merge(self, target: Dict[Tuple[str, ...], Any], values: Dict[Tuple[str, ...], Any]):
+        """Soma os valores de outro processo em target"""
+        for labels, value in values.items():
+            target[labels] = target.get(labels, 0) + value
+
+    def samples(self, values: Dict[Tuple[str, ...], Any], labelnames: Tuple[str, ...]) -> List[str]:
+        """Linhas de amostra no formato de texto"""
+        return [
+            f"{self.name}{_format_labels(labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(values.items())
+        ]
+
+
+class Counter(Metric):
+    """Valor que só cresce (reinicia com o processo)"""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set_total(self, value: float, *labels: str):
+        """Copia um total mantido fora do registro (ex.: contadores do cache)"""
+        with self._lock:
+            self._values[labels] = value
+
+
+class Gauge(Metric):
+    """Valor que sobe e desce"""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    """
+    Distribuição de valores em buckets
+
+    Guarda contagens não acumuladas por bucket ([contagens, soma]); as
+    contagens acumuladas do formato Prometheus são montadas na exportação.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        if not METRICS_ENABLED:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observa a duração do bloco"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return [list(value[0]), value[1]]
+
+    def merge(self, target: Dict[Tuple[str, ...], Any], values: Dict[Tuple[str, ...], Any]):
+        for labels, (counts, total) in values.items():
+            entry = target.setdefault(labels, [[0] * len(counts), 0.0])
+            entry[0] = [a + b for a, b in zip(entry[0], counts)]
+            entry[1] += total
+
+    def samples(self, values: Dict[Tuple[str, ...], Any], labelnames: Tuple[str, ...]) -> List[str]:
+        lines = []
+        bucket_labelnames = labelnames + ("le",)
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(bucket_labelnames, labels + (_format_value(bound),))} "
+                    f"{cumulative}"
+                )
+            label_text = _format_labels(labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas exportadas pelo /metrics
+
+    Coletores registrados com add_collector rodam antes de cada exportação
+    e copiam valores mantidos em outros objetos (cache, modelo ativo).
+    """
+
+    def __init__(self, multiproc_dir: Optional[Path] = METRICS_MULTIPROC_DIR):
+        self.multiproc_dir = Path(multiproc_dir) if multiproc_dir else None
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica {metric.name} já registrada")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        self._collectors.append(collector)
+
+    def reset(self):
+        """Zera todas as métricas (ex.: no processo mestre antes do fork)"""
+        for metric in self._metrics.values():
+            metric.clear()
+
+    def collect(self):
+        """Roda os coletores"""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.error(f"Erro no coletor de métricas: {str(e)}")
+
+    def snapshot(self) -> Dict[str, List[List[Any]]]:
+        """Valores atuais em formato serializável ({nome: [[rótulos, valor], ...]})"""
+        return {
+            name: [[list(labels), value] for labels, value in metric.snapshot().items()]
+            for name, metric in self._metrics.items()
+        }
+
+    def write_snapshot(self):
+        """Grava o snapshot deste processo no diretório compartilhado"""
+        if self.multiproc_dir is None:
+            return
+        self.multiproc_dir.mkdir(parents=True, exist_ok=True)
+        path = self.multiproc_dir / f"{os.getpid()}.json"
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def remove_process(self, pid: int):
+        """Descarta o snapshot de um worker encerrado"""
+        if self.multiproc_dir is not None:
+            (self.multiproc_dir / f"{pid}.json").unlink(missing_ok=True)
+
+    def clear_multiproc_dir(self):
+        """Remove snapshots de execuções anteriores (no início do servidor)"""
+        if self.multiproc_dir is not None and self.multiproc_dir.exists():
+            for path in self.multiproc_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def _read_snapshots(self) -> Dict[str, Dict[str, List[List[Any]]]]:
+        snapshots = {}
+        for path in self.multiproc_dir.glob("*.json"):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    snapshots[path.stem] = json.load(f)
+            except (OSError, ValueError):
+                # Worker encerrado no meio da leitura
+                continue
+        return snapshots
+
+    def render(self) -> str:
+        """Exporta as métricas no formato de texto do Prometheus (0.0.4)"""
+        self.collect()
+
+        if self.multiproc_dir is None:
+            per_process = {None: {name: m.snapshot() for name, m in self._metrics.items()}}
+        else:
+            self.write_snapshot()
+            per_process = {
+                pid: {
+                    name: {tuple(labels): value for labels, value in values}
+                    for name, values in snapshot.items()
+                }
+                for pid, snapshot in self._read_snapshots().items()
+            }
+
+        lines = []
+        for name, metric in self._metrics.items():
+            labelnames = metric.labelnames
+            merged: Dict[Tuple[str, ...], Any] = {}
+            for pid, snapshot in per_process.items():
+                values = snapshot.get(name, {})
+                if isinstance(metric, Gauge) and pid is not None:
+                    # Gauges não são somados: um valor por worker
+                    merged.update({labels + (pid,): value for labels, value in values.items()})
+                else:
+                    metric.merge(merged, values)
+            if isinstance(metric, Gauge) and self.multiproc_dir is not None:
+                labelnames = labelnames + ("pid",)
+
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.samples(merged, labelnames))
+        return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """
+    Soma a duração de estágios nomeados (ex.: estágios do treino)
+
+    Guarda o tempo de relógio (durations) e o tempo de CPU do processo
+    (cpu_durations, todas as threads: passa do relógio com n_jobs > 1).
+
+    Uso:
+        timer = StageTimer()
+        with timer("fit"):
+            ...
+        timer.durations  # {"fit": 1.23}
+    """
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self.cpu_durations: Dict[str, float] = {}
+
+    @contextmanager
+    def __call__(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            cpu_elapsed = time.process_time() - cpu_start
+            self.durations[stage] = self.durations.get(stage, 0.0) + elapsed
+            self.cpu_durations[stage] = self.cpu_durations.get(stage, 0.0) + cpu_elapsed
+
+    def iterate(self, stage: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Percorre iterable somando em stage o tempo de produzir cada item"""
+        iterator = iter(iterable)
+        while True:
+            with self(stage):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def rounded(self, digits: int = 4) -> Dict[str, float]:
+        return {stage: round(seconds, digits) for stage, seconds in self.durations.items()}
+
+
+# Registro global e métricas da aplicação
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_PROGRESS = registry.gauge(
+    "http_requests_in_progress",
+    "Requisições HTTP em andamento",
+    ("method",)
+)
+INFERENCE_QUEUE_SECONDS = registry.histogram(
+    "delay_inference_queue_seconds",
+    "Espera por uma thread livre no pool de inferência"
+)
+PREDICT_STAGE_SECONDS = registry.histogram(
+    "delay_predict_stage_seconds",
+    "Duração dos estágios da predição",
+    ("stage",)
+)
+PREDICTION_BATCH_ROWS = registry.histogram(
+    "delay_prediction_batch_rows",
+    "Linhas por chamada de predição em lote",
+    buckets=BATCH_SIZE_BUCKETS
+)
+PREDICT_STREAM_CONNECTIONS = registry.gauge(
+    "delay_predict_stream_connections",
+    "Conexões abertas em /api/predict/stream"
+)
+PREDICTED_ROWS_TOTAL = registry.counter(
+    "delay_predicted_rows_total",
+    "Linhas preditas por caminho (cache, engine, pipeline)",
+    ("path",)
+)
+TRAINING_STAGE_SECONDS = registry.histogram(
+    "delay_training_stage_seconds",
+    "Duração dos estágios do treino",
+    ("stage",),
+    buckets=DURATION_BUCKETS
+)
+TRAINING_JOBS_TOTAL = registry.counter(
+    "delay_training_jobs_total",
+    "Jobs de treino finalizados por tipo e status",
+    ("kind", "status")
+)
+ARTIFACT_CACHE_LOOKUPS_TOTAL = registry.counter(
+    "delay_artifact_cache_lookups_total",
+    "Consultas ao cache de artefatos de treino por artefato e resultado",
+    ("artifact", "result")
+)
+MODEL_LOAD_SECONDS = registry.histogram(
+    "delay_model_load_seconds",
+    "Tempo de carga e aquecimento de um modelo",
+    ("source",),
+    buckets=DURATION_BUCKETS
+)
+MODEL_INFO = registry.gauge(
+    "delay_model_info",
+    "Versão do modelo em uso (valor 1)",
+    ("version",)
+)
+PREDICTION_CACHE_LOOKUPS_TOTAL = registry.counter(
+    "delay_prediction_cache_lookups_total",
+    "Consultas ao cache de predições por resultado",
+    ("result",)
+)
+PREDICTION_CACHE_EVICTIONS_TOTAL = registry.counter(
+    "delay_prediction_cache_evictions_total",
+    "Entradas removidas do cache de predições por falta de espaço"
+)
+PREDICTION_CACHE_HIT_RATIO = registry.gauge(
+    "delay_prediction_cache_hit_ratio",
+    "Proporção de acertos do cache de predições"
+)
+PREDICTION_CACHE_ENTRIES = registry.gauge(
+    "delay_prediction_cache_entries",
+    "Entradas no cache de predições"
+)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede a latência de cada requisição HTTP
+
+    A rota é o template do path (/api/models/{version}/promote), não o
+    path em si, para manter a cardinalidade dos rótulos baixa. ASGI puro:
+    não envolve o corpo da resposta como o BaseHTTPMiddleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method,
+                getattr(route, "path", "unmatched"),
+                status
+            )
+            HTTP_REQUESTS_IN_PROGRESS.dec(method)
+
+
+_flusher: Optional[asyncio.Task] = None
+
+
+async def _flush_snapshots(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            registry.collect()
+            registry.write_snapshot()
+        except Exception as e:
+            logger.error(f"Erro ao gravar snapshot de métricas: {str(e)}")
+
+
+def start_metrics_flusher(interval: float = METRICS_FLUSH_SECONDS):
+    """Grava o snapshot deste worker periodicamente (apenas multi-worker)"""
+    global _flusher
+    if registry.multiproc_dir is not None and METRICS_ENABLED and _flusher is None:
+        _flusher = asyncio.create_task(_flush_snapshots(interval))
+
+
+async def stop_metrics_flusher():
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        try:
+            await _flusher
+        except asyncio.CancelledError:
+            pass
+        _flusher = None
+    registry.remove_process(os.getpid())
@@ -0,0 +1,79 @@
+"""
+Micro-batching de itens que chegam um a um
+
+Itens recebidos dentro de uma janela curta são entregues juntos a uma
+função de processamento (ex.: uma única chamada a predict_batch para os
+fretes de uma conexão de streaming). Enquanto um lote é processado, os
+próximos itens esperam na fila e formam o lote seguinte; com a fila
+cheia, put espera, o que propaga a contrapressão para quem produz.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List
+
+_CLOSE = object()
+
+
+class MicroBatcher:
+    """
+    Agrupa itens por janela de tempo e tamanho máximo
+
+    Uso:
+        batcher = MicroBatcher(process, window_seconds=0.01, max_batch=1000)
+        worker = asyncio.create_task(batcher.run())
+        await batcher.put(item)
+        ...
+        await batcher.close()
+        await worker
+    """
+
+    def __init__(
+        self,
+        process: Callable[[List[Any]], Awaitable[None]],
+        window_seconds: float,
+        max_batch: int,
+        max_pending: int = 0
+    ):
+        self.process = process
+        self.window_seconds = window_seconds
+        self.max_batch = max(1, max_batch)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+
+    async def put(self, item: Any):
+        """Enfileira um item (espera se a fila estiver cheia)"""
+        await self._queue.put(item)
+
+    async def close(self):
+        """Processa o que já está na fila e encerra run"""
+        await self._queue.put(_CLOSE)
+
+    async def run(self):
+        """Monta e processa lotes até close"""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is _CLOSE:
+                return
+
+            batch = [item]
+            closing = False
+            deadline = loop.time() + self.window_seconds
+            while len(batch) < self.max_batch:
+                # Itens já na fila entram sem esperar; depois, até o fim da janela
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _CLOSE:
+                    closing = True
+                    break
+                batch.append(item)
+
+            await self.process(batch)
+            if closing:
+                return
@@ -0,0 +1,162 @@
+"""
+Profiling sob demanda de treino e predição
+
+Profiler combina cProfile (funções com maior tempo acumulado), o tempo de
+relógio e de CPU por estágio (StageTimer) e o pico de memória alocada pelo
+Python (tracemalloc). É opt-in: tracemalloc deixa a execução algumas vezes
+mais lenta.
+
+Limitações:
+    cProfile só enxerga a thread que chamou o Profiler; o trabalho das
+    threads do joblib (n_jobs > 1) aparece como espera dentro do joblib.
+    O tempo de CPU e o tracemalloc são do processo inteiro: em um worker
+    que atende outras requisições, o pico inclui as alocações delas.
+"""
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Header, Query
+
+from app.config import BASE_DIR, PROFILE_TOP_FUNCTIONS, PROFILE_TRACE_MEMORY
+from app.utils.auth import require_admin
+from app.utils.metrics import StageTimer
+
+# Um perfil por vez por processo (tracemalloc e o pico são globais)
+_profile_lock = threading.Lock()
+
+
+class Profiler:
+    """
+    Perfil de uma execução, usado como context manager
+
+    Uso:
+        timer = StageTimer()
+        with Profiler(timer) as profiler:
+            with timer("fit"):
+                ...
+        profiler.report  # dicionário serializável em JSON
+    """
+
+    def __init__(
+        self,
+        timer: Optional[StageTimer] = None,
+        top: int = PROFILE_TOP_FUNCTIONS,
+        trace_memory: bool = PROFILE_TRACE_MEMORY
+    ):
+        self.timer = timer or StageTimer()
+        self.top = top
+        self.trace_memory = trace_memory
+        self.report: Optional[Dict[str, Any]] = None
+        self._profile = cProfile.Profile()
+        self._started_tracing = False
+
+    def __enter__(self) -> "Profiler":
+        _profile_lock.acquire()
+        if self.trace_memory:
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._memory_start = tracemalloc.get_traced_memory()[0]
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._profile.disable()
+        wall = time.perf_counter() - self._wall_start
+        cpu = time.process_time() - self._cpu_start
+        peak = None
+        try:
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1] - self._memory_start
+                if self._started_tracing:
+                    tracemalloc.stop()
+            self.report = self._build_report(wall, cpu, peak)
+        finally:
+            _profile_lock.release()
+        return False
+
+    def _build_report(self, wall: float, cpu: float, peak: Optional[int]) -> Dict[str, Any]:
+        stats = pstats.Stats(self._profile)
+        return {
+            "pid": os.getpid(),
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(cpu, 4),
+            "peak_memory_mb": round(peak / 1024 / 1024, 2) if peak is not None else None,
+            "stages": {
+                stage: {
+                    "wall_seconds": round(seconds, 4),
+                    "cpu_seconds": round(self.timer.cpu_durations.get(stage, 0.0), 4)
+                }
+                for stage, seconds in self.timer.durations.items()
+            },
+            "top_functions": self._top_functions(stats),
+            "text": self._format_stats(stats)
+        }
+
+    def _top_functions(self, stats: pstats.Stats) -> List[Dict[str, Any]]:
+        """Funções com maior tempo acumulado"""
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": function,
+                "file": _short_path(filename),
+                "line": line,
+                "calls": calls,
+                "primitive_calls": primitive_calls,
+                "tottime": round(tottime, 6),
+                "cumtime": round(cumtime, 6)
+            }
+            for (filename, line, function), (primitive_calls, calls, tottime, cumtime, _)
+            in rows[:self.top]
+        ]
+
+    def _format_stats(self, stats: pstats.Stats) -> str:
+        """Relatório de texto do pstats (ordenado por tempo acumulado)"""
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats("cumulative").print_stats(self.top)
+        return stream.getvalue()
+
+
+def _short_path(filename: str) -> str:
+    """Caminho relativo ao backend ou a site-packages (relatório legível)"""
+    if filename.startswith(str(BASE_DIR)):
+        return os.path.relpath(filename, BASE_DIR)
+    marker = "site-packages" + os.sep
+    index = filename.rfind(marker)
+    return filename[index + len(marker):] if index >= 0 else filename
+
+
+def profile_call(
+    func: Callable[..., Any], *args, stage: Optional[str] = None, **kwargs
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Executa func sob o Profiler
+
+    Returns:
+        Tuple de (retorno de func, relatório)
+    """
+    timer = StageTimer()
+    with Profiler(timer) as profiler:
+        with timer(stage or func.__name__):
+            result = func(*args, **kwargs)
+    return result, profiler.report
+
+
+def profiling_requested(
+    profile: bool = Query(False, description="Anexar um perfil de execução (requer X-Admin-Token)"),
+    x_admin_token: Optional[str] = Header(None)
+) -> bool:
+    """Dependência FastAPI: ?profile=true, restrito a administradores"""
+    if profile:
+        require_admin(x_admin_token)
+    return profile
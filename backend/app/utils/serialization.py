@@ -0,0 +1,122 @@
+"""
+Serialização das respostas da API
+
+JSON via orjson (sem o json da stdlib) e, para respostas tabulares,
+formatos binários escolhidos pelo header Accept:
+    application/vnd.apache.arrow.stream: tabela Arrow IPC (uma linha por
+        item; os demais campos da resposta vão nos metadados do schema,
+        em JSON)
+    application/msgpack: a mesma estrutura da resposta JSON
+
+Sem Accept (ou com */*) a resposta é JSON.
+"""
+from typing import Any, Dict, List, Optional
+
+import msgpack
+import numpy as np
+import orjson
+import pyarrow as pa
+from fastapi.responses import ORJSONResponse, Response
+
+JSON_MEDIA_TYPE = "application/json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Em ordem de preferência para Accept com a mesma qualidade
+TABLE_MEDIA_TYPES = [JSON_MEDIA_TYPE, ARROW_MEDIA_TYPE, MSGPACK_MEDIA_TYPE]
+
+_MEDIA_TYPE_ALIASES = {
+    "application/x-msgpack": MSGPACK_MEDIA_TYPE,
+    "application/vnd.msgpack": MSGPACK_MEDIA_TYPE,
+    "application/vnd.apache.arrow.file": ARROW_MEDIA_TYPE,
+}
+
+
+def negotiate(accept: Optional[str], offered: List[str] = TABLE_MEDIA_TYPES) -> str:
+    """
+    Media type da resposta a partir do header Accept
+
+    Considera os parâmetros q; tipos não oferecidos são ignorados e, sem
+    nenhum aceitável, a resposta é o primeiro oferecido (JSON).
+    """
+    if not accept:
+        return offered[0]
+
+    best, best_q = offered[0], 0.0
+    for item in accept.split(","):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        media_type = _MEDIA_TYPE_ALIASES.get(media_type.lower(), media_type.lower())
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+
+        if media_type in ("*/*", "application/*"):
+            media_type = offered[0]
+        if media_type in offered and q > best_q:
+            best, best_q = media_type, q
+    return best
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Tipo não serializável em MessagePack: {type(value).__name__}")
+
+
+def encode_msgpack(content: Any) -> bytes:
+    return msgpack.packb(content, default=_msgpack_default)
+
+
+def encode_arrow(rows: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Tabela Arrow IPC (stream) com uma coluna por chave das linhas
+
+    Linhas sem uma chave ficam nulas nessa coluna (ex.: erros de validação
+    não têm probabilidade). Cada item de metadata vira um metadado do
+    schema com o valor em JSON.
+    """
+    columns: Dict[str, List[Any]] = {}
+    for row in rows:
+        for name in row:
+            columns.setdefault(name, [])
+    for name, values in columns.items():
+        values.extend(row.get(name) for row in rows)
+
+    table = pa.table(columns)
+    if metadata:
+        table = table.replace_schema_metadata(
+            {name: orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+             for name, value in metadata.items()}
+        )
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def table_response(accept: Optional[str], content: Dict[str, Any], rows_key: str) -> Response:
+    """
+    Resposta de um conteúdo com uma lista de linhas em content[rows_key]
+
+    Em Arrow, a tabela é content[rows_key] e os demais campos vão nos
+    metadados; em JSON e MessagePack, content vai inteiro.
+    """
+    media_type = negotiate(accept)
+    headers = {"Vary": "Accept"}
+
+    if media_type == ARROW_MEDIA_TYPE:
+        metadata = {name: value for name, value in content.items() if name != rows_key}
+        return Response(
+            encode_arrow(content[rows_key], metadata), media_type=media_type, headers=headers
+        )
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return Response(encode_msgpack(content), media_type=media_type, headers=headers)
+    return ORJSONResponse(content, headers=headers)
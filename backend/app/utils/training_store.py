@@ -0,0 +1,123 @@
+"""
+Base acumulada de dados de treino
+
+Guarda em disco todas as linhas já usadas para treinar, deduplicadas por
+freight_description (a linha mais recente prevalece). O re-treino parte
+desta base em vez de descartar os dados anteriores.
+"""
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import pandas as pd
+
+from app.config import TRAINING_STORE_PATH
+from app.schema import SCHEMA
+from app.utils.file_lock import FileLock
+from app.utils.ingestion import concat_chunks
+
+ID_COLUMN = next(spec.name for spec in SCHEMA if spec.role == "id")
+
+
+class TrainingDataStore:
+    """Linhas de treino acumuladas, persistidas em pickle (preserva dtypes)"""
+
+    def __init__(self, path: Path = TRAINING_STORE_PATH):
+        self.path = Path(path)
+        self._lock = FileLock(self.path.with_suffix(".lock"))
+
+    def lock(self) -> FileLock:
+        """
+        Lock entre processos da base
+
+        Quem faz merge a partir da base atual deve segurá-lo até o save,
+        senão um treino em outro worker pode gravar no meio e suas linhas
+        se perdem. Só esse trecho deve rodar travado (nunca um fit): os
+        saves dos outros treinos esperam por ele.
+        """
+        return self._lock
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> Optional[pd.DataFrame]:
+        """Carrega a base acumulada (None se ainda não existir)"""
+        if not self.path.exists():
+            return None
+        return pd.read_pickle(self.path)
+
+    def merge(self, new_df: pd.DataFrame, replace: bool = False) -> Tuple[pd.DataFrame, int]:
+        """
+        Junta as linhas novas à base, sem gravar
+
+        Linhas com o mesmo freight_description substituem as anteriores;
+        linhas sem identificador são sempre mantidas.
+
+        Args:
+            new_df: Linhas novas (já validadas)
+            replace: Descartar a base atual (treino do zero)
+
+        Returns:
+            Tuple de (base resultante, quantidade de linhas substituídas)
+        """
+        new_df = self._normalize(new_df)
+        stored = None if replace else self.load()
+        if stored is None or stored.empty:
+            return self._dedupe(new_df)
+
+        combined = concat_chunks([self._normalize(stored), new_df])
+        return self._dedupe(combined)
+
+    @property
+    def source_path(self) -> Path:
+        return self.path.with_suffix(".source")
+
+    def save(self, df: pd.DataFrame, source: Optional[str] = None):
+        """
+        Grava a base de forma atômica (arquivo temporário + rename)
+
+        Args:
+            df: Base resultante de merge
+            source: Chave do cache de artefatos dos dados que formaram a
+                base, quando ela vem de um único upload (treino do zero)
+        """
+        with self._lock:
+            self.source_path.unlink(missing_ok=True)
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            df.to_pickle(tmp_path)
+            os.replace(tmp_path, self.path)
+            if source is not None:
+                self.source_path.write_text(source, encoding="utf-8")
+
+    def source(self) -> Optional[str]:
+        """Chave dos dados da base gravada com source (None se acumulada)"""
+        try:
+            return self.source_path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def clear(self):
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self.source_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+        """Mantém apenas as colunas do schema, na ordem do schema"""
+        return df[[spec.name for spec in SCHEMA if spec.name in df.columns]].copy()
+
+    @staticmethod
+    def _dedupe(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+        if ID_COLUMN not in df.columns:
+            # Treino a partir do dataset store (lido sem o identificador)
+            return df.reset_index(drop=True), 0
+        ids = df[ID_COLUMN]
+        duplicated = ids.notna() & ids.duplicated(keep="last")
+        n_replaced = int(duplicated.sum())
+        if n_replaced:
+            df = df[~duplicated]
+        return df.reset_index(drop=True), n_replaced
+
+
+# Instância global da base acumulada
+training_store = TrainingDataStore()
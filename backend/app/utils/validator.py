@@ -1,47 +1,76 @@
 """
 Validador de dados CSV
 """
+import math
+import numpy as np
 import pandas as pd
-from typing import Tuple, List, Dict, Any
-from app.config import REQUIRED_COLUMNS, VALID_TRAFFIC_LEVELS, VALID_DELAY_LABELS
+from typing import Tuple, List, Dict, Any, Optional
+from app.config import REQUIRED_COLUMNS, ROW_ERROR_SAMPLE_SIZE
+from app.schema import SCHEMA, feature_specs, categorical_features, numerical_features
 
 
 class CSVValidator:
-    """Classe para validar dados do CSV"""
+    """
+    Classe para validar dados do CSV
+    
+    As verificações de estrutura (colunas e tipos) não percorrem os dados.
+    As verificações por linha (faixas, valores válidos, faltantes) são
+    feitas em uma única passada vetorizada que produz uma máscara booleana
+    de linhas inválidas, com amostras dos índices ofensores por regra.
+    """
     
-    def __init__(self):
+    def __init__(self, sample_size: int = ROW_ERROR_SAMPLE_SIZE):
         self.errors: List[str] = []
         self.warnings: List[str] = []
+        self.sample_size = sample_size
+        self.invalid_mask: Optional[np.ndarray] = None
+        self.row_errors: Dict[str, Dict[str, Any]] = {}
     
-    def validate_csv(self, df: pd.DataFrame) -> Tuple[bool, List[str], List[str]]:
+    def validate_csv(
+        self,
+        df: pd.DataFrame,
+        drop_invalid: bool = False
+    ) -> Tuple[bool, List[str], List[str]]:
         """
         Valida o DataFrame contendo os dados do CSV
         
         Args:
             df: DataFrame pandas com os dados
+            drop_invalid: Se True, linhas inválidas não invalidam o arquivo
+                (descarte-as com drop_invalid_rows)
             
         Returns:
             Tuple de (is_valid, errors, warnings)
         """
         self.errors = []
         self.warnings = []
+        self.invalid_mask = None
+        self.row_errors = {}
         
         # Verificar colunas obrigatórias
         self._validate_columns(df)
         
         # Verificar tipos de dados
-        self._validate_data_types(df)
+        numeric_ok = self._validate_data_types(df)
         
-        # Verificar valores válidos
-        self._validate_values(df)
+        # Verificar valores por linha (faixas, valores válidos, faltantes)
+        self._build_error_mask(df, numeric_ok)
         
-        # Verificar dados faltantes
-        self._validate_missing_data(df)
+        # No modo drop_invalid, linhas inválidas não são erro: ficam em
+        # row_errors/invalid_mask para o chamador descartar e reportar
+        if self.row_errors and not drop_invalid:
+            self.errors.extend(self.format_row_errors(self.row_errors))
         
         is_valid = len(self.errors) == 0
         
         return is_valid, self.errors, self.warnings
     
+    def drop_invalid_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Remove as linhas marcadas como inválidas pelo último validate_csv"""
+        if self.invalid_mask is None or not self.invalid_mask.any():
+            return df
+        return df[~self.invalid_mask]
+    
     def _validate_columns(self, df: pd.DataFrame):
         """Verifica se todas as colunas obrigatórias estão presentes"""
         missing_columns = set(REQUIRED_COLUMNS) - set(df.columns)
@@ -58,117 +87,183 @@ class CSVValidator:
                 f"Colunas extras detectadas (serão ignoradas): {', '.join(extra_columns)}"
             )
     
-    def _validate_data_types(self, df: pd.DataFrame):
-        """Valida os tipos de dados das colunas"""
-        # planned_departure_hour deve ser numérico
-        if "planned_departure_hour" in df.columns:
-            if not pd.api.types.is_numeric_dtype(df["planned_departure_hour"]):
-                self.errors.append(
-                    "planned_departure_hour deve ser numérico (int)"
-                )
+    def _validate_data_types(self, df: pd.DataFrame) -> Dict[str, bool]:
+        """
+        Valida os tipos de dados das colunas numéricas do schema (pelo dtype)
+        
+        Returns:
+            Dicionário coluna -> True se a coluna é numérica
+        """
+        numeric_ok = {}
+        for spec in SCHEMA:
+            if spec.kind != "numerical" or spec.name not in df.columns:
+                continue
+            numeric_ok[spec.name] = pd.api.types.is_numeric_dtype(df[spec.name])
+            if not numeric_ok[spec.name]:
+                self.errors.append(f"{spec.name} deve ser numérico ({spec.type_label})")
+        return numeric_ok
+    
+    def _build_error_mask(self, df: pd.DataFrame, numeric_ok: Dict[str, bool]):
+        """
+        Uma passada vetorizada pelas colunas do schema, acumulando a máscara
+        
+        Cada coluna é convertida para NumPy uma única vez; cada regra
+        (faixa, valores permitidos, faltantes) gera uma máscara booleana que
+        é combinada na máscara geral.
+        """
+        n_rows = len(df)
+        invalid = np.zeros(n_rows, dtype=bool)
+        
+        for spec in SCHEMA:
+            if spec.name not in df.columns:
+                continue
+            series = df[spec.name]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Faltantes em categóricos são o código -1
+                nulls = series.cat.codes.to_numpy() == -1
             else:
-                # Verificar range 0-23
-                invalid_hours = df[
-                    (df["planned_departure_hour"] < 0) | 
-                    (df["planned_departure_hour"] > 23)
-                ]
-                if len(invalid_hours) > 0:
-                    self.errors.append(
-                        f"planned_departure_hour deve estar entre 0 e 23. "
-                        f"Encontrados {len(invalid_hours)} valores inválidos."
-                    )
-        
-        # rain_forecast_mm deve ser numérico
-        if "rain_forecast_mm" in df.columns:
-            if not pd.api.types.is_numeric_dtype(df["rain_forecast_mm"]):
-                self.errors.append("rain_forecast_mm deve ser numérico (float)")
-        
-        # cargo_weight_kg deve ser numérico
-        if "cargo_weight_kg" in df.columns:
-            if not pd.api.types.is_numeric_dtype(df["cargo_weight_kg"]):
-                self.errors.append("cargo_weight_kg deve ser numérico (float)")
-        
-        # historical_avg_route_time_min deve ser numérico
-        if "historical_avg_route_time_min" in df.columns:
-            if not pd.api.types.is_numeric_dtype(df["historical_avg_route_time_min"]):
-                self.errors.append(
-                    "historical_avg_route_time_min deve ser numérico (float)"
+                nulls = series.isna().to_numpy()
+            
+            range_message = spec.range_message()
+            if spec.kind == "numerical" and numeric_ok.get(spec.name) and range_message:
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+                out_of_range = np.zeros(n_rows, dtype=bool)
+                if spec.min_value is not None:
+                    out_of_range |= values < spec.min_value
+                if spec.max_value is not None:
+                    out_of_range |= values > spec.max_value
+                self._add_rule(
+                    f"{spec.name}_range",
+                    out_of_range,
+                    df.index,
+                    f"{range_message}. Encontrados {{count}} valores inválidos."
+                )
+                invalid |= out_of_range
+            
+            if spec.allowed_values is not None:
+                invalid |= self._check_allowed(
+                    series, nulls, spec.allowed_values, df.index,
+                    f"{spec.name}_values"
+                )
+            
+            if not spec.nullable:
+                self._add_rule(
+                    f"{spec.name}_missing",
+                    nulls,
+                    df.index,
+                    f"Coluna '{spec.name}' tem {{count}} valores faltantes"
                 )
+                invalid |= nulls
         
-        # distance_km deve ser numérico
-        if "distance_km" in df.columns:
-            if not pd.api.types.is_numeric_dtype(df["distance_km"]):
-                self.errors.append("distance_km deve ser numérico (float)")
+        self.invalid_mask = invalid
     
-    def _validate_values(self, df: pd.DataFrame):
-        """Valida valores específicos"""
-        # traffic_level_forecast
-        if "traffic_level_forecast" in df.columns:
-            invalid_traffic = ~df["traffic_level_forecast"].isin(VALID_TRAFFIC_LEVELS)
-            if invalid_traffic.any():
-                invalid_values = df.loc[invalid_traffic, "traffic_level_forecast"].unique()
-                self.errors.append(
-                    f"traffic_level_forecast deve ser um de: {VALID_TRAFFIC_LEVELS}. "
-                    f"Encontrados: {list(invalid_values)}"
-                )
+    def _check_allowed(
+        self,
+        series: pd.Series,
+        nulls: np.ndarray,
+        allowed: List[str],
+        index: pd.Index,
+        rule: str
+    ) -> np.ndarray:
+        """Marca valores fora da lista permitida (faltantes são outra regra)"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Compara só as categorias e mapeia pelos códigos com uma tabela
+            # de consulta (o código -1 de faltante cai na última posição)
+            categories = series.cat.categories
+            bad_categories = ~categories.isin(allowed)
+            if not bad_categories.any():
+                return np.zeros(len(series), dtype=bool)
+            lookup = np.append(bad_categories, False)
+            codes = series.cat.codes.to_numpy()
+            mask = lookup[codes]
+            values = list(categories[np.unique(codes[mask])])
+        else:
+            mask = ~series.isin(allowed).to_numpy() & ~nulls
+            values = list(pd.unique(series.to_numpy()[mask]))
         
-        # delay_label
-        if "delay_label" in df.columns:
-            invalid_labels = ~df["delay_label"].isin(VALID_DELAY_LABELS)
-            if invalid_labels.any():
-                invalid_values = df.loc[invalid_labels, "delay_label"].unique()
-                self.errors.append(
-                    f"delay_label deve ser um de: {VALID_DELAY_LABELS}. "
-                    f"Encontrados: {list(invalid_values)}"
-                )
+        if values:
+            self._add_rule(
+                rule,
+                mask,
+                index,
+                f"{series.name} deve ser um de: {allowed}. Encontrados: {{values}}",
+                values=values
+            )
+        return mask
+    
+    def _add_rule(
+        self,
+        rule: str,
+        mask: np.ndarray,
+        index: pd.Index,
+        message: str,
+        values: Optional[List[Any]] = None
+    ):
+        """Registra contagem e amostra de índices de uma regra violada"""
+        count = int(np.count_nonzero(mask))
+        if count == 0:
+            return
+        positions = np.flatnonzero(mask)[:self.sample_size]
+        self.row_errors[rule] = {
+            "message": message,
+            "count": count,
+            "values": values or [],
+            "sample_indices": [
+                idx.item() if hasattr(idx, "item") else idx
+                for idx in index[positions]
+            ]
+        }
     
-    def _validate_missing_data(self, df: pd.DataFrame):
-        """Verifica dados faltantes"""
-        # Colunas que não podem ter valores faltantes
-        required_cols_no_null = [
-            "delay_label",
-            "planned_departure_hour",
-            "traffic_level_forecast",
-            "rain_forecast_mm",
-            "cargo_weight_kg",
-            "vehicle_type",
-            "historical_avg_route_time_min",
-            "distance_km"
-        ]
-        
-        for col in required_cols_no_null:
-            if col in df.columns:
-                null_count = df[col].isnull().sum()
-                if null_count > 0:
-                    self.errors.append(
-                        f"Coluna '{col}' tem {null_count} valores faltantes"
-                    )
+    @staticmethod
+    def merge_row_errors(
+        total: Dict[str, Dict[str, Any]],
+        new: Dict[str, Dict[str, Any]],
+        sample_size: int = ROW_ERROR_SAMPLE_SIZE
+    ) -> Dict[str, Dict[str, Any]]:
+        """Acumula row_errors de vários chunks (soma contagens, limita amostras)"""
+        for rule, info in new.items():
+            if rule not in total:
+                total[rule] = {
+                    "message": info["message"],
+                    "count": 0,
+                    "values": [],
+                    "sample_indices": []
+                }
+            merged = total[rule]
+            merged["count"] += info["count"]
+            merged["values"].extend(v for v in info["values"] if v not in merged["values"])
+            room = sample_size - len(merged["sample_indices"])
+            merged["sample_indices"].extend(info["sample_indices"][:max(room, 0)])
+        return total
+    
+    @staticmethod
+    def format_row_errors(row_errors: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Mensagens legíveis (com índices de exemplo) para cada regra"""
+        messages = []
+        for info in row_errors.values():
+            message = (
+                info["message"]
+                .replace("{count}", str(info["count"]))
+                .replace("{values}", str(info["values"]))
+            )
+            messages.append(f"{message} Índices de exemplo: {info['sample_indices']}")
+        return messages
     
     def get_feature_columns(self, df: pd.DataFrame) -> Tuple[List[str], List[str]]:
         """
         Identifica colunas categóricas e numéricas para features
         
+        Definidas pelo schema; colunas extras do DataFrame são ignoradas.
+        
         Returns:
             Tuple de (categorical_columns, numerical_columns)
         """
-        # Colunas que são features (excluindo freight_description e delay_label)
-        feature_cols = [col for col in df.columns if col not in ["freight_description", "delay_label"]]
-        
-        categorical = []
-        numerical = []
-        
-        for col in feature_cols:
-            if df[col].dtype == "object":
-                categorical.append(col)
-            else:
-                numerical.append(col)
-        
-        return categorical, numerical
+        return categorical_features(), numerical_features()
 
 
 def validate_prediction_input(data: Dict[str, Any]) -> Tuple[bool, List[str]]:
     """
-    Valida os dados de entrada para predição
+    Valida os dados de entrada para predição, de acordo com o schema
     
     Args:
         data: Dicionário com os dados do frete
@@ -178,41 +273,34 @@ def validate_prediction_input(data: Dict[str, Any]) -> Tuple[bool, List[str]]:
     """
     errors = []
     
-    # Verificar campos numéricos
-    numeric_fields = [
-        "planned_departure_hour",
-        "rain_forecast_mm",
-        "cargo_weight_kg",
-        "historical_avg_route_time_min",
-        "distance_km"
-    ]
-    
-    for field in numeric_fields:
-        if field not in data:
-            errors.append(f"Campo '{field}' é obrigatório")
-        elif not isinstance(data[field], (int, float)):
-            errors.append(f"Campo '{field}' deve ser numérico")
-    
-    # Verificar range de planned_departure_hour
-    if "planned_departure_hour" in data:
-        hour = data["planned_departure_hour"]
-        if not (0 <= hour <= 23):
-            errors.append("planned_departure_hour deve estar entre 0 e 23")
-    
-    # Verificar traffic_level_forecast
-    if "traffic_level_forecast" not in data:
-        errors.append("Campo 'traffic_level_forecast' é obrigatório")
-    elif data["traffic_level_forecast"] not in VALID_TRAFFIC_LEVELS:
-        errors.append(
-            f"traffic_level_forecast deve ser um de: {VALID_TRAFFIC_LEVELS}"
-        )
-    
-    # Verificar vehicle_type
-    if "vehicle_type" not in data:
-        errors.append("Campo 'vehicle_type' é obrigatório")
-    
-    # Verificar route_variant_id
-    if "route_variant_id" not in data:
-        errors.append("Campo 'route_variant_id' é obrigatório")
+    for spec in feature_specs():
+        if spec.name not in data:
+            errors.append(f"Campo '{spec.name}' é obrigatório")
+            continue
+        
+        value = data[spec.name]
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            # Mesma regra de faltantes do CSVValidator no treino
+            if not spec.nullable:
+                errors.append(f"Campo '{spec.name}' não pode ser vazio")
+            continue
+        if spec.kind == "numerical":
+            # bool é subclasse de int, mas não é um valor numérico válido
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                errors.append(f"Campo '{spec.name}' deve ser numérico")
+                continue
+            # NaN e infinito passariam pelas comparações de faixa
+            if isinstance(value, float) and not math.isfinite(value):
+                errors.append(f"Campo '{spec.name}' deve ser um número finito")
+                continue
+            if (
+                (spec.min_value is not None and value < spec.min_value) or
+                (spec.max_value is not None and value > spec.max_value)
+            ):
+                errors.append(spec.range_message())
+        elif not isinstance(value, str):
+            errors.append(f"Campo '{spec.name}' deve ser texto")
+        elif spec.allowed_values is not None and value not in spec.allowed_values:
+            errors.append(f"{spec.name} deve ser um de: {spec.allowed_values}")
     
     return len(errors) == 0, errors
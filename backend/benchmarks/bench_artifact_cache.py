@@ -0,0 +1,64 @@
+"""
+Benchmark: cache de artefatos de treino (mesmo upload treinado de novo)
+
+Chama train_from_csv (o corpo do job de POST /api/train) três vezes sobre
+o mesmo CSV, com registro, base acumulada e cache em um diretório
+temporário:
+    frio: lê, valida, pré-processa e treina
+    idêntico: mesmo arquivo e configuração (resultado do cache)
+    max_depth alterado: reaproveita o dataset tipado e a matriz pré-processada
+
+Uso:
+    cd backend
+    python benchmarks/bench_artifact_cache.py --rows 1000000
+
+Referência (1 CPU, 1M linhas, random_forest com 100 árvores):
+    frio                  96.37s  cache {'result': 'miss', 'dataset': 'miss', 'matrix': 'miss'}
+    idêntico               0.07s  cache {'result': 'hit'}
+    max_depth alterado   109.43s  cache {'result': 'miss', 'dataset': 'hit', 'matrix': 'hit'}
+    (com max_depth=12 a floresta cresce mais que no padrão; o ganho do
+    cache nessa linha é a leitura e o pré-processamento evitados)
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from common import dataset_path
+
+from app.config import RANDOM_FOREST_PARAMS
+from app.models import predictor as predictor_module
+from app.models import training
+from app.models.registry import ModelRegistry
+from app.utils.artifact_cache import ArtifactCache
+from app.utils.training_store import TrainingDataStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache de artefatos de treino")
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    path = dataset_path(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Instâncias globais apontando para o diretório temporário
+        registry = ModelRegistry(Path(tmp) / "models")
+        training.model_registry = predictor_module.model_registry = registry
+        training.training_store = TrainingDataStore(Path(tmp) / "training_store.pkl")
+        training.artifact_cache = ArtifactCache(Path(tmp) / "cache")
+
+        runs = [("frio", {}), ("idêntico", {}), ("max_depth alterado", {"max_depth": 12})]
+        default_params = dict(RANDOM_FOREST_PARAMS)
+        print(f"{args.rows} linhas ({path.stat().st_size / 1024 / 1024:.0f} MB)")
+        for label, params in runs:
+            RANDOM_FOREST_PARAMS.update(params)
+            start = time.perf_counter()
+            result, _ = training.train_from_csv(str(path), 0.2, "0.0.0")
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<20} {elapsed:7.2f}s  cache {result['cache']}  versão {result['version']}")
+        RANDOM_FOREST_PARAMS.clear()
+        RANDOM_FOREST_PARAMS.update(default_params)
+
+
+if __name__ == "__main__":
+    main()
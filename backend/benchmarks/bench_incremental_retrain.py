@@ -0,0 +1,140 @@
+"""
+Benchmark: re-treino incremental (warm_start / window) contra re-treino completo
+
+Parte de um modelo treinado em uma base inicial e aplica várias rodadas de
+dados novos em cada modo de re-treino. Reporta o tempo de ajuste por
+rodada e a acurácia/AUC final em um conjunto de teste comum, comparado ao
+re-treino completo (full) sobre toda a base acumulada.
+
+Uso:
+    cd backend
+    python benchmarks/bench_incremental_retrain.py --base-rows 20000 --batch-rows 2000 --rounds 5
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+# Adicionar diretório do backend ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import (
+    DATA_DIR,
+    RETRAIN_MAX_TREES,
+    RETRAIN_MODES,
+    RETRAIN_WARM_START_TREES,
+    RETRAIN_WINDOW_ROWS
+)
+from app.models.predictor import DelayPredictor
+from app.schema import csv_dtypes, numerical_features
+from app.utils.training_store import TrainingDataStore
+
+RNG = np.random.default_rng(42)
+_next_id = 0
+
+# Linhas do CSV de exemplo separadas em origem de treino e de teste, para
+# que o conjunto de teste não contenha reamostras das linhas de treino
+SAMPLE = pd.read_csv(DATA_DIR / "dados_treino.csv", dtype=csv_dtypes())
+_holdout_mask = RNG.random(len(SAMPLE)) < 0.3
+TRAIN_SOURCE, HOLDOUT_SOURCE = SAMPLE[~_holdout_mask], SAMPLE[_holdout_mask]
+
+
+def make_frame(n_rows: int, source: pd.DataFrame = TRAIN_SOURCE) -> pd.DataFrame:
+    """
+    Reamostra linhas do CSV de exemplo com ruído nas features numéricas
+
+    Cada linha recebe um freight_description novo (não há substituições).
+    """
+    global _next_id
+    df = source.sample(n_rows, replace=True, random_state=RNG).reset_index(drop=True)
+    for col in numerical_features():
+        noise = RNG.normal(1.0, 0.05, n_rows).astype("float32")
+        df[col] = (df[col] * noise).clip(lower=0)
+    df["planned_departure_hour"] = df["planned_departure_hour"].round().clip(0, 23)
+    df["freight_description"] = [f"BENCH-{i}" for i in range(_next_id, _next_id + n_rows)]
+    _next_id += n_rows
+    return df
+
+
+def run_mode(mode, base, batches, holdout, store_dir: Path, window_rows: int):
+    """Aplica as rodadas de re-treino em um modo e avalia no conjunto comum"""
+    store = TrainingDataStore(store_dir / f"{mode}.pkl")
+    predictor = DelayPredictor()
+    predictor.train(base, validated=True)
+    store.save(store.merge(base, replace=True)[0])
+
+    fit_times = []
+    for batch in batches:
+        merged, _ = store.merge(batch)
+        start = time.perf_counter()
+        if mode == "warm_start":
+            predictor.warm_start_fit(batch, RETRAIN_WARM_START_TREES, RETRAIN_MAX_TREES)
+        elif mode == "window":
+            predictor.train(merged.tail(window_rows), validated=True)
+        else:
+            predictor.train(merged, validated=True)
+        fit_times.append(time.perf_counter() - start)
+        store.save(merged)
+
+    X = predictor._prepare_features(holdout)
+    y = predictor._prepare_target(holdout)
+    proba = predictor._predict_proba(X)
+    return {
+        "mode": mode,
+        "fit_mean": sum(fit_times) / len(fit_times),
+        "fit_total": sum(fit_times),
+        "accuracy": accuracy_score(y, (proba > 0.5).astype(int)),
+        "auc": roc_auc_score(y, proba),
+        "n_trees": predictor._n_trees(),
+        "store_rows": len(merged)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--base-rows", type=int, default=20000)
+    parser.add_argument("--batch-rows", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--holdout-rows", type=int, default=5000)
+    parser.add_argument("--window-rows", type=int, default=RETRAIN_WINDOW_ROWS)
+    args = parser.parse_args()
+
+    base = make_frame(args.base_rows)
+    batches = [make_frame(args.batch_rows) for _ in range(args.rounds)]
+    holdout = make_frame(args.holdout_rows, HOLDOUT_SOURCE)
+
+    print(
+        f"Base {args.base_rows} linhas + {args.rounds} rodadas de "
+        f"{args.batch_rows} linhas; teste com {args.holdout_rows} linhas"
+    )
+    print(
+        f"{'Modo':>10} | {'ajuste/rodada':>13} | {'total':>8} | {'acurácia':>8} | "
+        f"{'AUC':>6} | {'árvores':>7} | {'base':>7}"
+    )
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in RETRAIN_MODES:
+            r = run_mode(mode, base, batches, holdout, Path(tmp), args.window_rows)
+            results[mode] = r
+            print(
+                f"{mode:>10} | {r['fit_mean']:12.2f}s | {r['fit_total']:7.2f}s | "
+                f"{r['accuracy']:8.4f} | {r['auc']:6.4f} | {r['n_trees']:>7} | {r['store_rows']:>7}"
+            )
+
+    full = results["full"]
+    for mode in ("warm_start", "window"):
+        r = results[mode]
+        print(
+            f"{mode} vs full: {full['fit_mean'] / r['fit_mean']:.1f}x mais rápido, "
+            f"acurácia {r['accuracy'] - full['accuracy']:+.4f}, AUC {r['auc'] - full['auc']:+.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
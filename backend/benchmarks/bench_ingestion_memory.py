@@ -0,0 +1,87 @@
+"""
+Benchmark: pico de memória (RSS) na ingestão do CSV de treino
+
+Compara, em processos separados, o caminho antigo (await file.read() +
+BytesIO + pd.read_csv com inferência de tipos) com a ingestão em streaming
+(arquivo em disco lido em chunks com tipos explícitos e validação por chunk).
+
+Uso:
+    cd backend
+    python benchmarks/bench_ingestion_memory.py --size-mb 1024
+
+Referência (máquina com 5 GB de RAM, CSV de exemplo repetido):
+    200 MB:  antigo 1167 MB de pico, streaming 315 MB
+    1 GB:    antigo morto por falta de memória (SIGKILL), streaming 1183 MB
+"""
+import argparse
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adicionar diretório do backend ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import DATA_DIR
+
+
+def build_csv(path: Path, size_mb: int):
+    """Repete o CSV de exemplo até atingir o tamanho desejado"""
+    lines = (DATA_DIR / "dados_treino.csv").read_text(encoding="utf-8").splitlines()
+    header, body = lines[0], "\n".join(lines[1:]) + "\n"
+    target = size_mb * 1024 * 1024
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(header + "\n")
+        while f.tell() < target:
+            f.write(body)
+
+
+def run_mode(mode: str, path: Path):
+    """Executa um modo de ingestão e imprime tempo, linhas e pico de RSS"""
+    import pandas as pd
+    from app.utils.ingestion import read_training_csv
+    
+    start = time.perf_counter()
+    if mode == "legacy":
+        # Equivalente ao handler antigo: bytes + BytesIO + DataFrame
+        contents = path.read_bytes()
+        df = pd.read_csv(io.BytesIO(contents))
+    else:
+        df, _ = read_training_csv(path)
+    elapsed = time.perf_counter() - start
+    
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    frame_mb = df.memory_usage(deep=True).sum() / 1024 / 1024
+    print(f"{mode:>9} | {elapsed:7.2f}s | {len(df):>10} linhas | DataFrame {frame_mb:8.1f} MB | pico RSS {peak_mb:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--mode", choices=["legacy", "streaming"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.mode:
+        run_mode(args.mode, Path(args.path))
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.csv"
+        build_csv(path, args.size_mb)
+        print(f"CSV: {os.path.getsize(path) / 1024 / 1024:.0f} MB")
+        for mode in ("legacy", "streaming"):
+            # Processo novo por modo para medir o pico de forma isolada
+            completed = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--path", str(path)]
+            )
+            if completed.returncode != 0:
+                print(f"{mode:>9} | falhou (código {completed.returncode}, provável falta de memória)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: tempo de carga e memória por worker (pickle x motor mapeado)
+
+Treina um modelo maior que o de exemplo, salva em um registro temporário e
+sobe 1, 4 e 8 processos "worker" simultâneos em dois modos:
+    pickle: joblib.load do Pipeline inteiro + compilação do motor (antigo)
+    mmap:   motor compilado com arrays .npy mapeados (LoadedModel.from_artifact)
+
+Cada worker carrega o modelo, pontua linhas de amostra e reporta o tempo de
+carga, o RSS e o PSS (RSS com páginas compartilhadas divididas entre os
+processos que as usam, lido de /proc/self/smaps_rollup). Os arquivos já
+estão no cache de páginas do SO; leitura a frio do disco não é medida.
+
+Uso:
+    cd backend
+    python benchmarks/bench_model_startup.py --rows 100000 --max-depth 20
+
+Referência (1 CPU; model.pkl 47.7 MB, compiled/ 23.8 MB):
+    workers | carga pickle / mmap | PSS total pickle / mmap
+          1 |   0.141s / 0.004s   |   241 MB / 142 MB
+          4 |   0.761s / 0.028s   |   895 MB / 426 MB
+          8 |   1.567s / 0.029s   |  1748 MB / 788 MB
+O tempo até os workers ficarem prontos é dominado pelos imports
+(pandas/sklearn), iguais nos dois modos.
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adicionar diretório do backend ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def read_memory_mb():
+    """RSS e PSS do processo atual, em MB"""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0][:-1]] = int(parts[1]) / 1024
+    return values["Rss"], values["Pss"]
+
+
+def worker(mode: str, root: str, version: str):
+    """Processo worker: carrega o modelo, aquece e espera a medição"""
+    import joblib
+    from app.models.predictor import LoadedModel
+    from app.models.registry import ModelRegistry
+
+    registry = ModelRegistry(Path(root))
+    start = time.perf_counter()
+    if mode == "pickle":
+        state = joblib.load(Path(root) / version / "model.pkl")
+        loaded = LoadedModel.from_state(state)
+    else:
+        loaded = LoadedModel.from_artifact(registry, version)
+    load_seconds = time.perf_counter() - start
+
+    # Pontuar linhas variadas para tocar boa parte dos nós da floresta
+    rows = loaded.sample_rows * 100
+    loaded.fast_engine.predict_proba(rows)
+
+    print(f"ready {load_seconds:.4f}", flush=True)
+    sys.stdin.readline()
+    rss, pss = read_memory_mb()
+    print(f"mem {rss:.1f} {pss:.1f}", flush=True)
+    sys.stdin.readline()
+
+
+def build_model(root: Path, n_rows: int, max_depth, n_trees: int) -> str:
+    """Treina um modelo com dados reamostrados e salva no registro temporário"""
+    import numpy as np
+    import pandas as pd
+    from app.config import DATA_DIR, RANDOM_FOREST_PARAMS
+    from app.models.predictor import DelayPredictor
+    from app.models.registry import ModelRegistry
+    from app.schema import csv_dtypes, numerical_features
+
+    rng = np.random.default_rng(42)
+    sample = pd.read_csv(DATA_DIR / "dados_treino.csv", dtype=csv_dtypes())
+    df = sample.sample(n_rows, replace=True, random_state=rng).reset_index(drop=True)
+    for col in numerical_features():
+        df[col] = (df[col] * rng.normal(1.0, 0.1, n_rows).astype("float32")).clip(lower=0)
+    # Rótulos com ruído: árvores profundas, floresta do tamanho de produção
+    flip = rng.random(n_rows) < 0.2
+    df.loc[flip, "delay_label"] = np.where(
+        df.loc[flip, "delay_label"] == "atrasado", "em_tempo", "atrasado"
+    )
+
+    RANDOM_FOREST_PARAMS.update(max_depth=max_depth, n_estimators=n_trees)
+    predictor = DelayPredictor()
+    predictor.train(df, validated=True)
+
+    registry = ModelRegistry(root)
+    state = predictor.get_state()
+    registry.save(state, predictor.active.fast_engine)
+    return state["version"]
+
+
+def run_workers(mode: str, n_workers: int, root: Path, version: str):
+    """Sobe n_workers simultâneos e coleta tempo de carga e memória"""
+    start = time.perf_counter()
+    procs = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--worker", mode, str(root), version],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(n_workers)
+    ]
+    loads = [float(p.stdout.readline().split()[1]) for p in procs]
+    ready_seconds = time.perf_counter() - start
+
+    # Medir com todos os workers vivos (o PSS depende do compartilhamento)
+    memory = []
+    for p in procs:
+        p.stdin.write("measure\n")
+        p.stdin.flush()
+        _, rss, pss = p.stdout.readline().split()
+        memory.append((float(rss), float(pss)))
+    for p in procs:
+        p.stdin.write("exit\n")
+        p.stdin.flush()
+        p.wait()
+
+    rss = sum(m[0] for m in memory) / n_workers
+    pss = sum(m[1] for m in memory) / n_workers
+    print(
+        f"{mode:>6} | {n_workers:>7} | {sum(loads) / n_workers:9.3f}s | {ready_seconds:9.2f}s | "
+        f"{rss:8.1f} MB | {pss:8.1f} MB | {pss * n_workers:8.1f} MB"
+    )
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(*sys.argv[2:5])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--max-depth", type=int, default=20)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        version = build_model(root, args.rows, args.max_depth, args.trees)
+        pkl_mb = (root / version / "model.pkl").stat().st_size / 1024 / 1024
+        npy_mb = sum(f.stat().st_size for f in (root / version / "compiled").iterdir()) / 1024 / 1024
+        print(f"model.pkl {pkl_mb:.1f} MB | compiled/ {npy_mb:.1f} MB")
+        print(
+            f"{'Modo':>6} | {'Workers':>7} | {'carga':>10} | {'prontos':>10} | "
+            f"{'RSS/worker':>11} | {'PSS/worker':>11} | {'PSS total':>11}"
+        )
+        for n_workers in args.workers:
+            for mode in ("pickle", "mmap"):
+                run_workers(mode, n_workers, root, version)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: política de paralelismo na predição sob concorrência
+
+Compara a vazão e a latência p99 de DelayPredictor.predict (caminho do
+Pipeline, sem o motor compilado) com 1, 8 e 32 clientes simultâneos em
+duas configurações:
+    legado:   classificador com n_jobs=-1 (workers do joblib por chamada)
+    política: predição serial abaixo de SERIAL_PREDICT_THRESHOLD
+
+Uso:
+    cd backend
+    python benchmarks/bench_parallelism.py --requests 400
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Adicionar diretório do backend ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import DATA_DIR
+from app.models.predictor import DelayPredictor
+
+
+def run(predictor: DelayPredictor, rows, clients: int, n_requests: int):
+    """Dispara n_requests predições com `clients` threads concorrentes"""
+    def call(i):
+        start = time.perf_counter()
+        predictor.predict(rows[i % len(rows)])
+        return (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = list(pool.map(call, range(n_requests)))
+    elapsed = time.perf_counter() - start
+    return n_requests / elapsed, np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=400)
+    args = parser.parse_args()
+    
+    df = pd.read_csv(DATA_DIR / "dados_treino.csv")
+    rows = df.drop(columns=["freight_description", "delay_label"]).to_dict(orient="records")
+    
+    predictor = DelayPredictor()
+    predictor.train(df)
+    # Medir apenas o caminho do Pipeline (sem motor compilado nem cache)
+    predictor.active.fast_engine = None
+    predictor.cache.enabled = False
+    classifier = predictor.model.named_steps["classifier"]
+    
+    print(f"{'Config':>9} | {'Clientes':>8} | {'req/s':>9} | {'p99':>9}")
+    for label, n_jobs in (("legado", -1), ("política", None)):
+        classifier.set_params(n_jobs=n_jobs)
+        predictor.predict(rows[0])
+        for clients in (1, 8, 32):
+            throughput, p99 = run(predictor, rows, clients, args.requests)
+            print(f"{label:>9} | {clients:>8} | {throughput:>9.1f} | {p99:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: validador vetorizado de passada única vs validador antigo
+
+Gera um DataFrame sintético (tipos iguais aos da ingestão: category e
+float32) com uma pequena fração de linhas inválidas e mede o tempo de
+CSVValidator.validate_csv contra uma réplica do validador anterior, que
+fazia uma passada por regra e montava DataFrames filtrados para contar.
+
+Uso:
+    cd backend
+    python benchmarks/bench_validation.py --rows 1000000 10000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Adicionar diretório do backend ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import REQUIRED_COLUMNS, VALID_DELAY_LABELS, VALID_TRAFFIC_LEVELS
+from app.utils.validator import CSVValidator
+
+
+def build_frame(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """DataFrame sintético com ~0,1% de linhas inválidas"""
+    rng = np.random.default_rng(seed)
+    
+    def categorical(values, size):
+        return pd.Categorical.from_codes(rng.integers(0, len(values), size), values)
+    
+    df = pd.DataFrame({
+        "freight_description": pd.Categorical.from_codes(np.zeros(n_rows, dtype=np.int8), ["X"]),
+        "delay_label": categorical(VALID_DELAY_LABELS, n_rows),
+        "route_variant_id": categorical([f"ROTA_{i:03d}" for i in range(1, 6)], n_rows),
+        "planned_departure_hour": rng.integers(0, 24, n_rows).astype(np.float32),
+        "traffic_level_forecast": categorical(VALID_TRAFFIC_LEVELS + ["muito_alto"], n_rows),
+        "rain_forecast_mm": rng.uniform(0, 50, n_rows).astype(np.float32),
+        "cargo_weight_kg": rng.uniform(500, 4200, n_rows).astype(np.float32),
+        "vehicle_type": categorical(["Van", "Caminhão Baú"], n_rows),
+        "historical_avg_route_time_min": rng.uniform(30, 200, n_rows).astype(np.float32),
+        "distance_km": rng.uniform(25, 150, n_rows).astype(np.float32),
+    })[REQUIRED_COLUMNS]
+    
+    # Manter só ~0,1% de tráfego inválido e injetar horas fora da faixa e faltantes
+    traffic = df["traffic_level_forecast"]
+    keep_invalid = rng.random(n_rows) < 0.004
+    df["traffic_level_forecast"] = traffic.where(
+        (traffic != "muito_alto") | keep_invalid, "alto"
+    )
+    bad = rng.choice(n_rows, size=max(1, n_rows // 1000), replace=False)
+    df.loc[bad[: len(bad) // 2], "planned_departure_hour"] = 30
+    df.loc[bad[len(bad) // 2:], "rain_forecast_mm"] = np.nan
+    return df
+
+
+def legacy_validate(df: pd.DataFrame):
+    """Réplica do validador anterior (uma passada por regra)"""
+    errors = []
+    missing = set(REQUIRED_COLUMNS) - set(df.columns)
+    if missing:
+        errors.append(f"Colunas obrigatórias faltando: {missing}")
+    
+    for col in ["planned_departure_hour", "rain_forecast_mm", "cargo_weight_kg",
+                "historical_avg_route_time_min", "distance_km"]:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            errors.append(f"{col} deve ser numérico")
+    invalid_hours = df[(df["planned_departure_hour"] < 0) | (df["planned_departure_hour"] > 23)]
+    if len(invalid_hours) > 0:
+        errors.append(f"{len(invalid_hours)} horas inválidas")
+    
+    for col, valid in (("traffic_level_forecast", VALID_TRAFFIC_LEVELS),
+                       ("delay_label", VALID_DELAY_LABELS)):
+        invalid = ~df[col].isin(valid)
+        if invalid.any():
+            errors.append(f"{col}: {list(df.loc[invalid, col].unique())}")
+    
+    for col in ["delay_label", "planned_departure_hour", "traffic_level_forecast",
+                "rain_forecast_mm", "cargo_weight_kg", "vehicle_type",
+                "historical_avg_route_time_min", "distance_km"]:
+        null_count = df[col].isnull().sum()
+        if null_count > 0:
+            errors.append(f"{col}: {null_count} faltantes")
+    return len(errors) == 0, errors
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+    
+    validator = CSVValidator()
+    print(f"{'Linhas':>11} | {'Tipos':>8} | {'Antigo':>8} | {'Novo':>8} | {'Speedup':>7} | Inválidas")
+    for n_rows in args.rows:
+        typed = build_frame(n_rows)
+        # object: como o pandas lê o CSV sem dtypes explícitos
+        for label, df in (("category", typed), ("object", None)):
+            if df is None:
+                df = typed.astype({
+                    col: object for col in typed.columns
+                    if isinstance(typed[col].dtype, pd.CategoricalDtype)
+                })
+            legacy_time, _ = timed(legacy_validate, df)
+            new_time, _ = timed(validator.validate_csv, df)
+            n_invalid = int(validator.invalid_mask.sum())
+            print(
+                f"{n_rows:>11} | {label:>8} | {legacy_time:>7.3f}s | {new_time:>7.3f}s | "
+                f"{legacy_time / new_time:>6.1f}x | {n_invalid}"
+            )
+            del df
+        del typed
+
+
+if __name__ == "__main__":
+    main()
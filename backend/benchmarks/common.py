@@ -0,0 +1,154 @@
+"""
+Utilitários compartilhados pelos benchmarks
+
+Dados sintéticos com semente fixa (gerados por data/generate_realistic_data.py
+e guardados em cache), medição de tempos e gravação dos resultados em JSON
+com o commit e o ambiente, para comparar execuções entre commits (ver
+compare_results.py).
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Adicionar diretório do backend ao path
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config import DATA_DIR
+from app.schema import csv_dtypes
+
+# Datasets gerados ficam em cache (gerar milhões de linhas leva minutos)
+CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_SEED = 42
+
+
+def dataset_path(n_rows: int, seed: int = DEFAULT_SEED) -> Path:
+    """
+    CSV sintético com n_rows linhas, gerado uma única vez por (n_rows, seed)
+
+    Usa o gerador vetorizado de data/generate_realistic_data.py: a mesma
+    semente produz o mesmo arquivo em qualquer máquina.
+    """
+    path = CACHE_DIR / f"fretes_{n_rows}_{seed}.csv"
+    if path.exists():
+        return path
+
+    sys.path.insert(0, str(DATA_DIR))
+    import generate_realistic_data as generator
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    generator.write_dataset(generator.generate_dataset(n_rows, seed), path)
+    return path
+
+
+def load_dataset(n_rows: int, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """Dataset sintético com os tipos do schema (como na ingestão)"""
+    return pd.read_csv(dataset_path(n_rows, seed), dtype=csv_dtypes())
+
+
+def feature_rows(df: pd.DataFrame, n_rows: int) -> List[Dict[str, Any]]:
+    """Linhas de entrada de predição (sem rótulo), repetindo df até n_rows"""
+    features = df.drop(columns=["freight_description", "delay_label"])
+    repeats = n_rows // len(features) + 1
+    features = pd.concat([features] * repeats, ignore_index=True).head(n_rows)
+    # Tipos nativos do Python, como chegam de um corpo JSON
+    return json.loads(features.to_json(orient="records"))
+
+
+def summarize(seconds: List[float]) -> Dict[str, float]:
+    """Estatísticas de uma lista de durações (em segundos)"""
+    values = np.asarray(seconds)
+    return {
+        "n": len(values),
+        "min": float(values.min()),
+        "median": float(np.median(values)),
+        "mean": float(values.mean()),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "stdev": float(statistics.pstdev(values)) if len(values) > 1 else 0.0
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """Chama func repeat vezes (após warmup chamadas) e resume as durações"""
+    for _ in range(warmup):
+        func()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return summarize(durations)
+
+
+def git_commit() -> Dict[str, Any]:
+    """Commit atual e se há alterações não commitadas"""
+    def git(*args) -> Optional[str]:
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(status)}
+
+
+def environment() -> Dict[str, Any]:
+    """Versões e hardware, gravados junto dos resultados"""
+    import fastapi
+    import sklearn
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "fastapi": fastapi.__version__
+    }
+
+
+def write_results(
+    name: str,
+    params: Dict[str, Any],
+    results: Dict[str, Any],
+    output: Optional[Path] = None
+) -> Path:
+    """
+    Grava os resultados em JSON
+
+    Sem output, grava em benchmarks/results/<name>-<commit>.json.
+    """
+    meta = git_commit()
+    if output is None:
+        suffix = f"{meta['commit'] or 'local'}{'-dirty' if meta['dirty'] else ''}"
+        output = RESULTS_DIR / f"{name}-{suffix}.json"
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    payload = {
+        "suite": name,
+        **meta,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "params": params,
+        "results": results
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    return output
@@ -0,0 +1,80 @@
+"""
+Compara dois resultados da suíte de benchmarks (run_suite.py)
+
+Lista cada métrica numérica das duas execuções com a razão novo/antigo e
+marca as que mudaram mais que o limite. Tempos (segundos) maiores e vazões
+(*_per_second) menores são regressões.
+
+Uso:
+    cd backend
+    python benchmarks/compare_results.py benchmarks/results/suite-a1b2c3d.json benchmarks/results/suite-e4f5a6b.json
+    python benchmarks/compare_results.py antigo.json novo.json --metric median --threshold 0.10
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+# Estatísticas de latência comparadas por padrão (as demais variam demais)
+LATENCY_STATS = {"min", "median", "mean", "p95", "p99"}
+
+
+def flatten(data: Any, prefix: str = "") -> Dict[str, float]:
+    """Folhas numéricas de um JSON aninhado, com chaves "a.b.c" """
+    values = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            values.update(flatten(value, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        values[prefix] = float(data)
+    return values
+
+
+def is_throughput(key: str) -> bool:
+    return key.endswith("_per_second")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dois resultados da suíte de benchmarks")
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--metric", nargs="+", default=["median"],
+                        help="Estatísticas de latência comparadas (além das vazões)")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Variação relativa a partir da qual marcar a métrica")
+    args = parser.parse_args()
+
+    old_run = json.loads(args.old.read_text(encoding="utf-8"))
+    new_run = json.loads(args.new.read_text(encoding="utf-8"))
+    old, new = flatten(old_run["results"]), flatten(new_run["results"])
+    stats = set(args.metric) & LATENCY_STATS
+
+    print(f"antigo: {old_run.get('commit')}  novo: {new_run.get('commit')}")
+    if old_run.get("environment") != new_run.get("environment"):
+        print("Aviso: ambientes diferentes; compare com cautela")
+
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        throughput = is_throughput(key)
+        if not throughput and key.rsplit(".", 1)[-1] not in stats:
+            continue
+        before, after = old[key], new[key]
+        if before == 0:
+            continue
+        ratio = after / before
+        worse = ratio < 1 - args.threshold if throughput else ratio > 1 + args.threshold
+        better = ratio > 1 + args.threshold if throughput else ratio < 1 - args.threshold
+        flag = "REGRESSÃO" if worse else ("melhora" if better else "")
+        regressions += worse
+        print(f"{key:<60} {before:>12.6g} {after:>12.6g} {ratio:>7.2f}x  {flag}")
+
+    missing = sorted(old.keys() ^ new.keys())
+    if missing:
+        print(f"{len(missing)} métricas presentes em apenas um dos arquivos")
+    print(f"{regressions} regressões acima de {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Teste de carga: predição por WebSocket vs. uma requisição HTTP por frete
+
+Envia fretes distintos (chuva variada, para não cair no cache de
+predições) de três formas e mede a vazão sustentada:
+    http: POST /api/predict um frete por vez, na mesma conexão
+    http concorrente: --threads clientes HTTP em paralelo
+    stream: uma conexão em /api/predict/stream, enviando sem esperar as
+        respostas (o servidor agrupa os fretes em micro-lotes)
+
+Uso (com o servidor rodando e um modelo já treinado):
+    cd backend
+    uvicorn app.main:app --port 8000
+    python benchmarks/load_test_stream.py --url http://localhost:8000 --freights 5000
+
+Referência (1 CPU, servidor e cliente na mesma VM, random_forest):
+    http               5000 fretes    13.8s      362 fretes/s
+    http concorrente   5000 fretes    10.7s      469 fretes/s  (8 threads)
+    stream             5000 fretes     0.7s     7199 fretes/s  (7 mensagens de resultado)
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+from websockets.sync.client import connect
+
+SAMPLE_FREIGHT = {
+    "route_variant_id": "ROTA_001",
+    "planned_departure_hour": 8,
+    "traffic_level_forecast": "alto",
+    "rain_forecast_mm": 10.0,
+    "cargo_weight_kg": 2000,
+    "vehicle_type": "Van",
+    "historical_avg_route_time_min": 120,
+    "distance_km": 85
+}
+
+
+def build_freights(n: int) -> List[Dict[str, Any]]:
+    return [{**SAMPLE_FREIGHT, "rain_forecast_mm": round(i * 0.001, 3)} for i in range(n)]
+
+
+def run_http(url: str, freights: List[Dict[str, Any]]) -> float:
+    """Um POST /api/predict por frete, em sequência, com keep-alive"""
+    parsed = urlparse(url)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port)
+    start = time.perf_counter()
+    for freight in freights:
+        connection.request(
+            "POST", "/api/predict", body=json.dumps(freight),
+            headers={"Content-Type": "application/json"}
+        )
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 200, response.status
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return elapsed
+
+
+def run_http_concurrent(url: str, freights: List[Dict[str, Any]], threads: int) -> float:
+    """Fretes divididos entre threads, cada uma com sua conexão"""
+    chunks = [freights[i::threads] for i in range(threads)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda chunk: run_http(url, chunk), chunks))
+    return time.perf_counter() - start
+
+
+def run_stream(url: str, freights: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Envia todos os fretes em uma conexão e lê os resultados em paralelo"""
+    ws_url = url.replace("http://", "ws://").replace("https://", "wss://") + "/api/predict/stream"
+    with connect(ws_url, max_size=None) as websocket:
+        def send_all():
+            for i, freight in enumerate(freights):
+                websocket.send(json.dumps({"id": i, "freight": freight}))
+
+        start = time.perf_counter()
+        sender = threading.Thread(target=send_all)
+        sender.start()
+        received, messages = 0, 0
+        while received < len(freights):
+            results = json.loads(websocket.recv())
+            assert all(result["status"] == "success" for result in results)
+            received += len(results)
+            messages += 1
+        elapsed = time.perf_counter() - start
+        sender.join()
+    return {"seconds": elapsed, "messages": messages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predição por WebSocket vs. HTTP")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--freights", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    # Fretes distintos em cada forma, para nenhuma aproveitar o cache da anterior
+    n = args.freights
+    freights = build_freights(3 * n)
+
+    elapsed = run_http(args.url, freights[:n])
+    print(f"  {'http':<18} {n} fretes {elapsed:7.1f}s  {n / elapsed:7.0f} fretes/s")
+
+    elapsed = run_http_concurrent(args.url, freights[n:2 * n], args.threads)
+    print(
+        f"  {'http concorrente':<18} {n} fretes {elapsed:7.1f}s  {n / elapsed:7.0f} fretes/s"
+        f"  ({args.threads} threads)"
+    )
+
+    stream = run_stream(args.url, freights[2 * n:])
+    elapsed = stream["seconds"]
+    print(
+        f"  {'stream':<18} {n} fretes {elapsed:7.1f}s  {n / elapsed:7.0f} fretes/s"
+        f"  ({stream['messages']} mensagens de resultado)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Teste de carga: latência de /api/health e /api/predict durante um treino
+
+Mede a latência das rotas leves em duas fases: antes (baseline) e enquanto
+um upload de treino está em andamento. Com o treino fora do event loop as
+duas distribuições devem ficar próximas.
+
+Uso (com o servidor rodando e um modelo já treinado):
+    cd backend
+    uvicorn app.main:app --port 8000
+    python benchmarks/load_test_training.py --url http://localhost:8000 --multiplier 200
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.request
+import uuid
+from pathlib import Path
+from typing import List
+
+SAMPLE_FREIGHT = {
+    "route_variant_id": "ROTA_001",
+    "planned_departure_hour": 8,
+    "traffic_level_forecast": "alto",
+    "rain_forecast_mm": 10.0,
+    "cargo_weight_kg": 2000,
+    "vehicle_type": "Van",
+    "historical_avg_route_time_min": 120,
+    "distance_km": 85
+}
+
+
+def build_training_csv(multiplier: int) -> bytes:
+    """Repete o CSV de exemplo para gerar um treino mais demorado"""
+    lines = (Path(__file__).parent.parent / "data" / "dados_treino.csv").read_text(
+        encoding="utf-8"
+    ).splitlines()
+    header, body = lines[0], lines[1:]
+    return "\n".join([header] + body * multiplier).encode("utf-8")
+
+
+def post_training(url: str, contents: bytes, done: threading.Event):
+    """Envia o CSV para /api/train como multipart/form-data"""
+    boundary = uuid.uuid4().hex
+    payload = b"".join([
+        f"--{boundary}\r\n".encode(),
+        b'Content-Disposition: form-data; name="file"; filename="load.csv"\r\n',
+        b"Content-Type: text/csv\r\n\r\n",
+        contents,
+        f"\r\n--{boundary}\r\n".encode(),
+        b'Content-Disposition: form-data; name="test_size"\r\n\r\n0.2',
+        f"\r\n--{boundary}--\r\n".encode(),
+    ])
+    request = urllib.request.Request(
+        f"{url}/api/train",
+        data=payload,
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=3600) as response:
+            job_id = json.loads(response.read())["job_id"]
+        # O treino roda como job: aguardar até terminar
+        while True:
+            with urllib.request.urlopen(f"{url}/api/jobs/{job_id}", timeout=60) as response:
+                job = json.loads(response.read())
+            if job["status"] in ("completed", "failed", "cancelled"):
+                print(f"Job {job_id}: {job['status']}")
+                break
+            time.sleep(0.5)
+    finally:
+        print(f"Treino concluído em {time.perf_counter() - start:.1f}s")
+        done.set()
+
+
+def probe(url: str, path: str, body, latencies: List[float], stop: threading.Event):
+    """Chama a rota em loop registrando a latência de cada chamada (ms)"""
+    data = json.dumps(body).encode() if body is not None else None
+    while not stop.is_set():
+        request = urllib.request.Request(
+            f"{url}{path}", data=data, headers={"Content-Type": "application/json"}
+        )
+        start = time.perf_counter()
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def run_phase(url: str, duration: float = None, until: threading.Event = None):
+    """Executa os probes até o fim da duração ou até o evento ser sinalizado"""
+    stop = until or threading.Event()
+    results = {"/api/health": [], "/api/predict": []}
+    threads = [
+        threading.Thread(target=probe, args=(url, "/api/health", None, results["/api/health"], stop)),
+        threading.Thread(target=probe, args=(url, "/api/predict", SAMPLE_FREIGHT, results["/api/predict"], stop)),
+    ]
+    for thread in threads:
+        thread.start()
+    if until is None:
+        time.sleep(duration)
+        stop.set()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def summarize(name: str, results):
+    """Imprime p50/p99/max por rota"""
+    print(f"\n--- {name} ---")
+    for path, latencies in results.items():
+        if not latencies:
+            print(f"  {path}: sem amostras")
+            continue
+        ordered = sorted(latencies)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        print(
+            f"  {path}: n={len(ordered)} p50={statistics.median(ordered):.1f}ms "
+            f"p99={p99:.1f}ms max={ordered[-1]:.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--baseline-seconds", type=float, default=5.0)
+    parser.add_argument(
+        "--multiplier", type=int, default=100,
+        help="Quantas vezes repetir o CSV de exemplo no upload de treino"
+    )
+    args = parser.parse_args()
+    
+    summarize("Baseline (sem treino)", run_phase(args.url, duration=args.baseline_seconds))
+    
+    done = threading.Event()
+    trainer = threading.Thread(
+        target=post_training, args=(args.url, build_training_csv(args.multiplier), done)
+    )
+    trainer.start()
+    summarize("Durante o treino", run_phase(args.url, until=done))
+    trainer.join()
+
+
+if __name__ == "__main__":
+    main()
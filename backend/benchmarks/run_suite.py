@@ -0,0 +1,284 @@
+"""
+Suíte de benchmarks do backend de ML
+
+Mede, com dados sintéticos de semente fixa (ver common.py):
+    predict      latência de predict (motor compilado e Pipeline) e vazão
+                 de predict_batch por tamanho de lote
+    train        tempo de treino (e por estágio) por nº de linhas e de árvores
+    validation   vazão do CSVValidator
+    parse        leitura do CSV (pd.read_csv e read_training_csv)
+    persistence  salvar/carregar modelo (registro, mmap e joblib)
+    http         ponta a ponta pela API, com cliente ASGI no mesmo processo
+
+Os resultados são gravados em JSON (benchmarks/results/suite-<commit>.json)
+junto do commit e do ambiente; compare duas execuções com
+compare_results.py. O cache de predições fica desligado.
+
+Uso:
+    cd backend
+    python benchmarks/run_suite.py
+    python benchmarks/run_suite.py --sections train --train-rows 10000 100000 1000000 --trees 50 100 200
+    python benchmarks/compare_results.py results/suite-a1b2c3d.json results/suite-e4f5a6b.json
+
+Treinos com 10M de linhas exigem dezenas de GB de RAM; os padrões cabem
+em uma máquina pequena.
+"""
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import joblib
+import pandas as pd
+
+from common import (
+    DEFAULT_SEED,
+    dataset_path,
+    feature_rows,
+    load_dataset,
+    measure,
+    summarize,
+    write_results
+)
+from app.config import RANDOM_FOREST_PARAMS
+from app.models.predictor import DelayPredictor, LoadedModel
+from app.models.registry import ModelRegistry
+from app.schema import csv_dtypes
+from app.utils.ingestion import read_training_csv
+from app.utils.metrics import StageTimer
+from app.utils.validator import CSVValidator
+
+SECTIONS = ["predict", "train", "validation", "parse", "persistence", "http"]
+
+
+def timed_calls(func, inputs: List[Any]) -> Dict[str, float]:
+    """Chama func uma vez por entrada e resume as latências"""
+    durations = []
+    for item in inputs:
+        start = time.perf_counter()
+        func(item)
+        durations.append(time.perf_counter() - start)
+    return summarize(durations)
+
+
+def train_predictor(df: pd.DataFrame) -> DelayPredictor:
+    predictor = DelayPredictor()
+    predictor.train(df, validated=True)
+    predictor.cache.enabled = False
+    return predictor
+
+
+def bench_predict(predictor: DelayPredictor, rows: List[Dict[str, Any]], args) -> Dict[str, Any]:
+    """Latência linha a linha e vazão em lote"""
+    n = args.requests
+    inputs = [rows[i % len(rows)] for i in range(n)]
+    results: Dict[str, Any] = {}
+
+    predictor.predict(inputs[0])
+    results["single_engine"] = timed_calls(predictor.predict, inputs)
+
+    # Caminho do Pipeline: sem o motor compilado
+    active = predictor.active
+    engine, active.fast_engine = active.fast_engine, None
+    try:
+        results["single_pipeline"] = timed_calls(predictor.predict, inputs[:max(n // 10, 50)])
+    finally:
+        active.fast_engine = engine
+
+    batches = {}
+    for size in args.batch_sizes:
+        batch = (rows * (size // len(rows) + 1))[:size]
+        stats = measure(lambda: predictor.predict_batch(batch), repeat=args.repeat)
+        stats["rows_per_second"] = size / stats["median"]
+        batches[str(size)] = stats
+    results["batch"] = batches
+    return results
+
+
+def bench_train(args) -> Dict[str, Any]:
+    """Tempo de treino por nº de linhas e de árvores"""
+    results = {}
+    default_params = dict(RANDOM_FOREST_PARAMS)
+    try:
+        for n_rows in args.train_rows:
+            df = load_dataset(n_rows, args.seed)
+            for n_trees in args.trees:
+                RANDOM_FOREST_PARAMS.update(n_estimators=n_trees)
+                timer = StageTimer()
+                start = time.perf_counter()
+                result = DelayPredictor().train(df, validated=True, timer=timer)
+                seconds = time.perf_counter() - start
+                results[f"rows={n_rows},trees={n_trees}"] = {
+                    "rows": n_rows,
+                    "trees": n_trees,
+                    "seconds": seconds,
+                    "stages": timer.rounded(),
+                    "fit_rows_per_second": n_rows / timer.durations["fit"],
+                    "accuracy": result["metrics"]["accuracy"]
+                }
+                print(f"  treino {n_rows} linhas, {n_trees} árvores: {seconds:.2f}s")
+    finally:
+        RANDOM_FOREST_PARAMS.clear()
+        RANDOM_FOREST_PARAMS.update(default_params)
+    return results
+
+
+def bench_validation(df: pd.DataFrame, args) -> Dict[str, Any]:
+    """Vazão do CSVValidator sobre o DataFrame inteiro"""
+    stats = measure(lambda: CSVValidator().validate_csv(df), repeat=args.repeat)
+    stats["rows_per_second"] = len(df) / stats["median"]
+    return stats
+
+
+def bench_parse(args) -> Dict[str, Any]:
+    """Leitura do CSV: pandas puro e ingestão em chunks com validação"""
+    path = dataset_path(args.rows, args.seed)
+    size_mb = path.stat().st_size / 1024 / 1024
+    results = {"rows": args.rows, "file_mb": size_mb}
+    for label, func in (
+        ("read_csv", lambda: pd.read_csv(path, dtype=csv_dtypes())),
+        ("read_training_csv", lambda: read_training_csv(path))
+    ):
+        stats = measure(func, repeat=args.repeat)
+        stats["rows_per_second"] = args.rows / stats["median"]
+        stats["mb_per_second"] = size_mb / stats["median"]
+        results[label] = stats
+    return results
+
+
+def bench_persistence(predictor: DelayPredictor, args) -> Dict[str, Any]:
+    """Salvar e carregar o modelo pelo registro (mmap) e por joblib"""
+    state = predictor.get_state()
+    engine = predictor.fast_engine
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(Path(tmp) / "models")
+        versions = iter(range(1, 10000))
+
+        def save():
+            registry.save({**state, "version": f"1.0.{next(versions)}"}, engine)
+
+        results["registry_save"] = measure(save, repeat=args.repeat)
+        version = registry.versions()[-1]
+        results["registry_load"] = measure(
+            lambda: LoadedModel.from_artifact(registry, version), repeat=args.repeat
+        )
+
+        legacy_path = Path(tmp) / "model.pkl"
+        results["joblib_dump"] = measure(lambda: joblib.dump(state, legacy_path), repeat=args.repeat)
+        results["joblib_load"] = measure(
+            lambda: LoadedModel.from_state(joblib.load(legacy_path)), repeat=args.repeat
+        )
+        results["artifact_mb"] = legacy_path.stat().st_size / 1024 / 1024
+    return results
+
+
+async def _bench_http(rows: List[Dict[str, Any]], args) -> Dict[str, Any]:
+    import httpx
+    from app.main import app
+
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def timed(method: str, url: str, **kwargs) -> float:
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            response.raise_for_status()
+            return time.perf_counter() - start
+
+        await timed("POST", "/api/predict", json=rows[0])
+        results["health"] = summarize(
+            [await timed("GET", "/api/health") for _ in range(args.requests)]
+        )
+        results["predict"] = summarize([
+            await timed("POST", "/api/predict", json=rows[i % len(rows)])
+            for i in range(args.requests)
+        ])
+
+        # Clientes concorrentes no mesmo event loop
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def limited(i: int) -> float:
+            async with semaphore:
+                return await timed("POST", "/api/predict", json=rows[i % len(rows)])
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(limited(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - start
+        concurrent = summarize(list(latencies))
+        concurrent.update(concurrency=args.concurrency, requests_per_second=args.requests / elapsed)
+        results["predict_concurrent"] = concurrent
+
+        batch = (rows * (1000 // len(rows) + 1))[:1000]
+        batch_stats = summarize([
+            await timed("POST", "/api/predict/batch", json=batch) for _ in range(args.repeat)
+        ])
+        batch_stats["rows_per_second"] = 1000 / batch_stats["median"]
+        results["predict_batch_1000"] = batch_stats
+    return results
+
+
+def bench_http(predictor: DelayPredictor, rows: List[Dict[str, Any]], args) -> Dict[str, Any]:
+    """Requisições pela aplicação FastAPI completa (middlewares, validação, JSON)"""
+    from app.models.predictor import predictor as global_predictor
+    from app.utils.executor import shutdown_executors
+
+    global_predictor.activate(predictor.active)
+    global_predictor.cache.enabled = False
+    try:
+        return asyncio.run(_bench_http(rows, args))
+    finally:
+        shutdown_executors()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=SECTIONS)
+    parser.add_argument("--rows", type=int, default=100000,
+                        help="Linhas do dataset de predição, validação e leitura")
+    parser.add_argument("--train-rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--trees", type=int, nargs="+", default=[50, 100])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 1000, 10000])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    # Logs por requisição distorcem as latências
+    logging.disable(logging.INFO)
+
+    results: Dict[str, Any] = {}
+    needs_model = {"predict", "persistence", "http"} & set(args.sections)
+    df = load_dataset(args.rows, args.seed) if needs_model or "validation" in args.sections else None
+    predictor = train_predictor(df) if needs_model else None
+    rows = feature_rows(df, 10000) if df is not None else []
+
+    for section in args.sections:
+        print(f"[{section}]")
+        start = time.perf_counter()
+        if section == "predict":
+            results[section] = bench_predict(predictor, rows, args)
+        elif section == "train":
+            results[section] = bench_train(args)
+        elif section == "validation":
+            results[section] = bench_validation(df, args)
+        elif section == "parse":
+            results[section] = bench_parse(args)
+        elif section == "persistence":
+            results[section] = bench_persistence(predictor, args)
+        elif section == "http":
+            results[section] = bench_http(predictor, rows, args)
+        print(f"  {time.perf_counter() - start:.1f}s")
+
+    params = {key: (str(value) if isinstance(value, Path) else value) for key, value in vars(args).items()}
+    output = write_results("suite", params, results, args.output)
+    print(f"Resultados gravados em {output}")
+
+
+if __name__ == "__main__":
+    main()
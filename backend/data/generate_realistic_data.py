@@ -3,26 +3,50 @@ Script para gerar dados de treino realistas com ruído apropriado
 para o modelo de predição de atrasos de entregas.
 
 Melhorias:
-- Remoção de seed fixo para mais variabilidade
 - Correlações mais complexas entre variáveis
 - Mais ruído e incerteza nos dados
 - Edge cases e situações extremas
 - Sazonalidade e padrões temporais
+
+Geração vetorizada com NumPy, em blocos de linhas: cada bloco tem um
+gerador próprio derivado da semente e do índice do bloco, então a mesma
+semente (e o mesmo tamanho de bloco) produz o mesmo arquivo com qualquer
+número de processos. Sem --seed, a semente é sorteada e exibida.
+
+Uso:
+    python generate_realistic_data.py
+    python generate_realistic_data.py --rows 10000000 --seed 42 --workers 4 -o fretes.csv
+    python generate_realistic_data.py --rows 10000000 --seed 42 -o fretes.parquet   # requer pyarrow
 """
-import csv
-import random
-import math
-from datetime import datetime, timedelta
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet é opcional
+    pa = None
+    pq = None
 
 # Configurações
 NUM_TRAIN = 367
 NUM_TEST = 92
 TOTAL = NUM_TRAIN + NUM_TEST
+DEFAULT_CHUNK_ROWS = 100000
 
 # Dados base
 ROUTES = ["ROTA_001", "ROTA_002", "ROTA_003", "ROTA_004", "ROTA_005"]
 VEHICLE_TYPES = ["Van", "Caminhão Baú", "Caminhão Truck", "Caminhão Bitrem"]
 TRAFFIC_LEVELS = ["baixo", "medio", "alto"]
+SCENARIOS = ["normal", "problematic", "favorable", "extreme"]
+SCENARIO_WEIGHTS = [0.50, 0.20, 0.20, 0.10]
 
 # Características ocultas das rotas (não explícitas, mas influenciam)
 ROUTE_CHARACTERISTICS = {
@@ -32,6 +56,8 @@ ROUTE_CHARACTERISTICS = {
     "ROTA_004": {"congestion_prone": 0.4, "weather_sensitive": 0.3, "reliability": 0.85},
     "ROTA_005": {"congestion_prone": 0.5, "weather_sensitive": 0.5, "reliability": 0.80}
 }
+BASE_DISTANCE = {"ROTA_001": 85, "ROTA_002": 45, "ROTA_003": 120, "ROTA_004": 55, "ROTA_005": 95}
+BASE_TIME = {"ROTA_001": 120, "ROTA_002": 90, "ROTA_003": 145, "ROTA_004": 85, "ROTA_005": 130}
 
 # Características dos veículos
 VEHICLE_CHARACTERISTICS = {
@@ -41,93 +67,141 @@ VEHICLE_CHARACTERISTICS = {
     "Caminhão Bitrem": {"speed_avg": 0.65, "weather_sensitivity": 0.8, "weight_capacity": 25000}
 }
 
-def generate_freight_id():
-    """Gera um ID único para o frete"""
-    letters = ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3))
-    numbers = ''.join(random.choices('0123456789', k=4))
-    return f"{letters}-{numbers}"
+# Tabelas por cenário (linhas na ordem de SCENARIOS)
+TRAFFIC_WEIGHTS = np.array([
+    [1 / 3, 1 / 3, 1 / 3],
+    [0.2, 0.3, 0.5],
+    [0.6, 0.3, 0.1],
+    [1 / 3, 1 / 3, 1 / 3]   # extreme: sorteado à parte (ver _generate_correlated_data)
+])
+VEHICLE_WEIGHTS = np.array([
+    [0.25, 0.25, 0.25, 0.25],
+    [0.2, 0.3, 0.3, 0.2],
+    [0.35, 0.3, 0.25, 0.1],
+    [0.15, 0.25, 0.35, 0.25]
+])
+# Faixas de horário (madrugada, pico manhã, dia, tarde/noite) e seus pesos
+HOUR_BANDS = np.array([[0, 6], [7, 9], [10, 16], [17, 23]])
+HOUR_BAND_WEIGHTS = np.array([
+    [1, 1, 1, 1],   # normal: horário uniforme (faixa não usada)
+    [0.1, 0.35, 0.15, 0.4],
+    [0.25, 0.15, 0.35, 0.25],
+    [1, 1, 1, 1]    # extreme: horário uniforme (faixa não usada)
+])
+
+# Arrays por rota / veículo (indexados pelo código sorteado)
+_ROUTE_CONGESTION = np.array([ROUTE_CHARACTERISTICS[r]["congestion_prone"] for r in ROUTES])
+_ROUTE_WEATHER = np.array([ROUTE_CHARACTERISTICS[r]["weather_sensitive"] for r in ROUTES])
+_ROUTE_RELIABILITY = np.array([ROUTE_CHARACTERISTICS[r]["reliability"] for r in ROUTES])
+_ROUTE_DISTANCE = np.array([BASE_DISTANCE[r] for r in ROUTES])
+_ROUTE_TIME = np.array([BASE_TIME[r] for r in ROUTES])
+_VEHICLE_SPEED = np.array([VEHICLE_CHARACTERISTICS[v]["speed_avg"] for v in VEHICLE_TYPES])
+_VEHICLE_WEATHER = np.array([VEHICLE_CHARACTERISTICS[v]["weather_sensitivity"] for v in VEHICLE_TYPES])
+_VEHICLE_CAPACITY = np.array([VEHICLE_CHARACTERISTICS[v]["weight_capacity"] for v in VEHICLE_TYPES])
+
+# Períodos do dia da análise (índice em PERIODS por hora)
+PERIODS = ["Manhã (6-11)", "Tarde (12-17)", "Noite (18-22)", "Madrugada (23-5)"]
+_HOUR_PERIOD = np.array([3] * 6 + [0] * 6 + [1] * 6 + [2] * 5 + [3])
+
+FIELDNAMES = [
+    'freight_description',
+    'delay_label',
+    'route_variant_id',
+    'planned_departure_hour',
+    'traffic_level_forecast',
+    'rain_forecast_mm',
+    'cargo_weight_kg',
+    'vehicle_type',
+    'historical_avg_route_time_min',
+    'distance_km'
+]
+
+def _uniform(rng, low, high, n):
+    """random.uniform vetorizado"""
+    return rng.uniform(low, high, n)
 
-def generate_correlated_data():
+def _choice_per_row(rng, weights):
+    """Sorteia um índice por linha, cada linha com seus próprios pesos"""
+    cumulative = np.cumsum(weights, axis=1)
+    draws = rng.random(len(weights)) * cumulative[:, -1]
+    return (draws[:, None] >= cumulative).sum(axis=1)
+
+def generate_freight_ids(rng, n):
+    """Gera IDs de frete no formato AAA-0000"""
+    codes = np.empty((n, 8), dtype=np.uint8)
+    codes[:, :3] = rng.integers(ord('A'), ord('Z') + 1, (n, 3))
+    codes[:, 3] = ord('-')
+    codes[:, 4:] = rng.integers(ord('0'), ord('9') + 1, (n, 4))
+    return codes.view('S8').ravel().astype(str)
+
+def _generate_correlated_data(rng, n):
     """
-    Gera dados com correlações mais realistas entre variáveis.
-    Em vez de escolher cada variável independentemente, cria situações
-    que fazem sentido逻辑amente.
+    Gera dados com correlações realistas entre variáveis.
+    Em vez de escolher cada variável independentemente, sorteia um
+    cenário por linha que determina o perfil da viagem.
+    
+    Returns:
+        Dict de arrays (códigos de rota, veículo e trânsito e valores)
     """
     # Primeiro, decidir o contexto geral
-    scenario = random.choices(
-        ['normal', 'problematic', 'favorable', 'extreme'],
-        weights=[0.50, 0.20, 0.20, 0.10]
-    )[0]
-    
-    route = random.choice(ROUTES)
-    route_info = ROUTE_CHARACTERISTICS[route]
-    
-    # Cenários determinam o perfil da viagem
-    if scenario == 'problematic':
-        # Rota difícil, horário de pico, possível chuva
-        traffic = random.choices(TRAFFIC_LEVELS, weights=[0.2, 0.3, 0.5])[0]
-        hour = random.choices(
-            [random.randint(0, 6), random.randint(7, 9), random.randint(10, 16), random.randint(17, 23)],
-            weights=[0.1, 0.35, 0.15, 0.4]
-        )[0]
-        # Chuva mais provável em cenários problemáticos
-        rain = 0.0 if random.random() < 0.4 else round(random.uniform(1, 50), 1)
-        vehicle = random.choices(VEHICLE_TYPES, weights=[0.2, 0.3, 0.3, 0.2])[0]
-        
-    elif scenario == 'favorable':
-        # Condições boas, fora do pico
-        traffic = random.choices(TRAFFIC_LEVELS, weights=[0.6, 0.3, 0.1])[0]
-        hour = random.choices(
-            [random.randint(0, 6), random.randint(7, 9), random.randint(10, 16), random.randint(17, 23)],
-            weights=[0.25, 0.15, 0.35, 0.25]
-        )[0]
-        rain = 0.0 if random.random() < 0.75 else round(random.uniform(0.1, 15), 1)
-        vehicle = random.choices(VEHICLE_TYPES, weights=[0.35, 0.3, 0.25, 0.1])[0]
-        
-    elif scenario == 'extreme':
-        # Condições extremas - muita chuva OU trânsito muito forte
-        if random.random() < 0.5:
-            traffic = 'alto'
-            rain = 0.0 if random.random() < 0.6 else round(random.uniform(5, 25), 1)
-        else:
-            traffic = random.choice(TRAFFIC_LEVELS)
-            rain = round(random.uniform(25, 60), 1)  # Chuva muito forte
-        hour = random.randint(0, 23)
-        vehicle = random.choices(VEHICLE_TYPES, weights=[0.15, 0.25, 0.35, 0.25])[0]
-        
-    else:  # normal
-        traffic = random.choice(TRAFFIC_LEVELS)
-        hour = random.randint(0, 23)
-        # Chuva: distribuição mais realista
-        if random.random() < 0.65:
-            rain = 0.0
-        elif random.random() < 0.88:
-            rain = round(random.uniform(0.1, 12), 1)
-        else:
-            rain = round(random.uniform(12.1, 45), 1)
-        vehicle = random.choice(VEHICLE_TYPES)
+    scenario = rng.choice(len(SCENARIOS), size=n, p=SCENARIO_WEIGHTS)
+    normal, problematic, favorable, extreme = (scenario == i for i in range(len(SCENARIOS)))
+    
+    route = rng.integers(0, len(ROUTES), n)
+    traffic = _choice_per_row(rng, TRAFFIC_WEIGHTS[scenario])
+    vehicle = _choice_per_row(rng, VEHICLE_WEIGHTS[scenario])
+    
+    # Horário: faixa sorteada com pesos do cenário, ou uniforme
+    band = HOUR_BANDS[_choice_per_row(rng, HOUR_BAND_WEIGHTS[scenario])]
+    hour = np.where(
+        normal | extreme,
+        rng.integers(0, 24, n),
+        rng.integers(band[:, 0], band[:, 1] + 1)
+    )
+    
+    # Chuva por cenário
+    extreme_traffic = extreme & (rng.random(n) < 0.5)  # extremo: trânsito muito forte...
+    extreme_rain = extreme & ~extreme_traffic           # ...ou chuva muito forte
+    traffic = np.where(extreme_traffic, TRAFFIC_LEVELS.index('alto'), traffic)
+    
+    dry = rng.random(n)
+    normal_heavy = rng.random(n) >= 0.88
+    rain = np.select(
+        [
+            problematic,
+            favorable,
+            extreme_traffic,
+            extreme_rain,
+            normal & ~normal_heavy,
+            normal & normal_heavy
+        ],
+        [
+            np.where(dry < 0.4, 0.0, _uniform(rng, 1, 50, n)),
+            np.where(dry < 0.75, 0.0, _uniform(rng, 0.1, 15, n)),
+            np.where(dry < 0.6, 0.0, _uniform(rng, 5, 25, n)),
+            _uniform(rng, 25, 60, n),
+            np.where(dry < 0.65, 0.0, _uniform(rng, 0.1, 12, n)),
+            np.where(dry < 0.65, 0.0, _uniform(rng, 12.1, 45, n))
+        ]
+    ).round(1)
     
     # Peso da carga: pode ter correlação com tipo de veículo
-    vehicle_cap = VEHICLE_CHARACTERISTICS[vehicle]["weight_capacity"]
-    if random.random() < 0.6:
-        # Carga adequada para o veículo (70-95% da capacidade)
-        weight = int(vehicle_cap * random.uniform(0.4, 0.95))
-    else:
-        # Carga atípica (muito leve ou muito pesada)
-        weight = int(vehicle_cap * random.uniform(0.1, 1.1))
-    weight = max(500, min(weight, 4200))
+    vehicle_cap = _VEHICLE_CAPACITY[vehicle]
+    load_factor = np.where(
+        rng.random(n) < 0.6,
+        _uniform(rng, 0.4, 0.95, n),   # Carga adequada para o veículo
+        _uniform(rng, 0.1, 1.1, n)     # Carga atípica (muito leve ou muito pesada)
+    )
+    weight = np.clip((vehicle_cap * load_factor).astype(np.int64), 500, 4200)
     
     # Distância baseada na rota com variação
-    base_distance = {"ROTA_001": 85, "ROTA_002": 45, "ROTA_003": 120, "ROTA_004": 55, "ROTA_005": 95}
-    distance = base_distance[route] + random.randint(-15, 15)
-    distance = max(25, distance)
+    base_distance = _ROUTE_DISTANCE[route]
+    distance = np.maximum(25, base_distance + rng.integers(-15, 16, n))
     
     # Tempo médio histórico com correlação à distância e veículo
-    base_time = {"ROTA_001": 120, "ROTA_002": 90, "ROTA_003": 145, "ROTA_004": 85, "ROTA_005": 130}
-    vehicle_speed_factor = VEHICLE_CHARACTERISTICS[vehicle]["speed_avg"]
-    base_t = base_time[route] * (distance / base_distance[route])
-    historical_time = int(base_t / vehicle_speed_factor + random.randint(-20, 20))
-    historical_time = max(30, historical_time)
+    base_t = _ROUTE_TIME[route] * (distance / base_distance)
+    historical_time = (base_t / _VEHICLE_SPEED[vehicle] + rng.integers(-20, 21, n)).astype(np.int64)
+    historical_time = np.maximum(30, historical_time)
     
     return {
         'route': route,
@@ -137,184 +211,213 @@ def generate_correlated_data():
         'rain': rain,
         'weight': weight,
         'distance': distance,
-        'historical_time': historical_time,
-        'route_info': route_info,
-        'vehicle_info': VEHICLE_CHARACTERISTICS[vehicle]
+        'historical_time': historical_time
     }
 
-def calculate_delay_probability_complex(row):
+def _calculate_delay_probability(rng, data):
     """
-    Calcula a probabilidade de atraso com regras muito mais complexas
-    e comMUITO mais ruído para simular incerteza real.
+    Calcula a probabilidade de atraso com regras complexas
+    e MUITO ruído para simular incerteza real.
     """
-    prob = 0.0
-    
-    route = row['route']
-    vehicle = row['vehicle']
-    traffic = row['traffic']
-    hour = row['hour']
-    rain = row['rain']
-    weight = row['weight']
-    distance = row['distance']
-    route_info = row['route_info']
-    vehicle_info = row['vehicle_info']
+    route = data['route']
+    vehicle = data['vehicle']
+    traffic = data['traffic']
+    hour = data['hour']
+    rain = data['rain']
+    distance = data['distance']
+    n = len(route)
+    
+    def band(conditions, ranges):
+        """Soma U(low, high) da primeira condição verdadeira (0 se nenhuma)"""
+        return np.select(conditions, [_uniform(rng, low, high, n) for low, high in ranges], 0.0)
     
     # === FATOR 1: TRÂNSITO (impacto não-linear) ===
-    if traffic == 'alto':
-        prob += random.uniform(0.25, 0.50)  # Mais variabilidade
-    elif traffic == 'medio':
-        prob += random.uniform(0.08, 0.25)
-    # baixo: little or no addition
+    prob = band(
+        [traffic == TRAFFIC_LEVELS.index('alto'), traffic == TRAFFIC_LEVELS.index('medio')],
+        [(0.25, 0.50), (0.08, 0.25)]
+    )
     
     # === FATOR 2: CHUVA (não-linear e com interação) ===
-    if rain > 40:
-        prob += random.uniform(0.25, 0.55)
-    elif rain > 20:
-        prob += random.uniform(0.15, 0.35)
-    elif rain > 10:
-        prob += random.uniform(0.05, 0.20)
-    elif rain > 3:
-        prob += random.uniform(0.0, 0.10)
-    
-    # === FATOR 3: HORÁRIO (padrões complexos) ===
-    # Pico da manhã
-    if 7 <= hour <= 9:
-        prob += random.uniform(0.10, 0.30)
-    # Pico da tarde
-    elif 17 <= hour <= 20:
-        prob += random.uniform(0.15, 0.35)
-    # Madrugada (baixo trânsito mas menor eficiência)
-    elif hour <= 5:
-        prob += random.uniform(-0.05, 0.10)
-    # Fora de pico
-    else:
-        prob += random.uniform(-0.05, 0.10)
+    prob += band(
+        [rain > 40, rain > 20, rain > 10, rain > 3],
+        [(0.25, 0.55), (0.15, 0.35), (0.05, 0.20), (0.0, 0.10)]
+    )
+    
+    # === FATOR 3: HORÁRIO (picos da manhã e da tarde; demais horários) ===
+    peak_morning = (hour >= 7) & (hour <= 9)
+    peak_evening = (hour >= 17) & (hour <= 20)
+    prob += band(
+        [peak_morning, peak_evening, np.ones(n, dtype=bool)],
+        [(0.10, 0.30), (0.15, 0.35), (-0.05, 0.10)]
+    )
     
     # === FATOR 4: PESO (relação não-linear) ===
-    weight_ratio = weight / vehicle_info['weight_capacity']
-    if weight_ratio > 0.9:
-        prob += random.uniform(0.10, 0.25)
-    elif weight_ratio > 0.7:
-        prob += random.uniform(0.0, 0.15)
-    elif weight_ratio < 0.3:
-        prob += random.uniform(-0.05, 0.10)  # Carga muito leve pode ser problema
+    weight_ratio = data['weight'] / _VEHICLE_CAPACITY[vehicle]
+    prob += band(
+        [weight_ratio > 0.9, weight_ratio > 0.7, weight_ratio < 0.3],
+        [(0.10, 0.25), (0.0, 0.15), (-0.05, 0.10)]
+    )
     
     # === FATOR 5: DISTÂNCIA ===
-    if distance > 150:
-        prob += random.uniform(0.15, 0.35)
-    elif distance > 100:
-        prob += random.uniform(0.05, 0.20)
-    elif distance < 40:
-        prob += random.uniform(-0.08, 0.05)
+    prob += band(
+        [distance > 150, distance > 100, distance < 40],
+        [(0.15, 0.35), (0.05, 0.20), (-0.08, 0.05)]
+    )
     
     # === FATOR 6: CARACTERÍSTICAS OCULTAS DA ROTA ===
-    prob += route_info['congestion_prone'] * random.uniform(0.05, 0.15)
-    prob += route_info['weather_sensitivity'] * (rain / 50.0) * random.uniform(0.05, 0.15)
-    prob += (1 - route_info['reliability']) * random.uniform(0.05, 0.15)
+    prob += _ROUTE_CONGESTION[route] * _uniform(rng, 0.05, 0.15, n)
+    prob += _ROUTE_WEATHER[route] * (rain / 50.0) * _uniform(rng, 0.05, 0.15, n)
+    prob += (1 - _ROUTE_RELIABILITY[route]) * _uniform(rng, 0.05, 0.15, n)
     
     # === FATOR 7: TIPO DE VEÍCULO ===
-    prob += vehicle_info['weather_sensitivity'] * (rain / 40.0) * random.uniform(0.05, 0.15)
+    prob += _VEHICLE_WEATHER[vehicle] * (rain / 40.0) * _uniform(rng, 0.05, 0.15, n)
     
     # === INTERAÇÕES COMPLEXAS (fatores que se multiplicam) ===
     # Chuva + Trânsito alto = problema em dobro
-    if rain > 15 and traffic == 'alto':
-        prob += random.uniform(0.10, 0.25)
+    prob += band([(rain > 15) & (traffic == TRAFFIC_LEVELS.index('alto'))], [(0.10, 0.25)])
     
     # Hora de pico + Clima ruim
-    if hour in [7, 8, 9, 17, 18, 19, 20] and rain > 5:
-        prob += random.uniform(0.05, 0.15)
+    prob += band([(peak_morning | peak_evening) & (rain > 5)], [(0.05, 0.15)])
     
     # Veículo grande + Rota congestionada
-    if vehicle == "Caminhão Bitrem" and route_info['congestion_prone'] > 0.5:
-        prob += random.uniform(0.05, 0.15)
+    big_vehicle = vehicle == VEHICLE_TYPES.index("Caminhão Bitrem")
+    prob += band([big_vehicle & (_ROUTE_CONGESTION[route] > 0.5)], [(0.05, 0.15)])
     
     # === RUÍDO SIGNIFICATIVO (40-50% de incerteza) ===
-    # Este é o fator que mais adiciona "realismo" e imprevisibilidade
-    noise = random.uniform(-0.35, 0.40)
-    prob += noise
+    prob += _uniform(rng, -0.35, 0.40, n)
     
-    # === FATORES ALEATÓRIOS EXTRAS (simula eventos inesperados) ===
-    # 5% de chance de evento totally aleatório
-    if random.random() < 0.05:
-        prob += random.choice([-0.30, -0.20, 0.20, 0.30, 0.40])
+    # === FATORES ALEATÓRIOS EXTRAS (5% de chance de evento aleatório) ===
+    prob += np.where(rng.random(n) < 0.05, rng.choice([-0.30, -0.20, 0.20, 0.30, 0.40], n), 0.0)
     
     # === CONDIÇÕES ESPECIAIS RARAS ===
     # Dia de jogo, protestos, acidentes não previstos (2% chance)
-    if random.random() < 0.02:
-        prob += random.uniform(0.30, 0.60)
+    prob += band([rng.random(n) < 0.02], [(0.30, 0.60)])
     
     # Condição muito favorável (3% chance)
-    if random.random() < 0.03:
-        prob -= random.uniform(0.15, 0.30)
+    prob -= band([rng.random(n) < 0.03], [(0.15, 0.30)])
     
     # Limitar probabilidade a intervalo válido
-    prob = max(0.02, min(0.98, prob))
-    
-    return prob
+    return np.clip(prob, 0.02, 0.98)
 
-def generate_row():
-    """Gera uma linha de dados realista com correlações complexas"""
-    # Gerar dados com correlações
-    data = generate_correlated_data()
-    
-    # Calcular probabilidade de atraso
-    prob = calculate_delay_probability_complex(data)
-    
-    # Decidir se atrasa (com mais randomness)
-    # Usamos uma distribuição mais variada para o threshold
-    delay_threshold = random.uniform(0.30, 0.70)
-    delay_label = "atrasado" if prob > delay_threshold else "em_tempo"
-    
-    # Criar row final
-    row = {
-        'freight_description': generate_freight_id(),
-        'route_variant_id': data['route'],
+def generate_chunk(rng, n):
+    """Gera n linhas realistas com correlações complexas"""
+    data = _generate_correlated_data(rng, n)
+    prob = _calculate_delay_probability(rng, data)
+    
+    # Decidir se atrasa (threshold também sorteado)
+    delayed = prob > _uniform(rng, 0.30, 0.70, n)
+    
+    return pd.DataFrame({
+        'freight_description': generate_freight_ids(rng, n),
+        'delay_label': np.where(delayed, "atrasado", "em_tempo"),
+        'route_variant_id': pd.Categorical.from_codes(data['route'], ROUTES),
         'planned_departure_hour': data['hour'],
-        'traffic_level_forecast': data['traffic'],
+        'traffic_level_forecast': pd.Categorical.from_codes(data['traffic'], TRAFFIC_LEVELS),
         'rain_forecast_mm': data['rain'],
         'cargo_weight_kg': data['weight'],
-        'vehicle_type': data['vehicle'],
+        'vehicle_type': pd.Categorical.from_codes(data['vehicle'], VEHICLE_TYPES),
         'historical_avg_route_time_min': data['historical_time'],
-        'distance_km': data['distance'],
-        'delay_label': delay_label
-    }
-    
-    return row
+        'distance_km': data['distance']
+    }, columns=FIELDNAMES)
 
-def generate_dataset():
-    """Gera o dataset completo com máxima variabilidade"""
-    data = []
-    for _ in range(TOTAL):
-        data.append(generate_row())
-    return data
+def _chunk_task(seed, index, n):
+    """Bloco index do dataset (gerador derivado de seed e index)"""
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+    return generate_chunk(rng, n)
 
-def save_to_csv(data, filename):
-    """Salva os dados em um arquivo CSV"""
-    fieldnames = [
-        'freight_description',
-        'delay_label',
-        'route_variant_id',
-        'planned_departure_hour',
-        'traffic_level_forecast',
-        'rain_forecast_mm',
-        'cargo_weight_kg',
-        'vehicle_type',
-        'historical_avg_route_time_min',
-        'distance_km'
-    ]
+def generate_dataset(
+    n_rows: int = TOTAL,
+    seed: Optional[int] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    workers: int = 1
+) -> Iterator[pd.DataFrame]:
+    """
+    Gera o dataset em blocos de até chunk_rows linhas, em ordem
     
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+    Com workers > 1, os blocos são gerados em processos separados; no
+    máximo 2 * workers blocos ficam em memória esperando a escrita.
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    sizes = [min(chunk_rows, n_rows - start) for start in range(0, n_rows, chunk_rows)]
+    if workers <= 1:
+        for index, size in enumerate(sizes):
+            yield _chunk_task(seed, index, size)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for index, size in enumerate(sizes):
+            pending.append(pool.submit(_chunk_task, seed, index, size))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def write_dataset(chunks: Iterator[pd.DataFrame], filename, file_format: Optional[str] = None):
+    """
+    Grava os blocos em CSV ou Parquet, um por vez
+    
+    Returns:
+        Contagens de atraso por grupo (ver delay_counts), acumuladas
+    """
+    path = Path(filename)
+    file_format = file_format or ("parquet" if path.suffix == ".parquet" else "csv")
+    if file_format == "parquet" and pq is None:
+        raise RuntimeError("Formato parquet requer pyarrow (pip install pyarrow)")
+    
+    tmp_path = path.with_name(path.name + ".tmp")
+    counts = None
+    writer = None
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in chunks:
+                if file_format == "parquet":
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(f, table.schema)
+                    writer.write_table(table)
+                else:
+                    chunk.to_csv(f, header=counts is None, index=False, encoding="utf-8")
+                chunk_counts = delay_counts(chunk)
+                counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+            if writer is not None:
+                writer.close()
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return counts
+
+def delay_counts(df):
+    """
+    Linhas e atrasos por (trânsito, faixa de chuva, rota, período)
     
-    print(f"Arquivo {filename} gerado com {len(data)} registros")
+    Uma única passada de groupby; as análises por dimensão somam este
+    resultado (e os de vários blocos podem ser somados entre si).
+    """
+    rain_band = pd.cut(
+        df['rain_forecast_mm'],
+        bins=[-np.inf, 0, 10, 25, np.inf],
+        labels=["Sem chuva", "Chuva leve (0-10mm)", "Chuva média (10-25mm)", "Chuva forte (>25mm)"]
+    )
+    period = pd.Categorical.from_codes(
+        _HOUR_PERIOD[df['planned_departure_hour'].to_numpy()], PERIODS
+    )
+    grouped = pd.DataFrame({
+        'traffic': df['traffic_level_forecast'],
+        'rain': rain_band,
+        'route': df['route_variant_id'],
+        'period': period,
+        'delayed': (df['delay_label'] == 'atrasado').to_numpy()
+    }).groupby(['traffic', 'rain', 'route', 'period'], observed=True)['delayed']
+    return grouped.agg(total='size', delayed='sum')
 
-def analyze_data(data):
-    """Análise detalhada dos dados gerados"""
-    total = len(data)
-    delayed = sum(1 for r in data if r['delay_label'] == 'atrasado')
-    on_time = sum(1 for r in data if r['delay_label'] == 'em_tempo')
+def analyze_data(counts):
+    """Análise detalhada dos dados gerados (a partir de delay_counts)"""
+    total = int(counts['total'].sum())
+    delayed = int(counts['delayed'].sum())
+    on_time = total - delayed
     
     print(f"\n{'='*50}")
     print(f"ANÁLISE DOS DADOS GERADOS")
@@ -323,71 +426,46 @@ def analyze_data(data):
     print(f"Atrasados: {delayed} ({delayed/total*100:.1f}%)")
     print(f"No prazo: {on_time} ({on_time/total*100:.1f}%)")
     
-    # Análise por nível de tráfego
-    print(f"\n--- Por nível de tráfego ---")
-    for traffic in TRAFFIC_LEVELS:
-        subset = [r for r in data if r['traffic_level_forecast'] == traffic]
-        if subset:
-            delayed_count = sum(1 for r in subset if r['delay_label'] == 'atrasado')
-            pct = delayed_count/len(subset)*100
-            print(f"  {traffic}: {delayed_count}/{len(subset)} ({pct:.1f}%)")
-    
-    # Análise por chuva
-    print(f"\n--- Por precipitação ---")
-    no_rain = [r for r in data if r['rain_forecast_mm'] == 0]
-    light_rain = [r for r in data if 0 < r['rain_forecast_mm'] <= 10]
-    medium_rain = [r for r in data if 10 < r['rain_forecast_mm'] <= 25]
-    heavy_rain = [r for r in data if r['rain_forecast_mm'] > 25]
-    
-    categories = [
-        ("Sem chuva", no_rain),
-        ("Chuva leve (0-10mm)", light_rain),
-        ("Chuva média (10-25mm)", medium_rain),
-        ("Chuva forte (>25mm)", heavy_rain)
-    ]
-    
-    for name, group in categories:
-        if group:
-            delayed = sum(1 for r in group if r['delay_label'] == 'atrasado')
-            print(f"  {name}: {delayed}/{len(group)} ({delayed/len(group)*100:.1f}%)")
-    
-    # Análise por rota
-    print(f"\n--- Por rota ---")
-    for route in ROUTES:
-        subset = [r for r in data if r['route_variant_id'] == route]
-        if subset:
-            delayed_count = sum(1 for r in subset if r['delay_label'] == 'atrasado')
-            pct = delayed_count/len(subset)*100
-            print(f"  {route}: {delayed_count}/{len(subset)} ({pct:.1f}%)")
-    
-    # Análise por horário
-    print(f"\n--- Por período do dia ---")
-    morning = [r for r in data if 6 <= r['planned_departure_hour'] <= 11]
-    afternoon = [r for r in data if 12 <= r['planned_departure_hour'] <= 17]
-    evening = [r for r in data if 18 <= r['planned_departure_hour'] <= 22]
-    night = [r for r in data if r['planned_departure_hour'] <= 5 or r['planned_departure_hour'] >= 23]
-    
-    periods = [
-        ("Manhã (6-11)", morning),
-        ("Tarde (12-17)", afternoon),
-        ("Noite (18-22)", evening),
-        ("Madrugada (23-5)", night)
+    sections = [
+        ("Por nível de tráfego", 'traffic', TRAFFIC_LEVELS),
+        ("Por precipitação", 'rain', None),
+        ("Por rota", 'route', ROUTES),
+        ("Por período do dia", 'period', PERIODS)
     ]
+    for title, level, order in sections:
+        print(f"\n--- {title} ---")
+        by_group = counts.groupby(level=level, observed=True).sum()
+        if order is not None:
+            by_group = by_group.reindex([name for name in order if name in by_group.index])
+        for name, row in by_group.iterrows():
+            delayed_count, size = int(row['delayed']), int(row['total'])
+            print(f"  {name}: {delayed_count}/{size} ({delayed_count/size*100:.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos de fretes")
+    parser.add_argument("-o", "--output", default="dados_treino.csv")
+    parser.add_argument("--rows", type=int, default=TOTAL)
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Semente (padrão: sorteada a cada execução)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None,
+                        help="Padrão: pela extensão do arquivo")
+    parser.add_argument("--no-analysis", action="store_true")
+    args = parser.parse_args()
+    
+    # Sem semente, cada execução é diferente; a sorteada é exibida para
+    # que a execução possa ser reproduzida
+    seed = args.seed if args.seed is not None else np.random.SeedSequence().entropy
+    print(f"Gerando {args.rows} registros (seed={seed})...")
+    print("-" * 50)
     
-    for name, group in periods:
-        if group:
-            delayed = sum(1 for r in group if r['delay_label'] == 'atrasado')
-            print(f"  {name}: {delayed}/{len(group)} ({delayed/len(group)*100:.1f}%)")
+    chunks = generate_dataset(args.rows, seed, args.chunk_rows, args.workers)
+    counts = write_dataset(chunks, args.output, args.format)
+    print(f"Arquivo {args.output} gerado com {args.rows} registros")
+    if counts is not None and not args.no_analysis:
+        analyze_data(counts)
 
 # Executar geração
 if __name__ == "__main__":
-    # NÃO固定 seed - para que cada execução seja diferente
-    # Se quiser reprodutibilidade, descomente a linha abaixo:
-    # random.seed(42)
-    
-    print("Gerando dados realistas e não-determinísticos...")
-    print("-" * 50)
-    
-    data = generate_dataset()
-    save_to_csv(data, "dados_treino.csv")
-    analyze_data(data)
+    main()
@@ -0,0 +1,53 @@
+"""
+Configuração do gunicorn (modo multi-worker)
+
+Uso:
+    cd backend
+    WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py app.main:app
+
+Com preload_app a aplicação é importada no processo mestre, que carrega o
+modelo ativo antes do fork: os workers herdam o modelo pronto (arrays do
+motor compilado mapeados do disco e compartilhados). Cada worker acompanha
+o registro de modelos e troca de versão quando outro worker promove um
+modelo (ver app/models/reloader.py). Os jobs de treino ficam em SQLite,
+visíveis a todos os workers, e o /metrics agrega os snapshots de métricas
+gravados por cada worker em METRICS_MULTIPROC_DIR.
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app.config import HOST, PORT, WEB_WORKERS
+
+bind = f"{HOST}:{os.getenv('PORT', PORT)}"
+workers = WEB_WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# Predições em lote grandes podem levar alguns segundos; o treino roda
+# em processos próprios e não bloqueia o worker
+timeout = 120
+graceful_timeout = 30
+
+
+def when_ready(server):
+    """Carrega o modelo no processo mestre, antes de criar os workers"""
+    from app.models.predictor import predictor
+    from app.utils.metrics import registry
+    
+    if predictor.load():
+        server.log.info(f"Modelo {predictor.version} pré-carregado")
+    
+    # Os workers herdam as métricas do mestre: zerar para não contar a
+    # pré-carga uma vez por worker, e descartar snapshots antigos
+    registry.reset()
+    registry.clear_multiproc_dir()
+
+
+def child_exit(server, worker):
+    """Descarta o snapshot de métricas de um worker encerrado"""
+    from app.utils.metrics import registry
+    
+    registry.remove_process(worker.pid)
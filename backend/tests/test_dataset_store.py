@@ -0,0 +1,32 @@
+"""
+Testes do store de datasets em Parquet
+
+Uso:
+    cd backend
+    python -m pytest tests
+"""
+from pathlib import Path
+
+import pandas as pd
+
+from app.utils.dataset_store import DatasetStore
+
+TRAINING_CSV = Path(__file__).resolve().parent.parent / "data" / "dados_treino.csv"
+
+
+def test_load_route_partition_with_nulls(tmp_path):
+    """Rota vazia vai para a partição de nulos e volta como faltante"""
+    df = pd.read_csv(TRAINING_CSV)
+    df.loc[df.index[:10], "route_variant_id"] = None
+    csv_path = tmp_path / "upload.csv"
+    df.to_csv(csv_path, index=False)
+
+    store = DatasetStore(tmp_path / "datasets")
+    meta = store.ingest(str(csv_path), "upload.csv", partition_by="route_variant_id")
+    loaded, selected = store.load([meta["id"]])
+
+    assert [item["id"] for item in selected] == [meta["id"]]
+    assert len(loaded) == len(df)
+    assert isinstance(loaded["route_variant_id"].dtype, pd.CategoricalDtype)
+    assert loaded["route_variant_id"].isna().sum() == 10
+    assert set(loaded["route_variant_id"].dropna()) == set(df["route_variant_id"].dropna())
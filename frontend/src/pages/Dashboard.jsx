@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import MetricCard from '../components/MetricCard';
-import { getModelInfo, getMetrics } from '../services/api';
+import { getSummary } from '../services/api';
 
 const Dashboard = () => {
   const [modelInfo, setModelInfo] = useState(null);
@@ -13,12 +13,11 @@ const Dashboard = () => {
 
   const loadData = async () => {
     try {
-      const info = await getModelInfo();
-      setModelInfo(info);
+      const summary = await getSummary();
+      setModelInfo(summary.model);
       
-      if (info.is_trained) {
-        const metricsData = await getMetrics();
-        setMetrics(metricsData);
+      if (summary.model.is_trained) {
+        setMetrics(summary.metrics);
       }
     } catch (error) {
       console.error('Erro ao carregar dados:', error);
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import MetricCard from '../components/MetricCard';
-import { getMetrics, getFeatureImportance, getModelInfo } from '../services/api';
+import { getSummary } from '../services/api';
 
 const Metrics = () => {
   const [metrics, setMetrics] = useState(null);
@@ -17,15 +17,12 @@ const Metrics = () => {
     try {
       setLoading(true);
       
-      const info = await getModelInfo();
-      setModelInfo(info);
+      const summary = await getSummary();
+      setModelInfo(summary.model);
       
-      if (info.is_trained) {
-        const metricsData = await getMetrics();
-        setMetrics(metricsData);
-        
-        const importanceData = await getFeatureImportance();
-        setFeatureImportance(importanceData.features || []);
+      if (summary.model.is_trained) {
+        setMetrics(summary.metrics);
+        setFeatureImportance(summary.features || []);
       }
     } catch (err) {
       setError(err.message || 'Erro ao carregar métricas');
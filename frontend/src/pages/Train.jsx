@@ -55,7 +55,13 @@ const Train = ({ onModelTrained }) => {
     try {
       addLog('info', `Iniciando treinamento do modelo... (test_size: ${testSize * 100}%)`);
       
-      const response = await trainModel(selectedFile, testSize);
+      let lastStage = null;
+      const response = await trainModel(selectedFile, testSize, (job) => {
+        if (job.stage && job.stage !== lastStage) {
+          lastStage = job.stage;
+          addLog('info', `Etapa: ${job.stage}`);
+        }
+      });
       
       addLog('success', 'Treinamento concluído com sucesso!');
       addLog('info', `Versão do modelo: ${response.version}`);
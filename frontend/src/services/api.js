@@ -16,14 +16,50 @@ export const checkHealth = async () => {
   return response.data;
 };
 
-// Model info
+// Dashboard summary: model info, metrics and aggregated feature importance.
+// Served with an ETag, so the browser revalidates and gets 304 while the
+// model is unchanged; every page shares this one request.
+export const getSummary = async () => {
+  const response = await api.get('/api/summary');
+  return response.data;
+};
+
+// Model info (from the summary)
 export const getModelInfo = async () => {
-  const response = await api.get('/api/model/info');
+  const summary = await getSummary();
+  return summary.model;
+};
+
+// Training job status
+export const getJob = async (jobId) => {
+  const response = await api.get(`/api/jobs/${jobId}`);
   return response.data;
 };
 
-// Train model
-export const trainModel = async (file, testSize = 0.2) => {
+// Cancel training job
+export const cancelJob = async (jobId) => {
+  const response = await api.delete(`/api/jobs/${jobId}`);
+  return response.data;
+};
+
+// Wait for a training job to finish, reporting each status update
+export const waitForJob = async (jobId, onUpdate, intervalMs = 1000) => {
+  for (;;) {
+    const job = await getJob(jobId);
+    if (onUpdate) onUpdate(job);
+
+    if (job.status === 'completed') return job.result;
+    if (job.status === 'failed' || job.status === 'cancelled') {
+      const error = new Error(job.error || `Job ${job.status}`);
+      error.response = { data: { detail: job.error || `Job ${job.status}` } };
+      throw error;
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+};
+
+// Train model (starts a job and waits for its result)
+export const trainModel = async (file, testSize = 0.2, onUpdate) => {
   const formData = new FormData();
   formData.append('file', file);
   formData.append('test_size', testSize);
@@ -33,20 +69,21 @@ export const trainModel = async (file, testSize = 0.2) => {
       'Content-Type': 'multipart/form-data',
     },
   });
-  return response.data;
+  return waitForJob(response.data.job_id, onUpdate);
 };
 
-// Retrain model
-export const retrainModel = async (file) => {
+// Retrain model (starts a job and waits for its result)
+export const retrainModel = async (file, onUpdate, mode = 'warm_start') => {
   const formData = new FormData();
   formData.append('file', file);
+  formData.append('mode', mode);
   
   const response = await api.post('/api/retrain', formData, {
     headers: {
       'Content-Type': 'multipart/form-data',
     },
   });
-  return response.data;
+  return waitForJob(response.data.job_id, onUpdate);
 };
 
 // Predict
@@ -61,6 +98,24 @@ export const getMetrics = async () => {
   return response.data;
 };
 
+// List saved model versions
+export const listModels = async () => {
+  const response = await api.get('/api/models');
+  return response.data;
+};
+
+// Put a saved model version in use
+export const promoteModel = async (version) => {
+  const response = await api.post(`/api/models/${version}/promote`);
+  return response.data;
+};
+
+// Roll back to the previously active model version
+export const rollbackModel = async () => {
+  const response = await api.post('/api/models/rollback');
+  return response.data;
+};
+
 // Get feature importance
 export const getFeatureImportance = async () => {
   const response = await api.get('/api/features/importance');